@@ -7,22 +7,141 @@
 # @Last modified time: 2022-05-06T19:12:47+10:00
 
 # import required packages
-import requests
 import re
+import logging
+import json
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlencode
 from bs4 import BeautifulSoup, NavigableString, Tag
-import shutil # to save it locally
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from fetchEngine import get_fetch_engine
+from crawlMetrics import metrics
+from crawlLogging import log_event
+
+# Finds the story card a link is in, the largest element holding only that
+# story, like find_card_date. The card's timestamp is read from inside it,
+# so a card without one can't shift the others' dates. pruneCards removes
+# the first count cards, always leaving the last one, and returns how many
+# were removed. Each card's timestamp goes with it
+CARD_FUNCTIONS = """
+function findCard(link, storyTag) {
+    var selector = 'h3[data-component="' + storyTag + '"]';
+    var card = link;
+    while (card.parentElement && card.parentElement.querySelectorAll(selector).length < 2) {
+        card = card.parentElement;
+    }
+    return card;
+}
+function cardDate(link, storyTag, dateTag) {
+    var time = findCard(link, storyTag).querySelector('time[data-component="' + dateTag + '"]');
+    return time ? time.getAttribute('datetime') : null;
+}
+function pruneCards(links, storyTag, count) {
+    count = Math.max(0, Math.min(count, links.length - 1));
+    var cards = [];
+    for (var i = 0; i < count; i++) { cards.push(findCard(links[i], storyTag)); }
+    for (var i = 0; i < count; i++) { cards[i].remove(); }
+    return count;
+}
+"""
+
+# Returns [[href, datetime], ...] for each story card from arguments[2] on,
+# in one call to the browser rather than one for every card, and the
+# number of cards removed if arguments[3] asks for the cards read to be
+# pruned
+STORY_CARDS_SCRIPT = CARD_FUNCTIONS + """
+var links = document.querySelectorAll('h3[data-component="' + arguments[0] + '"] a');
+var cards = [];
+for (var i = arguments[2]; i < links.length; i++) {
+    cards.push([links[i].href, cardDate(links[i], arguments[0], arguments[1])]);
+}
+return [cards, arguments[3] ? pruneCards(links, arguments[0], links.length - 1) : 0];
+"""
+
+# Removes the first arguments[2] story cards and returns how many went
+PRUNE_CARDS_SCRIPT = CARD_FUNCTIONS + """
+var links = document.querySelectorAll('h3[data-component="' + arguments[0] + '"] a');
+return pruneCards(links, arguments[0], arguments[2]);
+"""
+
+# Returns the number of story cards on the page
+STORY_COUNT_SCRIPT = """
+return document.querySelectorAll('h3[data-component="' + arguments[0] + '"] a').length;
+"""
+
+# Returns the datetime of the last story card, or null
+LAST_DATE_SCRIPT = """
+var dates = document.querySelectorAll('time[data-component="' + arguments[0] + '"]');
+return dates.length ? dates[dates.length - 1].getAttribute('datetime') : null;
+"""
+
+# Clicks the Load More button unless it says there are no more stories.
+# Returns null if there's no button
+LOAD_MORE_SCRIPT = """
+var button = document.querySelector('button[data-component="' + arguments[0] + '"]');
+if (!button) { return null; }
+if (button.disabled || button.innerText.trim().toUpperCase() == 'NO MORE STORIES TO LOAD') { return false; }
+button.click();
+return true;
+"""
+
+# Requests the browser doesn't make when blocking is on: images, fonts,
+# video and the ad and analytics hosts. None of them are needed to read the
+# story cards
+BLOCKED_URL_PATTERNS = ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.mp4", "*.m3u8", "*.ts",
+    "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*",
+    "*googletagmanager.com*", "*google-analytics.com*", "*facebook.net*",
+    "*scorecardresearch.com*", "*chartbeat.com*", "*chartbeat.net*", "*imrworldwide.com*",
+    "*taboola.com*", "*outbrain.com*", "*hotjar.com*"]
+
+
+def make_chrome_driver(executable_path=None, headless=True, block_resources=True):
+    """Start Chrome for reading topic pages. Headless Chrome doesn't draw
+    the page, and blocking images, fonts and ads keeps the page load time
+    and the browser's memory down"""
+
+    options = webdriver.ChromeOptions()
+
+    if headless:
+        options.add_argument("--headless=new")
+
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage") # /dev/shm is small in containers
+    options.add_argument("--disable-extensions")
+
+    if block_resources: # Don't even decode images
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    service = Service(executable_path) if executable_path else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+
+    if block_resources: # Stop the requests before they're sent
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+    return driver
+
 
 class TopicPage:
     """
     This class loads a topic web page containing a list of articles for scraping
     """
 
-    def __init__(self, selenium_driver):
-        """Initilise the object"""
+    def __init__(self, selenium_driver, prune_cards=False):
+        """Initilise the object. If prune_cards is True the story cards are
+        removed from the page once they've been read, so the page doesn't
+        grow with every Load More"""
         self.driver = selenium_driver
+        self.prune_cards = prune_cards
+        self.cursor = 0 # Number of story cards already returned
+        self.pruned = 0 # Number of story cards removed from the page
 
     def get_web_page(self, topic_page_url):
         """Load the web page"""
@@ -34,6 +153,8 @@ class TopicPage:
             return False
 
         else: # Otherwise
+            self.cursor = 0 # The cards start again on a new page
+            self.pruned = 0
             return True
 
 
@@ -41,9 +162,9 @@ class TopicPage:
         """Click the cookie consent banner if available"""
 
         try: # Check for the existance of cookie consent banner
-            self.cookie = self.driver.find_element_by_xpath('//button[@data-component="{}"]'.format(cookie_button_tag))
+            self.cookie = self.driver.find_element(By.XPATH, '//button[@data-component="{}"]'.format(cookie_button_tag))
 
-        except: # If there isn't a cookie consent banner
+        except NoSuchElementException: # If there isn't a cookie consent banner
             return False # Return a False flag
 
         else: # Otherwise
@@ -55,102 +176,487 @@ class TopicPage:
     def get_last_story_card_publish_date(self,date_tag):
         """Get the date of the last story card"""
 
-        # Get all the card dates on the page
-        self.card_date = self.driver.find_elements_by_xpath('//time[@data-component="{}"]'.format(date_tag))
-
-        # Return the datetime of the last story card
-        return self.card_date[-1].get_attribute('datetime')
+        # Read only the last card's date in the browser
+        return self.driver.execute_script(LAST_DATE_SCRIPT, date_tag)
 
 
     def click_load_more(self, load_more_tag):
         """Click the load more stories button"""
 
-        # Set a wait variable
-        # wait = WebDriverWait(self.driver, 10)
-
-        # Find the load more stories button
-        self.more_button = self.driver.find_element_by_xpath('//button[@data-component="{}"]'.format(load_more_tag))
-        # self.more_button = wait.until(EC.element_to_be_clickable((By.XPATH,'//button[@data-component="{}"]')))
+        # Find, check and click the button in one call to the browser
+        clicked = self.driver.execute_script(LOAD_MORE_SCRIPT, load_more_tag)
 
-        # Check if the load more stories button has been disabled
-        if self.more_button.text == "NO MORE STORIES TO LOAD":
-            return False
+        if clicked is None: # If there isn't a load more stories button
+            raise NoSuchElementException("No {} button on the page".format(load_more_tag))
 
-        else: # If the button isn't disabled, then there are still more stories to load
-            self.more_button.click() # Load more stories
-            return True
+        # False if the button says there are no more stories to load
+        return clicked
 
 
     def get_story_links(self, story_tag):
         """Return the URLs of the stories on the visible page"""
 
         try: # Check that there are story cards on the page
-            story_elements = self.driver.find_elements_by_xpath('//h3[@data-component="{}"]//a'.format(story_tag))
+            story_cards = self.driver.execute_script(STORY_CARDS_SCRIPT, story_tag, "", 0, False)[0]
 
         except: # If no story cards
             return False
 
         else: #Otherwise
-            # Extract the URLs from the elements
-            story_urls = [each.get_attribute("href") for each in story_elements]
-
             # Return a list of story URLs
-            return story_urls
+            return [url for url, date in story_cards]
+
+
+    def get_story_cards(self, story_tag, date_tag):
+        """Return the (URL, publish date) of each story on the visible page,
+        not counting any that have been pruned"""
+        return [tuple(card) for card in self.driver.execute_script(STORY_CARDS_SCRIPT,
+            story_tag, date_tag, 0, False)[0]]
+
+
+    def get_new_story_cards(self, story_tag, date_tag):
+        """Return the (URL, publish date) of the stories added since the last
+        call, so each Load More only reads the new cards"""
+
+        # The cards still on the page start after the pruned ones
+        cards, pruned = self.driver.execute_script(STORY_CARDS_SCRIPT, story_tag, date_tag,
+            self.cursor - self.pruned, self.prune_cards)
+
+        self.cursor += len(cards)
+        self.pruned += pruned
+
+        return [tuple(card) for card in cards]
+
+
+    def count_story_cards(self, story_tag):
+        """Return the number of story cards loaded, including any pruned"""
+        return self.driver.execute_script(STORY_COUNT_SCRIPT, story_tag) + self.pruned
+
+
+    def wait_for_cards(self, story_tag, count, timeout=10):
+        """Wait until there are more than count story cards. Returns False
+        if they didn't come within timeout seconds"""
+
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(
+                lambda driver: self.count_story_cards(story_tag) > count)
+
+        except TimeoutException:
+            return False
+
+        return True
+
+
+    def wait_for_new_cards(self, story_tag, timeout=10):
+        """Wait until there are more story cards than have been returned,
+        instead of sleeping for a fixed time. Returns False if none came
+        within timeout seconds"""
+        return self.wait_for_cards(story_tag, self.cursor, timeout)
+
+
+    def fast_forward(self, offset, story_tag, date_tag, load_more_tag, timeout=10):
+        """Click Load More until offset stories have loaded, without reading
+        them, so a new browser session carries on where the last one
+        stopped. Returns False if the listing ended first"""
+
+        count = self.count_story_cards(story_tag)
+
+        while count < offset:
+            if not self.click_load_more(load_more_tag) or not self.wait_for_cards(story_tag, count, timeout):
+                break
+
+            count = self.count_story_cards(story_tag)
+
+            if self.prune_cards: # Keep the page small while skipping
+                self.pruned += self.driver.execute_script(PRUNE_CARDS_SCRIPT, story_tag, date_tag,
+                    min(count, offset) - self.pruned)
+
+        self.cursor = min(count, offset)
+
+        return count >= offset
+
+
+    def scroll_to_bottom(self):
+        """Scroll to the bottom of the page"""
+        self.driver.execute_script("window.scrollTo(0,document.body.scrollHeight);")
+
+
+    def close(self):
+        """Close the browser and end its session"""
+        self.driver.quit()
+
+
+# Format of the datetime attribute on the topic page story cards
+CARD_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+# Keys that hold a story's link or publish date in the topic page JSON
+CARD_LINK_KEYS = ("link", "href", "url", "to", "canonicalURL", "canonicalUrl")
+CARD_DATE_KEYS = ("firstPublished", "datePublished", "published", "publishedDate",
+    "displayPublished", "date", "timestamp")
+
+# Article links look like /news/2012-01-12/csu-gets-serious-about-far-west/3769250
+ARTICLE_LINK_PATTERN = re.compile(r"/news/\d{4}-\d{2}-\d{2}/[^\s\"'?#]+")
+
+
+def to_card_timestamp(value):
+    """Convert a date from the topic page JSON to the story card format"""
+
+    if isinstance(value, (int, float)): # Milliseconds since the epoch
+        date = datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+    else:
+        try:
+            date = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+
+        except ValueError: # If it isn't a date
+            return None
+
+    if date.tzinfo is not None: # Convert to UTC before dropping the timezone
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return date.strftime(CARD_TIMESTAMP_FORMAT)
+
+
+def find_story_cards(state):
+    """Walk the JSON behind a topic page and return a (URL, publish date)
+    pair for each story in it, in page order"""
+
+    cards = []
+    stack = [state] # Walk the JSON without recursion
+
+    while stack:
+        node = stack.pop()
+
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+
+        elif isinstance(node, dict):
+            link = None
+            date = None
+
+            for key in CARD_LINK_KEYS: # Look for a link to an article
+                value = node.get(key)
+                if isinstance(value, dict): # Links are sometimes {"to": "/news/..."}
+                    value = value.get("to") or value.get("href") or value.get("url")
+                if isinstance(value, str) and ARTICLE_LINK_PATTERN.search(value):
+                    link = value
+                    break
+
+            if link: # Look for the date next to the link
+                for holder in (node, node.get("dates"), node.get("timestamp")):
+                    if isinstance(holder, dict):
+                        for key in CARD_DATE_KEYS:
+                            if holder.get(key) and not isinstance(holder.get(key), dict):
+                                date = to_card_timestamp(holder[key])
+                                if date:
+                                    break
+                    if date:
+                        break
+
+            if link and date: # This is a story card
+                cards.append((urljoin("https://www.abc.net.au/", link), date))
+
+            else: # Otherwise keep looking in the children
+                stack.extend(reversed(list(node.values())))
+
+    return cards
+
+
+def find_card_date(story_link, story_tag, date_tag):
+    """Return the datetime of the timestamp in the same story card as a
+    story link, or None if the card has no timestamp. Each card is searched
+    on its own so a card without a date can't shift the others' dates"""
+
+    for parent in story_link.parents:
+        # Stop at the list holding several cards
+        if len(parent.find_all("h3", attrs={"data-component": story_tag}, limit=2)) > 1:
+            return None
+
+        card_date = parent.find("time", attrs={"data-component": date_tag})
+        if card_date is not None:
+            return card_date.get("datetime")
+
+    return None
+
+
+class HTTPTopicPage:
+    """This class collects the stories on a topic page with plain HTTP
+    requests instead of a browser. The first stories come from the page HTML
+    and each "load more" asks the same pagination endpoint the Load More
+    button uses. It has the same methods as TopicPage so either can be used
+    by main_dataCollection."""
+
+    # The endpoint the Load More button gets its stories from
+    pagination_url = "https://www.abc.net.au/news-web/api/loader/channelrefetch"
+
+    # The story card tags read from the HTML if the page has no JSON state
+    story_tag = "CardHeading"
+    date_tag = "Timestamp"
+
+    def __init__(self, fetch_engine=None, page_size=25):
+        """Initialise the object"""
+        self.fetch_engine = fetch_engine
+        self.page_size = page_size # Stories requested per load more
+        self.cards = [] # (URL, publish date) for each story loaded so far
+        self.card_urls = set() # For skipping stories that appear twice
+        self.cursor = 0 # Number of story cards already returned
+        self.skipped = 0 # Stories before self.cards, left out by fast_forward
+
+
+    @property
+    def engine(self):
+        """Use the process wide fetch engine unless one was passed"""
+        return self.fetch_engine if self.fetch_engine else get_fetch_engine()
+
+
+    def add_cards(self, cards):
+        """Add story cards that haven't been seen and return how many were new"""
+
+        new_count = 0
+        for url, date in cards:
+            if url not in self.card_urls:
+                self.card_urls.add(url)
+                self.cards.append((url, date))
+                new_count += 1
+
+        return new_count
+
+
+    def get_web_page(self, topic_page_url):
+        """Load the web page"""
+
+        try: # Try to load the page
+            r = self.engine.get(topic_page_url, use_cache=True)
+
+        except Exception: # If the page load fails
+            return False
+
+        if r.status_code != 200:
+            return False
+
+        self.topic_page_url = topic_page_url
+        self.topic_path = re.sub(r"https://www.abc.net.au", "", topic_page_url)
+        self.html = r.text
+
+        # Find the document ID and story total the Load More button sends
+        document_id = re.search(r'"documentId"\s*:\s*"?(\d+)', self.html)
+        self.document_id = document_id.group(1) if document_id else None
+
+        total = re.search(r'"total"\s*:\s*(\d+)', self.html)
+        self.total = int(total.group(1)) if total else None
+
+        # Get the stories from the JSON state embedded in the page
+        for script in re.findall(r"<script[^>]*>(.*?)</script>", self.html, flags=re.S):
+            start = script.find("{")
+            if start == -1 or "/news/" not in script:
+                continue
+
+            try: # Scripts are either pure JSON or window.__STATE__ = {...};
+                state = json.JSONDecoder().raw_decode(script[start:])[0]
+
+            except ValueError: # If it isn't JSON, move on
+                continue
+
+            self.add_cards(find_story_cards(state))
+
+        if not self.cards: # If the JSON state wasn't found, read the HTML
+            soup = BeautifulSoup(self.html, 'html.parser')
+            links = soup.select('h3[data-component="{}"] a[href]'.format(self.story_tag))
+            self.add_cards([(urljoin(topic_page_url, a["href"]),
+                find_card_date(a, self.story_tag, self.date_tag)) for a in links])
+
+        return True
+
+
+    def click_cookie_consent(self, cookie_button_tag):
+        """There is no cookie consent banner without a browser"""
+        return False
+
+
+    def get_last_story_card_publish_date(self, date_tag):
+        """Get the date of the last story card, or None if there are none"""
+        return self.cards[-1][1] if self.cards else None
+
+
+    def click_load_more(self, load_more_tag):
+        """Request the next page of stories from the pagination endpoint.
+        Returns False once there are no more stories, and raises IOError if
+        the stories couldn't be loaded, so the topic is retried rather than
+        treated as finished"""
+
+        if self.document_id is None: # The page didn't say how to load more
+            return False
+
+        if self.total is not None and len(self.cards) + self.skipped >= self.total:
+            return False # NO MORE STORIES TO LOAD
+
+        params = {"name": "PaginationArticles", "documentId": self.document_id,
+            "prepiPath": self.topic_path, "offset": len(self.cards) + self.skipped,
+            "size": self.page_size}
+
+        if self.total is not None:
+            params["total"] = self.total
+
+        # A timeout or a dropped connection is raised from here
+        r = self.engine.get("{}?{}".format(self.pagination_url, urlencode(params)), use_cache=True)
+
+        if r.status_code != 200: # e.g. throttled or the server is down
+            raise IOError("HTTP {} loading more stories for {}".format(r.status_code, self.topic_path))
+
+        try:
+            more_cards = find_story_cards(json.loads(r.content))
+
+        except ValueError as e: # Not the JSON the Load More button gets
+            raise IOError("The stories loaded for {} weren't JSON".format(self.topic_path)) from e
+
+        # There are still more stories to load if new ones came back
+        return self.add_cards(more_cards) > 0
+
+
+    def get_story_links(self, story_tag):
+        """Return the URLs of the stories loaded so far"""
+        return [url for url, date in self.cards]
+
+
+    def get_story_cards(self, story_tag, date_tag):
+        """Return the (URL, publish date) of the stories loaded so far"""
+        return list(self.cards)
+
+
+    def get_new_story_cards(self, story_tag, date_tag):
+        """Return the (URL, publish date) of the stories loaded since the last
+        call"""
+
+        cards = self.cards[self.cursor - self.skipped:]
+        self.cursor = self.skipped + len(self.cards)
+
+        return cards
+
+
+    def count_story_cards(self, story_tag):
+        """Return the number of stories loaded so far, including any skipped"""
+        return self.skipped + len(self.cards)
+
+
+    def wait_for_new_cards(self, story_tag, timeout=10):
+        """Load more returns once the stories are loaded, so there's nothing
+        to wait for. Returns False if there are no new stories"""
+        return self.skipped + len(self.cards) > self.cursor
+
+
+    def fast_forward(self, offset, story_tag, date_tag, load_more_tag, timeout=10):
+        """Skip the first offset stories, read by an earlier session. The
+        pagination endpoint takes an offset, so the skipped stories aren't
+        loaded. Returns False if the listing ended first"""
+
+        if offset >= len(self.cards): # Load More carries on from offset
+            self.skipped = offset
+            self.cards = []
+
+        self.cursor = offset
+
+        return self.total is None or offset < self.total
+
+
+    def scroll_to_bottom(self):
+        """There is nothing to scroll without a browser"""
+        pass
+
+
+    def close(self):
+        """Nothing to close, the fetch engine is shared"""
+        pass
+
+
+def get_article_uuid(article_url):
+    """Split an article URL to get the article UUID"""
+    # Remove the ABC domain from the URL
+    a_uuid = re.sub(r'https://www.abc.net.au/',"",article_url)
+
+    # Convert the forward slashes to underscores for saving to disk
+    return re.sub(r'\/',"_",a_uuid)
 
 
 class ArticlePage:
     """This class loads an article page and saves the contents to disk"""
 
-    def __init__(self, article_url):
+    def __init__(self, article_url, fetch_engine=None):
         """Initialise the object"""
         # self.driver = selenium_driver
         self.url = article_url
 
+        # The fetch engine is only looked up when the page is requested
+        self.fetch_engine = fetch_engine
+
+
+    @property
+    def engine(self):
+        """Use the process wide fetch engine unless one was passed"""
+        return self.fetch_engine if self.fetch_engine else get_fetch_engine()
+
 
     def get_page_uuid(self):
         """Split the URL to get the article UUID"""
-        # Remove the ABC domain from the URL
-        self.a_uuid = re.sub(r'https://www.abc.net.au/',"",self.url)
-
-        # Convert the forward slashes to underscores for saving to disk
-        self.a_uuid = re.sub(r'\/',"_",self.a_uuid)
+        self.a_uuid = get_article_uuid(self.url)
 
         return self.a_uuid # Return the result
 
 
     def make_page_soup(self):
         """ Get the webpage code and store in a class variable """
-        self.r = requests.get(self.url) # Get the page
-
-        if self.r.status_code != 404: # If there isn't a error when page is loaded
-            self.soup = BeautifulSoup(self.r.text, 'html.parser')
+        # Get the page, revalidating it if it's in the HTTP cache
+        self.r = self.engine.get(self.url, use_cache=True)
+
+        # If there isn't a error when page is loaded. Throttled (429) and
+        # unavailable (503) responses aren't the article, so they aren't saved
+        if self.r.status_code == 200:
+            with metrics.timed("parse_seconds", stage="download"):
+                self.soup = BeautifulSoup(self.r.text, 'html.parser')
             return True
 
         else:
             return False # Article not saved
 
 
-    def save_page_images(self):
+    def save_page_images(self, image_store=None):
         """ Find images within the web page code. Save to disk and update links
         to local images """
 
+        page_images = self.localise_page_images()
+
+        if page_images is None: # If there's no page code to search
+            return False
+
+        return self.download_page_images(page_images, image_store)
+
+
+    def localise_page_images(self):
+        """ Find images within the web page code and update links to local
+        images. Returns the image URLs and the filenames to save them to, so
+        the images can be downloaded separately from the page """
+
         try:
             self.soup # Check if code has been copied into BS object
 
         except:
-            print("You need to call make_page_soup first")
-            return False
+            log_event("images", "no_page", get_article_uuid(self.url), logging.WARNING,
+                reason="make_page_soup wasn't called")
+            return None
 
         # Only save the images in the main body of the article
         figures = self.soup.find_all("figure") # Find all the images in the page
 
+        # Image URLs and the filenames they're saved to
+        page_images = {}
+
         # For each of the figures found (images are included) in figures if __name__ == '__main__':
         # the HTML
         for fig in figures: # For each of the figures found
             for each in fig.contents: # Iterate through the tags
                 # If the child isn't what is expected
                 if isinstance(each, NavigableString):
-                    print("Error with images for {}".format(self.url))
+                    log_event("images", "unexpected_figure", get_article_uuid(self.url),
+                        logging.DEBUG, child="text")
 
                 # If the child is a BS Tag
                 elif isinstance(each, Tag):
@@ -199,37 +705,49 @@ class ArticlePage:
                                 img["data-src"] = "../images/{}.jpg".format(img_id)
                                 img["src"] = "../images/{}.jpg".format(img_id)
 
-                                # Get the image
-                                r = requests.get(img_url, stream=True)
+                                # Queue the image to be downloaded with the others
+                                page_images[img_url] = img_filename
 
-                                # If the image was retrieved
-                                if r.status_code == 200:
-                                    # Set decode_content value to True, otherwise the downloaded image file's size will be zero.
-                                    r.raw.decode_content = True
-                                    # Open a local file with wb ( write binary ) permission.
-                                    with open(img_filename,'wb') as f:
-                                        shutil.copyfileobj(r.raw, f)
+                else: # Catch any other problems
+                    log_event("images", "unexpected_figure", get_article_uuid(self.url),
+                        logging.DEBUG, child=type(each).__name__)
 
-                                    img_download_flag = True # Flag for returning
+        return page_images
 
-                                else:
-                                    print("Couldn't download image from {}".format(self.url))
 
-                else: # Catch any other problems
-                    print("Error with images for {}".format(self.url))
+    def download_page_images(self, page_images, image_store=None):
+        """ Download the images found by localise_page_images and save them
+        to disk. If an ImageStore is passed, images it already has aren't
+        downloaded again """
 
-        try: # Check to see if any images have been downloaded
-            img_download_flag
+        if image_store is not None:
+            return image_store.save_article_images(get_article_uuid(self.url), page_images, self.url)
 
-        except: # No images downloaded
-            return False
+        # Get all the article's images at once
+        responses = self.engine.get_many(list(page_images))
 
-        else:
-            return True
+        img_download_flag = False # Flag for returning
+
+        for (img_url, img_filename), r in zip(page_images.items(), responses):
+            # If the image was retrieved
+            if not isinstance(r, Exception) and r.status_code == 200:
+                # Open a local file with wb ( write binary ) permission.
+                with open(img_filename,'wb') as f:
+                    f.write(r.content)
+
+                img_download_flag = True
 
+            else:
+                log_event("image", "failed", get_article_uuid(self.url), logging.WARNING,
+                    url=img_url, status=None if isinstance(r, Exception) else r.status_code,
+                    error=repr(r) if isinstance(r, Exception) else None)
 
-    def save_page_html(self):
-        """Get the article page"""
+        return img_download_flag # Whether any images have been downloaded
+
+
+    def save_page_html(self, archive=None):
+        """Get the article page. If an ArticleArchive is passed, the raw page
+        bytes are appended to it instead of writing a prettified HTML file"""
 
         try:
             self.soup # Check if code has been copied into BS object
@@ -237,12 +755,19 @@ class ArticlePage:
         except:
             return False
 
+        if archive is not None: # Store the page exactly as it was downloaded
+            with metrics.timed("write_seconds", kind="archive"):
+                archive.append(get_article_uuid(self.url), self.url, self.r.content)
+
+            return True # Article saved
+
         else:
             # Set the filename
             self.filename = "../_data/articles/{}.html".format(self.a_uuid)
 
-            with open(self.filename, "w") as f: # Create a new HTML file
-                f.write(self.soup.prettify())
+            with metrics.timed("write_seconds", kind="article_html"):
+                with open(self.filename, "w") as f: # Create a new HTML file
+                    f.write(self.soup.prettify())
 
             return True # Article saved
 
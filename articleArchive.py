@@ -0,0 +1,248 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T14:08:56+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: articleArchive.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T14:08:56+10:00
+
+# Import packages
+import gzip
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from os import path, makedirs
+
+try: # zstd compresses better and faster than gzip, but is optional
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# File extension for each compression type
+SEGMENT_EXTENSIONS = {"gzip": ".warc.gz", "zstd": ".warc.zst"}
+
+# Start a new segment once the current one is this many bytes
+DEFAULT_SEGMENT_SIZE = 256 * 1024 * 1024
+
+
+def compress_record(data, compression):
+    """Compress one record as a standalone gzip member or zstd frame"""
+
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress_record(data, compression):
+    """Decompress one record written by compress_record"""
+
+    if compression == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+
+    return gzip.decompress(data)
+
+
+def make_warc_record(article_url, body):
+    """Wrap the page bytes in a WARC resource record"""
+
+    header = "\r\n".join([
+        "WARC/1.0",
+        "WARC-Type: resource",
+        "WARC-Record-ID: <urn:uuid:{}>".format(uuid.uuid4()),
+        "WARC-Date: {}".format(datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')),
+        "WARC-Target-URI: {}".format(article_url),
+        "Content-Type: text/html",
+        "Content-Length: {}".format(len(body)),
+        "", ""])
+
+    return header.encode("utf-8") + body + b"\r\n\r\n"
+
+
+def parse_warc_record(record):
+    """Return the page bytes from a WARC record made by make_warc_record"""
+
+    header, _, block = record.partition(b"\r\n\r\n")
+
+    for line in header.split(b"\r\n"): # Use the length so the body can hold anything
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            return block[:int(value)]
+
+    return block[:-len(b"\r\n\r\n")]
+
+
+def read_archive_record(segment_path, offset, length, compression="gzip"):
+    """Read one article's page bytes straight from an archive segment. This
+    only needs the index entry, so pool workers can read records without
+    opening the index"""
+
+    with open(segment_path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+
+    return parse_warc_record(decompress_record(data, compression))
+
+
+class ArticleArchive:
+    """This class stores the raw bytes of article pages in append only,
+    compressed WARC segments instead of one HTML file per article. Every
+    record is compressed on its own, and a SQLite index of each record's
+    segment, offset and length keyed by article UUID allows any article to
+    be read without decompressing the rest of its segment."""
+
+    def __init__(self, archive_dir="../_data/archive", compression="gzip",
+            segment_size=DEFAULT_SEGMENT_SIZE):
+        """Initialise the object"""
+
+        if compression not in SEGMENT_EXTENSIONS:
+            raise ValueError("Unknown compression {}".format(compression))
+
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("The zstandard package is needed for zstd compression")
+
+        self.archive_dir = archive_dir
+        self.compression = compression
+        self.segment_size = segment_size
+        makedirs(archive_dir, exist_ok=True)
+
+        # The connection is shared by the download threads, one at a time
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path.join(archive_dir, "index.sqlite"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS records (
+            uuid TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            segment TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            compression TEXT NOT NULL,
+            stored REAL NOT NULL)""")
+        self.conn.commit()
+
+        # Carry on appending to the newest segment
+        self.segment_number = self.conn.execute("SELECT COUNT(DISTINCT segment) FROM records").fetchone()[0]
+        self.segment_number = max(self.segment_number - 1, 0)
+        self.segment = None # Opened on the first append
+
+
+    def get_segment_path(self, segment_name):
+        """Return the full path of a segment"""
+        return path.join(self.archive_dir, segment_name)
+
+
+    def open_segment(self):
+        """Open the current segment for appending, starting a new segment
+        once the current one is full"""
+
+        while True:
+            segment_name = "articles-{:05d}{}".format(self.segment_number,
+                SEGMENT_EXTENSIONS[self.compression])
+            segment_path = self.get_segment_path(segment_name)
+
+            if path.exists(segment_path) and path.getsize(segment_path) >= self.segment_size:
+                self.segment_number += 1 # This segment is full
+
+            else:
+                self.segment_name = segment_name
+                self.segment = open(segment_path, "ab")
+                return
+
+
+    def __contains__(self, article_uuid):
+        """Check if an article is in the archive"""
+
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM records WHERE uuid = ?",
+                (article_uuid,)).fetchone() is not None
+
+
+    def append(self, article_uuid, article_url, body):
+        """Add an article's raw page bytes to the archive"""
+
+        record = compress_record(make_warc_record(article_url, body), self.compression)
+
+        with self.lock:
+            if self.segment is None:
+                self.open_segment()
+
+            # Append the record and note where it starts
+            offset = self.segment.tell()
+            self.segment.write(record)
+            self.segment.flush()
+
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (article_uuid, article_url, self.segment_name, offset, len(record),
+                    self.compression, time.time()))
+
+            # Start a new segment once this one is full
+            if offset + len(record) >= self.segment_size:
+                self.segment.close()
+                self.segment = None
+                self.segment_number += 1
+
+
+    def get(self, article_uuid):
+        """Return an article's raw page bytes, or None if it isn't archived"""
+
+        with self.lock:
+            row = self.conn.execute("SELECT segment, offset, length, compression FROM records WHERE uuid = ?",
+                (article_uuid,)).fetchone()
+
+        if row is None:
+            return None
+
+        segment_name, offset, length, compression = row
+
+        return read_archive_record(self.get_segment_path(segment_name), offset, length, compression)
+
+
+    def iter_index(self):
+        """Yield (uuid, url, segment path, offset, length, compression) for
+        every archived article, in the order they appear in the segments"""
+
+        with self.lock:
+            rows = self.conn.execute("""SELECT uuid, url, segment, offset, length, compression
+                FROM records ORDER BY segment, offset""").fetchall()
+
+        for article_uuid, article_url, segment_name, offset, length, compression in rows:
+            yield (article_uuid, article_url, self.get_segment_path(segment_name), offset,
+                length, compression)
+
+
+    def iter_records(self):
+        """Yield (uuid, url, page bytes) for every archived article, reading
+        each segment from start to finish"""
+
+        segment_path = None
+        f = None
+
+        for article_uuid, article_url, next_path, offset, length, compression in self.iter_index():
+            if next_path != segment_path: # Open each segment once
+                if f is not None:
+                    f.close()
+                segment_path = next_path
+                f = open(segment_path, "rb")
+
+            f.seek(offset)
+            yield (article_uuid, article_url,
+                parse_warc_record(decompress_record(f.read(length), compression)))
+
+        if f is not None:
+            f.close()
+
+
+    def close(self):
+        """Close the current segment and the index"""
+
+        with self.lock:
+            if self.segment is not None:
+                self.segment.close()
+                self.segment = None
+
+            self.conn.close()
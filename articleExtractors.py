@@ -0,0 +1,465 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T15:40:19+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: articleExtractors.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T15:40:19+10:00
+
+# Import packages
+import re
+import time
+import unicodedata
+from datetime import datetime
+from bs4 import Tag
+from crawlMetrics import metrics
+
+# Increase this whenever a change to the extractors changes their output, so
+# main_dataPreProcessing converts every article again
+EXTRACTOR_VERSION = 2
+
+# Classes of the paragraphs and headings in the data-component layout
+BODY_CLASS_PATTERN = re.compile(r"_1HzXw|_1EAJU hMmqO SYcM3 zwVFG _1BqKa _3AExf _3HiTE x9R1x pDrMR hmFfs _390V1")
+
+# Classes of the paragraphs to leave out of the article section layout
+EXCLUDED_CLASS_PATTERN = re.compile(r"published|topics|button")
+
+# data-component values of the byline authors
+BYLINE_PATTERN = re.compile(r"Link|ContentLink|Text")
+
+# Class of the Narrative layout body
+NARRATIVE_CLASS_PATTERN = re.compile("comp-rich-text article-text clearfix|comp-rich-text article-text clearfix Narrative-article")
+
+# The registered templates, in the order they're detected and fallen back to
+TEMPLATES = []
+
+
+def register_template(template_class):
+    """Add a template to the registry. Used as a class decorator"""
+    TEMPLATES.append(template_class())
+    return template_class
+
+
+def join_paragraphs(paragraphs):
+    """Join paragraph strings into the article text"""
+    return " ".join([each.replace("\n", " ") for each in paragraphs])
+
+
+class ArticleTemplate:
+    """This class extracts the fields of one ABC page template. The fields
+    that aren't overridden use the legacy layout's markup"""
+
+    name = None # Name used in the stats
+    markers = () # Strings in the raw HTML that identify the template
+
+    def matches(self, html):
+        """Check for the template's markers in the raw HTML"""
+        return any(marker in html for marker in self.markers)
+
+
+    def body_text(self, soup):
+        """Return the article text, or None if the template's body isn't found"""
+        return None
+
+
+    def extract(self, soup):
+        """Return a dictionary of the fields that aren't the body text"""
+
+        fields = {}
+
+        with metrics.timed("extract_seconds", field="byline"):
+            byline = self.byline(soup)
+        if byline:
+            fields["byline"] = byline
+
+        with metrics.timed("extract_seconds", field="related_keywords"):
+            keywords = self.keywords(soup)
+        if keywords is not None:
+            fields["related_keywords"] = keywords
+
+        with metrics.timed("extract_seconds", field="key_points"):
+            key_points = self.key_points(soup)
+        if key_points is not None:
+            fields["key_points"] = key_points
+
+        return fields
+
+
+    def byline(self, soup):
+        """Return the authors from a byline div"""
+
+        byline = soup.find("div", attrs={"class":"byline"})
+
+        if isinstance(byline, Tag) and len(byline) > 0:
+            byline_ = byline.find_all('a')
+
+            if len(byline_) == 1:
+                return [byline_[0].text.strip().replace("By ", "")]
+
+            # Use the last author that isn't a link to an ABC program
+            authors = [each.text.strip() for each in byline_ if "/programs/" not in each.get("href", "")]
+            if authors:
+                return authors[-1:]
+
+        return None
+
+
+    def keywords(self, soup):
+        """Return the topics linked in the topics paragraph"""
+
+        topics = soup.find("p", attrs={"class":"topics"})
+
+        if topics is None:
+            return None
+
+        return [each.text.strip() for each in topics.find_all("a")]
+
+
+    def key_points(self, soup):
+        """Return the subject list items, or the list in the inline content
+        box if there is one"""
+
+        key_points = None
+
+        subjects = [each.text.strip() for each in soup.find_all("li", attrs={"class":"topic-subject"})]
+        if len(subjects) > 0:
+            key_points = subjects
+            metrics.inc("extract_branch_total", field="key_points", branch="topic_subjects")
+
+        inline_content = soup.find("div", attrs={"class":"inline-content wysiwyg right"})
+        if inline_content is not None:
+            key_points = [each.text.strip() for each in inline_content.find_all("li")]
+            metrics.inc("extract_branch_total", field="key_points", branch="inline_content")
+
+        return key_points
+
+
+@register_template
+class DataComponentTemplate(ArticleTemplate):
+    """The current layout, marked up with data-component attributes and
+    generated class names"""
+
+    name = "data_component"
+    markers = ("_1HzXw", "_1EAJU")
+
+    def body_text(self, soup):
+        """Join the body paragraphs and headings"""
+
+        article_paragraphs = [each.text.strip() for each in soup.find_all(["p","h2"],
+            attrs={"class":BODY_CLASS_PATTERN})]
+
+        if len(article_paragraphs) == 0:
+            return None
+
+        return join_paragraphs(article_paragraphs)
+
+
+    def extract(self, soup):
+        """Return the data-component fields, falling back to the legacy markup"""
+
+        fields = {}
+
+        # ABC channel or Information Source
+        with metrics.timed("extract_seconds", field="info_source"):
+            info_source = soup.find(attrs={"data-component":"InfoSource"})
+            if isinstance(info_source, Tag):
+                for each in info_source.contents:
+                    if isinstance(each, Tag) and each.string is not None:
+                        fields["info_source"] = each.string.strip()
+
+        with metrics.timed("extract_seconds", field="byline"):
+            byline = self.byline(soup)
+        if byline:
+            fields["byline"] = byline
+
+        # Related ABC keywords
+        with metrics.timed("extract_seconds", field="related_keywords"):
+            related_topics = soup.find("div", attrs={"data-component":"RelatedTopics"})
+            keywords = None
+
+            if related_topics is not None:
+                keywords = [each.text.strip() for each in related_topics.find_all("a")]
+
+            if keywords: # Otherwise try the legacy topics
+                fields["related_keywords"] = keywords
+                metrics.inc("extract_branch_total", field="related_keywords", branch="related_topics")
+
+            else:
+                keywords = ArticleTemplate.keywords(self, soup)
+                metrics.inc("extract_branch_total", field="related_keywords", branch="legacy_topics")
+                if keywords is not None:
+                    fields["related_keywords"] = keywords
+
+        # If there are Key Points listed in the article
+        with metrics.timed("extract_seconds", field="key_points"):
+            key_points_box = soup.find(attrs={"data-component":"KeyPoints"})
+            key_points = []
+
+            if key_points_box is not None:
+                key_points = [unicodedata.normalize('NFKC', each.text.strip())
+                    for each in key_points_box.find_all("li")]
+
+            if len(key_points) > 0:
+                fields["key_points"] = key_points
+                metrics.inc("extract_branch_total", field="key_points", branch="key_points_box")
+
+            else:
+                # The subject list is only used when there are no related topics
+                if related_topics is None:
+                    key_points = ArticleTemplate.key_points(self, soup)
+
+                else:
+                    inline_content = soup.find("div", attrs={"class":"inline-content wysiwyg right"})
+                    key_points = None if inline_content is None else [each.text.strip()
+                        for each in inline_content.find_all("li")]
+                    if inline_content is not None:
+                        metrics.inc("extract_branch_total", field="key_points", branch="inline_content")
+
+                if key_points is not None:
+                    fields["key_points"] = key_points
+
+        # Updated date
+        with metrics.timed("extract_seconds", field="updated_date"):
+            for i, each in enumerate(soup.find_all("time",attrs={"data-component":"ScreenReaderOnly"})):
+                if i == 1 and each.string is not None:
+                    try: # Validate the string is in the accepted format for displaying on page
+                        datetime.strptime(each.string.strip(), '%A %d %b %Y at %I:%M%p')
+                    except ValueError:
+                        pass
+                    else:
+                        # Assume that the second element in this find is the updated article date if the actual HTML text
+                        # is the assumed datetime format
+                        fields["updated_date"] = each["datetime"]
+
+        return fields
+
+
+    def byline(self, soup):
+        """Return the authors from the Byline component, falling back to the
+        legacy byline div"""
+
+        byline = soup.find(attrs={"data-component":"Byline"})
+
+        if not (isinstance(byline, Tag) and len(byline) > 0): # If the byline wasn't found
+            metrics.inc("extract_branch_total", field="byline", branch="legacy_byline")
+            return ArticleTemplate.byline(self, soup)
+
+        # The authors are in the last tag inside the byline
+        byline_ = []
+        for each in byline.contents:
+            if isinstance(each, Tag):
+                byline_ = [auth.text.strip() for auth in each.find_all(attrs={"data-component":BYLINE_PATTERN})]
+
+        if len(byline_) > 0:
+            metrics.inc("extract_branch_total", field="byline", branch="byline_links")
+            return [each.replace("By ", "") for each in byline_]
+
+        text = byline.find(attrs={"data-component":"Text"})
+        if text is not None:
+            metrics.inc("extract_branch_total", field="byline", branch="byline_text")
+            return [text.text.strip().replace("By ", "")]
+
+        return None
+
+
+@register_template
+class LegacyBodyTemplate(ArticleTemplate):
+    """The 2012-era layout, with the article text in a span in div#body"""
+
+    name = "legacy_body"
+    markers = ('id="body"', "id='body'")
+
+    def body_text(self, soup):
+        """Return the text of the body span"""
+
+        body = soup.find("div", attrs={"id":"body"})
+
+        if body is None or body.span is None or body.span.string is None:
+            return None
+
+        return body.span.string.strip()
+
+
+@register_template
+class ArticleSectionTemplate(ArticleTemplate):
+    """The legacy layout with the article in div.article.section"""
+
+    name = "article_section"
+    markers = ('class="article section"', "class='article section'")
+
+    def body_text(self, soup):
+        """Join the section's paragraphs, headings and quotes, leaving out
+        the published date, topics and buttons and any repeated sentences"""
+
+        section = soup.find('div', attrs={"class":"article section"})
+
+        if section is None:
+            return None
+
+        article_paragraphs_ = [] # Set new list
+
+        # Clean the paragraphs list before joining to make text
+        for each in section.find_all(['p','h2','blockquote']):
+            # Check the paragraph's own class rather than searching the page for it
+            if each.name == "p" and EXCLUDED_CLASS_PATTERN.search(" ".join(each.get("class", []))):
+                continue
+
+            each_ = each.text.strip()
+            if each_ not in article_paragraphs_: # No repeating sentences
+                article_paragraphs_.append(each_)
+
+        if len(article_paragraphs_) == 0:
+            return None
+
+        return join_paragraphs(article_paragraphs_)
+
+
+@register_template
+class NarrativeTemplate(ArticleTemplate):
+    """The Narrative layout with the article in a comp-rich-text div"""
+
+    name = "narrative"
+    markers = ("comp-rich-text",)
+
+    def body_text(self, soup):
+        """Join the rich text paragraphs"""
+
+        article_paragraphs = soup.find("div", attrs={"class":NARRATIVE_CLASS_PATTERN})
+
+        if article_paragraphs is None or len(article_paragraphs) == 0:
+            return None
+
+        return " ".join([each.text.strip() for each in article_paragraphs.find_all("p")])
+
+
+@register_template
+class LayoutContainerTemplate(DataComponentTemplate):
+    """The data-component layout without the generated body classes, where
+    the article is in the LayoutContainer"""
+
+    name = "layout_container"
+    markers = ("LayoutContainer",)
+
+    def body_text(self, soup):
+        """Join the container's paragraphs, headings and asides"""
+
+        container = soup.find('div', attrs={'data-component':'LayoutContainer'})
+
+        if container is None:
+            return None
+
+        article_paragraphs = [each.text.strip() for each in container.find_all(['p','h2','aside'])]
+
+        if len(article_paragraphs) == 0:
+            return None
+
+        return join_paragraphs(article_paragraphs)
+
+
+class TemplateStats:
+    """This class counts how often each template is detected, how long its
+    extraction takes, and how often its body wasn't found and another
+    template's was used instead"""
+
+    def __init__(self):
+        """Initialise the object"""
+        self.counts = {}
+        self.seconds = {}
+        self.fallbacks = {}
+
+
+    def record(self, template_name, seconds, fallback=None):
+        """Record one article's extraction"""
+
+        self.counts[template_name] = self.counts.get(template_name, 0) + 1
+        self.seconds[template_name] = self.seconds.get(template_name, 0.0) + seconds
+
+        if fallback is not None: # Record which template the body came from instead
+            key = "{}->{}".format(template_name, fallback)
+            self.fallbacks[key] = self.fallbacks.get(key, 0) + 1
+
+
+    def drain(self):
+        """Return the stats recorded so far and start again. Pool workers
+        return these so the parent can merge them"""
+
+        snapshot = {"counts": self.counts, "seconds": self.seconds, "fallbacks": self.fallbacks}
+        self.__init__()
+
+        return snapshot
+
+
+    def merge(self, snapshot):
+        """Add the stats drained from another process"""
+
+        for key in ("counts", "seconds", "fallbacks"):
+            totals = getattr(self, key)
+            for name, value in snapshot[key].items():
+                totals[name] = totals.get(name, 0) + value
+
+
+    def report(self):
+        """Return a line per template, most common first"""
+
+        lines = []
+        for name, count in sorted(self.counts.items(), key=lambda item: -item[1]):
+            lines.append("{:<20} {:>8} articles {:>10.2f} ms/article".format(name, count,
+                1000 * self.seconds[name] / count))
+
+        for name, count in sorted(self.fallbacks.items(), key=lambda item: -item[1]):
+            lines.append("fallback {:<28} {:>8} articles".format(name, count))
+
+        return lines
+
+
+# The stats for the articles extracted in this process
+template_stats = TemplateStats()
+
+
+def detect_template(html):
+    """Return the first registered template whose markers are in the raw
+    HTML, or None if no template matches"""
+
+    for template in TEMPLATES:
+        if template.matches(html):
+            return template
+
+    return None
+
+
+def extract_article_fields(soup, html):
+    """Detect the page's template once and use it to extract the article
+    fields. If the template's body isn't found, the other templates' bodies
+    are tried in registry order. Returns the template name and the fields"""
+
+    start_time = time.perf_counter()
+
+    template = detect_template(html)
+    fallback = None
+
+    # Pages that don't match a template get every field extractor
+    fields = (template or TEMPLATES[0]).extract(soup)
+
+    with metrics.timed("extract_seconds", field="article_body_text"):
+        article_text = template.body_text(soup) if template is not None else None
+
+        if article_text is None: # Try the other layouts
+            for other in TEMPLATES:
+                if other is not template:
+                    article_text = other.body_text(soup)
+
+                    if article_text is not None:
+                        fallback = other.name
+                        break
+
+    metrics.inc("extract_branch_total", field="article_body_text",
+        branch=fallback or ("template" if article_text is not None else "not_found"))
+
+    if article_text is not None:
+        fields["article_body_text"] = article_text
+
+    template_name = template.name if template is not None else "unknown"
+    metrics.inc("templates_total", template=template_name)
+    template_stats.record(template_name, time.perf_counter() - start_time, fallback)
+
+    return template_name, fields
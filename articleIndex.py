@@ -0,0 +1,503 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T19:10:26+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: articleIndex.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T19:10:26+10:00
+
+# Import packages
+import hashlib
+import json
+import re
+import sqlite3
+import time
+import zlib
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+# Words are indexed lowercased, split on anything that isn't a word character
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# The record fields that are indexed, and the name each is queried by
+INDEXED_FIELDS = {"title": "title", "article_body_text": "body", "related_keywords": "keywords"}
+
+# Gap left between the items of a list field so phrases can't span two items
+ITEM_POSITION_GAP = 100
+
+# Splits a query into brackets, phrases and words
+QUERY_TOKEN_PATTERN = re.compile(r'\(|\)|(?:\w+:)?"[^"]*"|[^\s()]+')
+
+
+def tokenise(text):
+    """Return the lowercased words in text"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def encode_varint(value, out):
+    """Append an unsigned integer to a bytearray using 7 bits per byte"""
+
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+
+    out.append(value)
+
+
+def decode_varint(data, pos):
+    """Read an unsigned integer written by encode_varint. Returns the value
+    and the position after it"""
+
+    value = 0
+    shift = 0
+
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+
+        if byte < 0x80:
+            return value, pos
+
+        shift += 7
+
+
+def encode_postings(postings):
+    """Compress a posting list, a list of (doc ID, positions) sorted by doc
+    ID. Doc IDs and positions are stored as the gap from the one before"""
+
+    out = bytearray()
+    encode_varint(len(postings), out)
+
+    last_doc = 0
+    for doc_id, positions in postings:
+        encode_varint(doc_id - last_doc, out)
+        encode_varint(len(positions), out)
+        last_doc = doc_id
+
+        last_position = 0
+        for position in positions:
+            encode_varint(position - last_position, out)
+            last_position = position
+
+    return zlib.compress(bytes(out))
+
+
+def decode_postings(blob):
+    """Decompress a posting list written by encode_postings"""
+
+    data = zlib.decompress(blob)
+    count, pos = decode_varint(data, 0)
+
+    postings = []
+    doc_id = 0
+    for _ in range(count):
+        gap, pos = decode_varint(data, pos)
+        position_count, pos = decode_varint(data, pos)
+        doc_id += gap
+
+        positions = []
+        position = 0
+        for _ in range(position_count):
+            gap, pos = decode_varint(data, pos)
+            position += gap
+            positions.append(position)
+
+        postings.append((doc_id, positions))
+
+    return postings
+
+
+def to_date_bound(value):
+    """Turn a date, datetime or ISO string into a string that can be compared
+    with the posted dates"""
+
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%dT%H:%M:%S")
+
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+
+    return value
+
+
+class ArticleIndex:
+    """This class keeps an inverted index of the converted articles in a
+    SQLite database. The title, body text and related keywords are indexed
+    with word positions, so phrases can be searched for, and the posted date
+    is kept for each article so searches can be limited to a date range.
+
+    Each call to commit writes the new and changed articles as a new segment
+    of zlib compressed, delta encoded posting lists. Changed articles get a
+    new doc ID and their old one is marked as dead. optimize merges the
+    segments, drops the dead articles and renumbers the articles in posted
+    date order, so a date range is a run of doc IDs."""
+
+    def __init__(self, db_path="../_data/article_index.sqlite"):
+        """Initialise the object"""
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS docs (
+            doc_id INTEGER PRIMARY KEY,
+            record_id TEXT NOT NULL,
+            url TEXT,
+            title TEXT,
+            posted_date TEXT NOT NULL,
+            record_hash TEXT NOT NULL,
+            live INTEGER NOT NULL,
+            indexed REAL NOT NULL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS docs_record ON docs (record_id)")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS postings (
+            term TEXT NOT NULL,
+            segment INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (term, segment))""")
+        self.conn.commit()
+
+        # Articles added since the last commit
+        self.pending = {}
+
+        self.load_docs()
+
+
+    def load_docs(self):
+        """Load the posted date of every doc ID and the live doc ID of every
+        article into memory"""
+
+        self.doc_dates = [] # Posted date of each doc ID, including dead ones
+        self.live_docs = {} # Record ID to (doc ID, record hash)
+
+        for doc_id, record_id, posted_date, record_hash, live in self.conn.execute(
+                "SELECT doc_id, record_id, posted_date, record_hash, live FROM docs ORDER BY doc_id"):
+            self.doc_dates.append(posted_date)
+            if live:
+                self.live_docs[record_id] = (doc_id, record_hash)
+
+        self.live_ids = {doc_id for doc_id, _ in self.live_docs.values()}
+
+        # When doc IDs are in posted date order, date ranges can be found by bisecting
+        self.date_sorted = all(self.doc_dates[i] <= self.doc_dates[i + 1]
+            for i in range(len(self.doc_dates) - 1))
+
+        self.segment = self.conn.execute("SELECT COALESCE(MAX(segment), -1) FROM postings").fetchone()[0]
+
+
+    def __len__(self):
+        """Return the number of articles in the index"""
+        return len(self.live_docs)
+
+
+    def add(self, record_id, record):
+        """Queue an article record to be indexed by the next commit. Articles
+        that haven't changed since they were indexed are ignored. Returns
+        True if the article will be indexed"""
+
+        record_hash = hashlib.sha1(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+
+        live = self.live_docs.get(record_id)
+        if live is not None and live[1] == record_hash:
+            return False
+
+        self.pending[record_id] = (record_hash, record)
+
+        return True
+
+
+    def remove(self, record_id):
+        """Remove an article from the index"""
+
+        self.pending.pop(record_id, None)
+        live = self.live_docs.pop(record_id, None)
+
+        if live is not None:
+            self.live_ids.discard(live[0])
+            with self.conn:
+                self.conn.execute("UPDATE docs SET live = 0 WHERE doc_id = ?", (live[0],))
+
+
+    def commit(self):
+        """Write the queued articles to the index as a new segment. Returns
+        the number of articles written"""
+
+        if not self.pending:
+            return 0
+
+        # Number the new articles in posted date order
+        pending = sorted(self.pending.items(), key=lambda item: (item[1][1].get("posted_date") or "", item[0]))
+        self.pending = {}
+
+        first_id = len(self.doc_dates)
+        self.segment += 1
+        now = time.time()
+
+        doc_rows = []
+        dead_ids = []
+        term_postings = {}
+
+        for offset, (record_id, (record_hash, record)) in enumerate(pending):
+            doc_id = first_id + offset
+            posted_date = record.get("posted_date") or ""
+
+            # Collect the word positions in each indexed field
+            for field, name in INDEXED_FIELDS.items():
+                value = record.get(field)
+                if not value:
+                    continue
+
+                items = value if isinstance(value, list) else [value]
+                positions = {}
+                position = 0
+
+                for item in items:
+                    for word in tokenise(item):
+                        positions.setdefault("{}:{}".format(name, word), []).append(position)
+                        position += 1
+                    position += ITEM_POSITION_GAP
+
+                for term, term_positions in positions.items():
+                    term_postings.setdefault(term, []).append((doc_id, term_positions))
+
+            old = self.live_docs.get(record_id)
+            if old is not None:
+                dead_ids.append((old[0],))
+                self.live_ids.discard(old[0])
+
+            doc_rows.append((doc_id, record_id, record.get("url"), record.get("title"),
+                posted_date, record_hash, 1, now))
+            self.doc_dates.append(posted_date)
+            self.live_docs[record_id] = (doc_id, record_hash)
+            self.live_ids.add(doc_id)
+
+        with self.conn:
+            self.conn.executemany("UPDATE docs SET live = 0 WHERE doc_id = ?", dead_ids)
+            self.conn.executemany("INSERT INTO docs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", doc_rows)
+            self.conn.executemany("INSERT INTO postings VALUES (?, ?, ?)",
+                [(term, self.segment, encode_postings(postings))
+                for term, postings in term_postings.items()])
+
+        self.date_sorted = self.date_sorted and (first_id == 0
+            or self.doc_dates[first_id - 1] <= self.doc_dates[first_id])
+
+        return len(doc_rows)
+
+
+    def optimize(self):
+        """Merge all the segments into one, drop the dead articles and
+        renumber the articles in posted date order"""
+
+        self.commit()
+
+        # New doc IDs for the live articles, in posted date order
+        live = sorted(self.live_ids, key=lambda doc_id: (self.doc_dates[doc_id], doc_id))
+        new_ids = {old_id: new_id for new_id, old_id in enumerate(live)}
+
+        terms = [row[0] for row in self.conn.execute("SELECT DISTINCT term FROM postings")]
+
+        with self.conn:
+            merged = []
+            for term in terms:
+                postings = [(new_ids[doc_id], positions)
+                    for doc_id, positions in self.get_postings(term) if doc_id in new_ids]
+
+                if postings:
+                    postings.sort()
+                    merged.append((term, 0, encode_postings(postings)))
+
+            rows = self.conn.execute("""SELECT doc_id, record_id, url, title, posted_date,
+                record_hash, live, indexed FROM docs WHERE live = 1""").fetchall()
+
+            self.conn.execute("DELETE FROM postings")
+            self.conn.execute("DELETE FROM docs")
+            self.conn.executemany("INSERT INTO postings VALUES (?, ?, ?)", merged)
+            self.conn.executemany("INSERT INTO docs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(new_ids[row[0]],) + row[1:] for row in rows])
+
+        self.conn.execute("VACUUM")
+        self.load_docs()
+
+
+    def get_postings(self, term):
+        """Return the (doc ID, positions) list for a field:word term across
+        all segments, in doc ID order"""
+
+        postings = []
+
+        # Later segments only hold higher doc IDs, so they're appended in order
+        for (blob,) in self.conn.execute("SELECT data FROM postings WHERE term = ? ORDER BY segment", (term,)):
+            postings.extend(decode_postings(blob))
+
+        return postings
+
+
+    def field_names(self, field):
+        """Return the fields a query word is searched in"""
+
+        if field is None:
+            return list(INDEXED_FIELDS.values())
+
+        if field not in INDEXED_FIELDS.values():
+            raise ValueError("Unknown field {}. Use one of {}".format(field,
+                ", ".join(INDEXED_FIELDS.values())))
+
+        return [field]
+
+
+    def match_words(self, words, field=None):
+        """Return the doc IDs containing the words as a phrase, in the given
+        field or any field"""
+
+        docs = set()
+
+        for name in self.field_names(field):
+            matches = None
+
+            for i, word in enumerate(words):
+                # Shift the positions back so a phrase lines up on its first word
+                positions = {doc_id: {position - i for position in term_positions}
+                    for doc_id, term_positions in self.get_postings("{}:{}".format(name, word))}
+
+                if matches is None:
+                    matches = positions
+
+                else:
+                    matches = {doc_id: matches[doc_id] & term_positions
+                        for doc_id, term_positions in positions.items() if doc_id in matches}
+                    matches = {doc_id: starts for doc_id, starts in matches.items() if starts}
+
+                if not matches:
+                    break
+
+            docs.update(matches or ())
+
+        return docs
+
+
+    def parse_query(self, query):
+        """Split a query into its tokens"""
+        return QUERY_TOKEN_PATTERN.findall(query)
+
+
+    def evaluate(self, tokens, pos=0):
+        """Evaluate OR expressions. Returns the matching doc IDs and the
+        position of the next token"""
+
+        docs, pos = self.evaluate_and(tokens, pos)
+
+        while pos < len(tokens) and tokens[pos] == "OR":
+            right, pos = self.evaluate_and(tokens, pos + 1)
+            docs = docs | right
+
+        return docs, pos
+
+
+    def evaluate_and(self, tokens, pos):
+        """Evaluate AND expressions. Words next to each other are ANDed"""
+
+        docs, pos = self.evaluate_not(tokens, pos)
+
+        while pos < len(tokens) and tokens[pos] not in ("OR", ")"):
+            if tokens[pos] == "AND":
+                pos += 1
+            right, pos = self.evaluate_not(tokens, pos)
+            docs = docs & right
+
+        return docs, pos
+
+
+    def evaluate_not(self, tokens, pos):
+        """Evaluate NOT, words, phrases and bracketed expressions"""
+
+        if pos >= len(tokens):
+            raise ValueError("The query ended unexpectedly")
+
+        token = tokens[pos]
+
+        if token == "NOT":
+            docs, pos = self.evaluate_not(tokens, pos + 1)
+            return self.live_ids - docs, pos
+
+        if token == "(":
+            docs, pos = self.evaluate(tokens, pos + 1)
+            if pos >= len(tokens) or tokens[pos] != ")":
+                raise ValueError("A bracket in the query isn't closed")
+            return docs, pos + 1
+
+        # Words and phrases can be limited to one field, like title:school
+        field = None
+        if ":" in token and token.split(":", 1)[0] in INDEXED_FIELDS.values():
+            field, token = token.split(":", 1)
+
+        words = tokenise(token)
+        if not words:
+            return set(), pos + 1
+
+        return self.match_words(words, field), pos + 1
+
+
+    def search(self, query=None, start_date=None, end_date=None, limit=None):
+        """Return the articles matching a query, oldest first, as dictionaries
+        of the record ID, URL, title and posted date.
+
+        Queries are words and "quoted phrases" combined with AND, OR, NOT and
+        brackets. Words next to each other must all match. A word or phrase
+        can be limited to the title, body or keywords field, like
+        title:school or body:"year 12". start_date and end_date are dates,
+        datetimes or ISO strings and are both included; articles without a
+        posted date are left out when either is given"""
+
+        if query:
+            tokens = self.parse_query(query)
+            docs, pos = self.evaluate(tokens)
+            if pos != len(tokens):
+                raise ValueError("Couldn't read the query from {}".format(" ".join(tokens[pos:])))
+            docs = docs & self.live_ids
+
+        else:
+            docs = set(self.live_ids)
+
+        if start_date is not None or end_date is not None:
+            docs = self.filter_dates(docs, to_date_bound(start_date), to_date_bound(end_date))
+
+        doc_ids = sorted(docs, key=lambda doc_id: (self.doc_dates[doc_id], doc_id))
+        if limit is not None:
+            doc_ids = doc_ids[:limit]
+
+        return self.get_docs(doc_ids)
+
+
+    def filter_dates(self, docs, start_date, end_date):
+        """Keep the doc IDs posted between the start and end dates"""
+
+        if self.date_sorted: # The date range is a run of doc IDs
+            low = bisect_left(self.doc_dates, start_date) if start_date else 0
+            # The end date includes every time within it, whatever its precision
+            high = (bisect_right(self.doc_dates, end_date + "\uffff") if end_date
+                else len(self.doc_dates))
+            low = max(low, bisect_right(self.doc_dates, "")) # Skip articles without a date
+            return {doc_id for doc_id in docs if low <= doc_id < high}
+
+        return {doc_id for doc_id in docs if self.doc_dates[doc_id]
+            and (not start_date or self.doc_dates[doc_id] >= start_date)
+            and (not end_date or self.doc_dates[doc_id][:len(end_date)] <= end_date)}
+
+
+    def get_docs(self, doc_ids):
+        """Return the stored details of the doc IDs, in the order given"""
+
+        details = {}
+        for i in range(0, len(doc_ids), 500): # Stay under SQLite's variable limit
+            batch = doc_ids[i:i + 500]
+            details.update((row[0], row[1:]) for row in self.conn.execute(
+                "SELECT doc_id, record_id, url, title, posted_date FROM docs WHERE doc_id IN ({})".format(
+                ",".join("?" * len(batch))), batch))
+
+        return [dict(zip(("record_id", "url", "title", "posted_date"), details[doc_id]))
+            for doc_id in doc_ids]
+
+
+    def close(self):
+        """Commit any queued articles and close the database connection"""
+        self.commit()
+        self.conn.close()
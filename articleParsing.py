@@ -0,0 +1,100 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T14:52:40+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: articleParsing.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T14:52:40+10:00
+
+# Import packages
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.builder import builder_registry
+
+# The parsers BeautifulSoup can build the article tree with, fastest first.
+# lxml is several times faster than Python's html.parser
+PARSER_BACKENDS = ("lxml", "html5lib", "html.parser")
+
+# The parser used when none is chosen
+DEFAULT_PARSER = "html.parser"
+
+# Tags article_html_to_json reads, kept by the partial parse
+ARTICLE_TAG_NAMES = {"title", "h1", "time"}
+
+# data-component values of the subtrees article_html_to_json reads
+ARTICLE_DATA_COMPONENTS = {"InfoSource", "Byline", "RelatedTopics", "KeyPoints",
+    "LayoutContainer"}
+
+# Classes of the legacy layout subtrees article_html_to_json reads, by tag
+ARTICLE_CLASSES = {
+    "span": ("timestamp",),
+    "p": ("published", "topics", "_1HzXw", "_1EAJU"),
+    "h2": ("_1HzXw", "_1EAJU"),
+    "li": ("topic-subject",),
+    "div": ("article section", "comp-rich-text", "byline", "inline-content wysiwyg right"),
+    }
+
+
+def get_parser_backend(parser=DEFAULT_PARSER):
+    """Check that a parser is installed and return its name. If parser is
+    "fastest", the fastest installed parser is returned"""
+
+    if parser == "fastest":
+        for each in PARSER_BACKENDS:
+            if builder_registry.lookup(each) is not None:
+                return each
+
+    if builder_registry.lookup(parser) is None:
+        raise ValueError("The {} parser isn't installed".format(parser))
+
+    return parser
+
+
+def is_article_tag(tag, attrs=None):
+    """Return True for the tags article_html_to_json reads. BeautifulSoup
+    passes either a Tag, or a tag name and attributes while it's parsing"""
+
+    if isinstance(tag, Tag):
+        name, attrs = tag.name, tag.attrs
+
+    else:
+        name, attrs = tag, attrs or {}
+
+    if name in ARTICLE_TAG_NAMES:
+        return True
+
+    if attrs.get("id") == "body" or attrs.get("data-component") in ARTICLE_DATA_COMPONENTS:
+        return True
+
+    # Classes are a string while parsing and a list once parsed
+    classes = attrs.get("class")
+    if isinstance(classes, list):
+        classes = " ".join(classes)
+
+    if classes:
+        return any(each in classes for each in ARTICLE_CLASSES.get(name, ()))
+
+    return False
+
+
+class ArticleStrainer(SoupStrainer):
+    """A SoupStrainer that keeps the tags is_article_tag matches. Older
+    versions of BeautifulSoup pass the name and attributes to the name
+    function, newer versions only pass the name, so the attributes are
+    checked here too"""
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        """Decide whether to build a tag from its name and attributes"""
+        return is_article_tag(name, attrs)
+
+
+# Only build the parts of the page article_html_to_json reads
+ARTICLE_STRAINER = ArticleStrainer(is_article_tag)
+
+# Only build the headings and paragraphs get_articles_selected_words reads
+TEXT_STRAINER = SoupStrainer(["h1", "h2", "p"])
+
+
+def make_article_soup(html, parser=DEFAULT_PARSER, strainer=None):
+    """Parse a page with the chosen parser. If a strainer is passed, only
+    the tags it matches and their contents are built"""
+    return BeautifulSoup(html, parser, parse_only=strainer)
@@ -0,0 +1,142 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T19:42:03+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: articleTimestamps.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T19:42:03+10:00
+
+# Import packages
+import re
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import pytz
+
+# The format every date field is saved in, always UTC
+UTC_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+# Times written out on the page are Australian Eastern Time
+LOCAL_TIMEZONE = pytz.timezone('Australia/Melbourne')
+
+# Formats the ABC has written timestamps in. "iso" is an ISO 8601 string,
+# like the datetime attribute of a time tag, and is assumed to be UTC if it
+# has no offset. The others are local times
+TIMESTAMP_FORMATS = (
+    "iso",
+    '%b %d, %Y at %H:%M:%S', # Oct 30, 2013 at 10:22:00
+    '%B %d, %Y %H:%M:%S', # October 30, 2013 10:22:00
+    '%A %d %b %Y at %I:%M%p', # Wednesday 30 Oct 2013 at 10:22am
+    '%B %d, %Y', # October 30, 2013
+    '%d %B %Y', # 30 October 2013
+    )
+
+# Runs of letters and digits, replaced to get a timestamp's shape
+LETTERS_PATTERN = re.compile(r"[^\W\d_]+")
+DIGITS_PATTERN = re.compile(r"\d")
+
+# The format that parsed each timestamp shape, or None if none did
+FORMAT_BY_SHAPE = {}
+
+
+def get_timestamp_shape(timestamp_str):
+    """Return a timestamp with its words replaced by "a" and its digits by
+    "9". Timestamps written in the same format have the same shape, so
+    "Oct 30, 2013 at 10:22:00" and "Nov 01, 2013 at 09:05:00" are both
+    "a 99, 9999 a 99:99:99" """
+    return DIGITS_PATTERN.sub("9", LETTERS_PATTERN.sub("a", timestamp_str))
+
+
+def parse_with_format(timestamp_str, timestamp_format):
+    """Parse a timestamp in a format and convert it to UTC. Raises
+    ValueError if it isn't in that format"""
+
+    if timestamp_format == "iso":
+        # Before Python 3.11 fromisoformat doesn't read a trailing Z
+        parsed = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+
+        if parsed.tzinfo is None:
+            return pytz.utc.localize(parsed)
+
+        return parsed.astimezone(pytz.utc)
+
+    parsed = datetime.strptime(timestamp_str, timestamp_format)
+
+    return LOCAL_TIMEZONE.localize(parsed).astimezone(pytz.utc)
+
+
+@lru_cache(maxsize=65536)
+def parse_article_timestamp(timestamp_str):
+    """Return a timestamp as a UTC datetime, or None if it's not in a known
+    format. The format is only searched for the first time a shape is seen,
+    and repeated timestamps are returned from memory"""
+
+    if not timestamp_str:
+        return None
+
+    timestamp_str = timestamp_str.strip()
+    shape = get_timestamp_shape(timestamp_str)
+
+    if shape in FORMAT_BY_SHAPE:
+        timestamp_format = FORMAT_BY_SHAPE[shape]
+
+        if timestamp_format is None:
+            return None
+
+        try:
+            return parse_with_format(timestamp_str, timestamp_format)
+
+        except ValueError: # Same shape but not the same format
+            pass
+
+    for timestamp_format in TIMESTAMP_FORMATS:
+        try:
+            parsed = parse_with_format(timestamp_str, timestamp_format)
+
+        except ValueError:
+            continue
+
+        FORMAT_BY_SHAPE[shape] = timestamp_format
+
+        return parsed
+
+    FORMAT_BY_SHAPE.setdefault(shape, None)
+
+    return None
+
+
+@lru_cache(maxsize=65536)
+def standardise_article_timestamps(timestamp_str):
+    """ This function converts the timestamp forms in ABC articles to UTC
+    in the %Y-%m-%dT%H:%M:%S.%fZ format, or returns None if the timestamp
+    isn't in a known format """
+
+    parsed = parse_article_timestamp(timestamp_str)
+
+    return None if parsed is None else parsed.strftime(UTC_FORMAT)
+
+
+def timestamps_to_datetime64(timestamps):
+    """Convert many timestamps at once to a numpy datetime64 array in UTC,
+    with NaT for the ones that aren't in a known format. Each distinct
+    timestamp is only parsed once"""
+
+    strings = np.array([each or "" for each in timestamps], dtype=str)
+    unique, inverse = np.unique(strings, return_inverse=True)
+
+    parsed = [parse_article_timestamp(each) for each in unique]
+    converted = np.array([np.datetime64(each.replace(tzinfo=None), "us") if each is not None
+        else np.datetime64("NaT", "us") for each in parsed], dtype="datetime64[us]")
+
+    return converted[inverse.reshape(-1)]
+
+
+def standardise_timestamps(timestamps):
+    """Convert many timestamps at once to the %Y-%m-%dT%H:%M:%S.%fZ format,
+    with None for the ones that aren't in a known format"""
+
+    converted = timestamps_to_datetime64(timestamps)
+    formatted = np.datetime_as_string(converted, unit="us")
+
+    return [None if missing else each + "Z"
+        for each, missing in zip(formatted.tolist(), np.isnat(converted).tolist())]
@@ -0,0 +1,195 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T20:06:51+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: benchmarkCorpus.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T20:06:51+10:00
+
+# Import packages
+import random
+import subprocess
+from datetime import datetime, timedelta
+from os import path, makedirs
+
+# Words the synthetic articles are written from. The education words make
+# sure get_articles_selected_words has something to find
+VOCABULARY = ("the a of to and in for on with that school schools student students "
+    "teacher teachers people parents education university year funding minister "
+    "government report class classes exam results principal community said new "
+    "state federal children learning program support research data week local").split()
+
+# Topics used for the keywords and the slugs
+TOPICS = ("Education", "Schools", "Secondary Schools", "Primary Schools",
+    "University and Further Education", "Teachers", "Government and Politics")
+
+# Authors used for the bylines
+AUTHORS = ("Jane Citizen", "Sam Reporter", "Alex Writer", "Jordan Journalist")
+
+
+def make_sentence(rng, min_words=8, max_words=24):
+    """Return a sentence of random words"""
+    words = [rng.choice(VOCABULARY) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def make_paragraphs(rng, min_paragraphs=6, max_paragraphs=16):
+    """Return a list of paragraphs of random sentences"""
+    return [" ".join(make_sentence(rng) for _ in range(rng.randint(1, 4)))
+        for _ in range(rng.randint(min_paragraphs, max_paragraphs))]
+
+
+def make_page_noise(rng, noise_kb):
+    """Return navigation links and a script of about noise_kb kilobytes, like
+    the menus and page data around a real ABC article"""
+
+    links = "".join('<li><a href="/news/{0}">{0}</a></li>'.format(rng.choice(TOPICS))
+        for _ in range(40))
+    script = " ".join(rng.choice(VOCABULARY) for _ in range(noise_kb * 160))
+
+    return ('<nav><ul>{}</ul></nav><script type="application/json">{{"data": "{}"}}</script>'
+        .format(links, script))
+
+
+def data_component_body(rng, posted, updated, paragraphs, topics, author):
+    """The current layout, with generated body classes"""
+
+    body = "".join('<p class="_1HzXw">{}</p>'.format(each) if i % 5 else
+        '<h2 class="_1HzXw">{}</h2>'.format(each[:40]) for i, each in enumerate(paragraphs))
+
+    return ('<div data-component="InfoSource"><a>ABC News</a></div>'
+        '<div data-component="Byline"><div><a data-component="Link">By {author}</a></div></div>'
+        '<time data-component="Timestamp" datetime="{posted}">x</time>'
+        '<time data-component="ScreenReaderOnly" datetime="{posted}">{posted_text}</time>'
+        '<time data-component="ScreenReaderOnly" datetime="{updated}">{updated_text}</time>'
+        '<div data-component="KeyPoints"><ul><li>{point}</li></ul></div>'
+        '<div>{body}</div>'
+        '<div data-component="RelatedTopics">{topics}</div>').format(author=author,
+        posted=posted.strftime("%Y-%m-%dT%H:%M:%S.000Z"), posted_text=posted.strftime("%A %d %b %Y at %I:%M%p"),
+        updated=updated.strftime("%Y-%m-%dT%H:%M:%S.000Z"), updated_text=updated.strftime("%A %d %b %Y at %I:%M%p"),
+        point=paragraphs[0][:60], body=body, topics="".join("<a>{}</a>".format(each) for each in topics))
+
+
+def layout_container_body(rng, posted, updated, paragraphs, topics, author):
+    """The data-component layout without the generated body classes"""
+
+    body = "".join("<p>{}</p>".format(each) if i % 7 else "<aside>{}</aside>".format(each)
+        for i, each in enumerate(paragraphs))
+
+    return ('<div data-component="Byline"><div><span data-component="Text">By {author}</span></div></div>'
+        '<time data-component="Timestamp" datetime="{posted}">x</time>'
+        '<div data-component="LayoutContainer">{body}</div>'
+        '<div data-component="RelatedTopics">{topics}</div>').format(author=author,
+        posted=posted.strftime("%Y-%m-%dT%H:%M:%S.000Z"), body=body,
+        topics="".join("<a>{}</a>".format(each) for each in topics))
+
+
+def legacy_body_body(rng, posted, updated, paragraphs, topics, author):
+    """The 2012-era layout, with one timestamp and the text in a span"""
+
+    return ('<div class="byline"><a href="/news/{slug}">By {author}</a></div>'
+        '<p class="published"><span class="timestamp">{posted}</span></p>'
+        '<div id="body"><span>{body}</span></div>'
+        '<p class="topics">{topics}</p>').format(author=author, slug=author.lower().replace(" ", "-"),
+        posted=posted.strftime("%b %d, %Y at %H:%M:%S"), body=" ".join(paragraphs),
+        topics="".join("<a>{}</a>".format(each) for each in topics))
+
+
+def article_section_body(rng, posted, updated, paragraphs, topics, author):
+    """The legacy layout with published and updated timestamps"""
+
+    body = "".join("<p>{}</p>".format(each) if i % 6 else "<blockquote>{}</blockquote>".format(each)
+        for i, each in enumerate(paragraphs))
+
+    return ('<div class="article section">'
+        '<p class="published"><span class="timestamp">{posted}</span> '
+        'Updated <span class="timestamp">{updated}</span></p>'
+        '<div class="byline"><a href="/news/{slug}">By {author}</a></div>'
+        '{body}<p class="topics">{topics}</p></div>'
+        '<ul><li class="topic-subject">{subject}</li></ul>').format(author=author,
+        slug=author.lower().replace(" ", "-"), posted=posted.strftime("%B %d, %Y %H:%M:%S"),
+        updated=updated.strftime("%B %d, %Y %H:%M:%S"), body=body, subject=topics[0],
+        topics="".join("<a>{}</a>".format(each) for each in topics))
+
+
+def narrative_body(rng, posted, updated, paragraphs, topics, author):
+    """The Narrative layout with the text in a comp-rich-text div"""
+
+    return ('<div class="byline"><a href="/news/{slug}">By {author}</a></div>'
+        '<time datetime="{posted}">x</time>'
+        '<div class="comp-rich-text article-text clearfix">{body}</div>'
+        '<p class="topics">{topics}</p>').format(author=author, slug=author.lower().replace(" ", "-"),
+        posted=posted.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        body="".join("<p>{}</p>".format(each) for each in paragraphs),
+        topics="".join("<a>{}</a>".format(each) for each in topics))
+
+
+# Builds the article markup for each page template in articleExtractors
+TEMPLATE_BUILDERS = {
+    "data_component": data_component_body,
+    "layout_container": layout_container_body,
+    "legacy_body": legacy_body_body,
+    "article_section": article_section_body,
+    "narrative": narrative_body,
+    }
+
+
+def make_article_page(rng, template_name, posted, noise_kb=40):
+    """Return the HTML of a synthetic article in one of the page templates"""
+
+    title = make_sentence(rng, 4, 10)[:-1]
+    updated = posted + timedelta(hours=rng.randint(1, 48))
+    topics = rng.sample(TOPICS, rng.randint(1, 3))
+
+    body = TEMPLATE_BUILDERS[template_name](rng, posted, updated, make_paragraphs(rng),
+        topics, rng.choice(AUTHORS))
+
+    return ("<!DOCTYPE html><html><head><title>{title} - ABC News</title></head>"
+        "<body>{noise}<h1>{title}</h1>{body}</body></html>").format(title=title,
+        noise=make_page_noise(rng, noise_kb), body=body)
+
+
+def generate_corpus(corpus_dir="../_data/benchmark/articles", articles_per_template=200,
+        seed=2022, noise_kb=40):
+    """Write articles_per_template synthetic articles for each page template
+    to corpus_dir, named like the downloaded articles, and return their
+    filepaths. The same seed always writes the same pages"""
+
+    makedirs(corpus_dir, exist_ok=True)
+    rng = random.Random(seed)
+
+    first_date = datetime(2012, 1, 1)
+    filepaths = []
+
+    for template_name in TEMPLATE_BUILDERS:
+        for i in range(articles_per_template):
+            posted = first_date + timedelta(minutes=rng.randint(0, 11 * 365 * 24 * 60))
+            html = make_article_page(rng, template_name, posted, noise_kb)
+
+            filepath = path.join(corpus_dir, "news_{}_{}_{}.html".format(posted.strftime("%Y-%m-%d"),
+                template_name.replace("_", "-"), 1000000 + len(filepaths)))
+
+            with open(filepath, "w") as f:
+                f.write(html)
+
+            filepaths.append(filepath)
+
+    return filepaths
+
+
+def get_git_commit():
+    """Return the commit of the code being benchmarked and whether it has
+    uncommitted changes"""
+
+    repo_dir = path.dirname(path.abspath(__file__))
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+            text=True, check=True, cwd=repo_dir).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True, cwd=repo_dir).stdout.strip())
+
+    except (OSError, subprocess.CalledProcessError): # Not run from a git checkout
+        return "unknown", False
+
+    return commit, dirty
@@ -0,0 +1,173 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T22:41:50+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: concurrencyController.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T22:41:50+10:00
+
+# Import packages
+import asyncio
+import logging
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from crawlMetrics import metrics
+from crawlLogging import log_event
+
+# Statuses that mean the server wants fewer requests
+OVERLOAD_STATUSES = (429, 503)
+
+# Longest Retry-After pause that's obeyed, in seconds
+MAX_PAUSE = 300
+
+# Weight of the newest response in the smoothed latency
+LATENCY_SMOOTHING = 0.2
+
+# How quickly the baseline latency rises back towards the smoothed latency,
+# so a server that has become slower for good isn't treated as overloaded
+BASELINE_DRIFT = 0.01
+
+
+def parse_retry_after(value):
+    """Return the seconds to wait from a Retry-After header, which is either
+    a number of seconds or a HTTP date, or None if it can't be read"""
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+
+    except ValueError: # Not a number, so try a date
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+
+        except (TypeError, ValueError):
+            return None
+
+
+class AIMDController:
+    """This class limits the number of requests in flight to one host and
+    adjusts the limit the way TCP adjusts its window. Each response that
+    comes back in reasonable time adds about one request to the limit per
+    round trip, and a 429, a 503, a failed request or latency well above the
+    baseline halves it, at most once per round trip. A Retry-After header
+    stops new requests to the host until it has passed. The limit is kept
+    between min_limit and max_limit and published as the
+    fetch_concurrency_limit gauge."""
+
+    def __init__(self, name, initial_limit=2, min_limit=1, max_limit=20, increase=1.0,
+            decrease=0.5, latency_tolerance=2.0):
+        """Initialise the object. A response slower than latency_tolerance
+        times the baseline latency counts as the server being overloaded"""
+        self.name = name # The host, used to label the metrics
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+
+        self.in_flight = 0
+        self.waiters = deque() # Futures of the requests waiting for a slot
+        self.paused_until = 0.0 # Monotonic time a Retry-After ends
+
+        self.smoothed_latency = None
+        self.baseline_latency = None
+        self.last_decrease = 0.0
+
+        metrics.set_gauge("fetch_concurrency_limit", int(self.limit), host=self.name)
+
+
+    async def acquire(self):
+        """Wait until the host isn't paused and there's a free slot, and
+        take it"""
+
+        while True:
+            pause = self.paused_until - time.monotonic()
+
+            if pause > 0: # The server asked for a break
+                await asyncio.sleep(pause)
+
+            elif self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+
+            else: # Wait for a request to finish
+                waiter = asyncio.get_running_loop().create_future()
+                self.waiters.append(waiter)
+                await waiter
+
+
+    def _wake_waiters(self):
+        """Let waiting requests check for a slot again"""
+
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+    def release(self, status, elapsed, retry_after=None):
+        """Give back a slot and adjust the limit. status is None if the
+        request failed without a response"""
+
+        self.in_flight -= 1
+        now = time.monotonic()
+
+        if status is not None and status < 400:
+            # Follow the latency, keeping the lowest seen as the baseline
+            if self.smoothed_latency is None:
+                self.smoothed_latency = elapsed
+
+            else:
+                self.smoothed_latency += (elapsed - self.smoothed_latency) * LATENCY_SMOOTHING
+
+            if self.baseline_latency is None or self.smoothed_latency < self.baseline_latency:
+                self.baseline_latency = self.smoothed_latency
+
+            else:
+                self.baseline_latency += (self.smoothed_latency - self.baseline_latency) * BASELINE_DRIFT
+
+        if status in OVERLOAD_STATUSES:
+            pause = parse_retry_after(retry_after)
+            if pause: # Don't start any more requests until the server is ready
+                self.paused_until = max(self.paused_until, now + min(pause, MAX_PAUSE))
+
+            self._decrease(now, "throttled" if status == 429 else "unavailable")
+
+        elif status is None:
+            self._decrease(now, "error")
+
+        elif status >= 400: # Other errors, like a 404, say nothing about the load
+            pass
+
+        elif self.smoothed_latency > self.latency_tolerance * self.baseline_latency:
+            self._decrease(now, "latency")
+
+        elif self.in_flight + 1 >= int(self.limit):
+            # Only grow while the current limit is being used. Adding
+            # increase / limit for each response adds about increase per
+            # round trip
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            metrics.set_gauge("fetch_concurrency_limit", int(self.limit), host=self.name)
+
+        self._wake_waiters()
+
+
+    def _decrease(self, now, reason):
+        """Cut the limit, unless it was cut within the last round trip"""
+
+        if now - self.last_decrease < (self.smoothed_latency or 0.0):
+            return # The responses already in flight were sent at the old limit
+
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+
+        metrics.set_gauge("fetch_concurrency_limit", int(self.limit), host=self.name)
+        metrics.inc("fetch_concurrency_decreases_total", host=self.name, reason=reason)
+        log_event("concurrency", "decreased", None, logging.INFO, host=self.name,
+            limit=int(self.limit), reason=reason)
@@ -0,0 +1,118 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T16:35:02+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: conversionManifest.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T16:35:02+10:00
+
+# Import packages
+import sqlite3
+import time
+from os import path
+
+
+class ConversionManifest:
+    """This class records, for every converted article, a hash of the HTML it
+    was converted from, the extractor version that converted it and where the
+    output went. main_dataPreProcessing uses it to only convert articles that
+    are new, have changed, were converted by an older extractor, failed to
+    convert, or whose output is missing or somewhere else."""
+
+    def __init__(self, db_path="../_data/conversion_manifest.sqlite"):
+        """Initialise the object"""
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS conversions (
+            source TEXT PRIMARY KEY,
+            source_hash TEXT NOT NULL,
+            source_size INTEGER,
+            source_mtime REAL,
+            extractor_version INTEGER NOT NULL,
+            output TEXT,
+            success INTEGER NOT NULL,
+            converted REAL NOT NULL)""")
+        self.conn.commit()
+
+        # Load the manifest into memory so checking an article only stats its output
+        self.entries = {row[0]: row[1:] for row in self.conn.execute(
+            "SELECT source, source_hash, source_size, source_mtime, extractor_version, output, success "
+            "FROM conversions")}
+
+
+    def __len__(self):
+        """Return the number of articles in the manifest"""
+        return len(self.entries)
+
+
+    def has_output(self, source, extractor_version, output_dir):
+        """Check if an article was converted by this extractor version and
+        its output is still in output_dir. Failed conversions are never
+        counted, so they're tried again"""
+
+        entry = self.entries.get(source)
+
+        if entry is None:
+            return False
+
+        source_hash, source_size, source_mtime, entry_version, output, success = entry
+
+        return (entry_version == extractor_version and success == 1 and output is not None
+            and path.dirname(output) == output_dir and path.exists(output))
+
+
+    def is_current(self, source, size, mtime, extractor_version, output_dir):
+        """Check if a source file is unchanged since it was converted by this
+        extractor version, going by its size and modified time, and its
+        output is in output_dir"""
+
+        if not self.has_output(source, extractor_version, output_dir):
+            return False
+
+        source_hash, source_size, source_mtime = self.entries[source][:3]
+
+        return source_size == size and source_mtime == mtime
+
+
+    def get_known_hash(self, source, extractor_version, output_dir):
+        """Return the hash an article was converted from, or None if it needs
+        converting again whether it's changed or not"""
+
+        if not self.has_output(source, extractor_version, output_dir):
+            return None
+
+        return self.entries[source][0]
+
+
+    def record_many(self, rows):
+        """Record conversions. Each row is (source, source hash, size,
+        modified time, extractor version, output, success)"""
+
+        now = time.time()
+
+        for source, source_hash, size, mtime, extractor_version, output, success in rows:
+            self.entries[source] = (source_hash, size, mtime, extractor_version, output, success)
+
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO conversions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [row + (now,) for row in rows])
+
+
+    def touch_many(self, rows):
+        """Record the new size and modified time of files whose contents
+        haven't changed. Each row is (source, size, modified time)"""
+
+        for source, size, mtime in rows:
+            source_hash, _, _, extractor_version, output, success = self.entries[source]
+            self.entries[source] = (source_hash, size, mtime, extractor_version, output, success)
+
+        with self.conn:
+            self.conn.executemany("UPDATE conversions SET source_size = ?, source_mtime = ? WHERE source = ?",
+                [(size, mtime, source) for source, size, mtime in rows])
+
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
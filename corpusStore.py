@@ -0,0 +1,151 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T17:22:48+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: corpusStore.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T17:22:48+10:00
+
+# Import packages
+import gzip
+import json
+import re
+from os import path, makedirs, scandir
+
+# Name of the file listing where every record is
+MANIFEST_FILENAME = "manifest.tsv"
+
+# Shard filenames look like part-00012.jsonl or part-00012.jsonl.gz
+SHARD_PATTERN = re.compile(r"part-(\d+)\.jsonl(\.gz)?$")
+
+# Size of the write buffers, so records are written in large blocks
+BUFFER_SIZE = 1024 * 1024
+
+
+class CorpusWriter:
+    """This class writes article records into JSON lines shards instead of
+    one JSON file per article. A new shard is started every records_per_shard
+    records and can be gzip compressed. Each record's shard, offset and
+    length are appended to a manifest. Offsets in compressed shards are
+    positions in the decompressed stream."""
+
+    def __init__(self, corpus_dir="../_data/corpus", records_per_shard=10000, compress=False):
+        """Initialise the object"""
+        self.corpus_dir = corpus_dir
+        self.records_per_shard = records_per_shard
+        self.compress = compress
+        makedirs(corpus_dir, exist_ok=True)
+
+        # Carry on after the shards written by previous runs
+        shard_numbers = [int(SHARD_PATTERN.match(entry.name).group(1))
+            for entry in scandir(corpus_dir) if SHARD_PATTERN.match(entry.name)]
+        self.shard_number = max(shard_numbers) + 1 if shard_numbers else 0
+
+        self.shard = None # Opened on the first write
+        self.manifest = open(path.join(corpus_dir, MANIFEST_FILENAME), "a", buffering=BUFFER_SIZE)
+        self.record_count = 0 # Records written by this writer
+
+
+    def open_shard(self):
+        """Start a new shard"""
+
+        self.shard_name = "part-{:05d}.jsonl{}".format(self.shard_number, ".gz" if self.compress else "")
+        shard_path = path.join(self.corpus_dir, self.shard_name)
+
+        if self.compress:
+            self.shard = gzip.open(shard_path, "wb", compresslevel=6)
+
+        else:
+            self.shard = open(shard_path, "wb", buffering=BUFFER_SIZE)
+
+        self.shard_offset = 0
+        self.shard_records = 0
+        self.shard_number += 1
+
+
+    def write(self, record_id, record):
+        """Write one record. record_id is usually the article's source file"""
+
+        if self.shard is None:
+            self.open_shard()
+
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        self.shard.write(line)
+
+        self.manifest.write("{}\t{}\t{}\t{}\n".format(record_id, self.shard_name,
+            self.shard_offset, len(line)))
+
+        self.shard_offset += len(line)
+        self.shard_records += 1
+        self.record_count += 1
+
+        if self.shard_records >= self.records_per_shard: # Start a new shard
+            self.shard.close()
+            self.shard = None
+
+
+    def close(self):
+        """Flush and close the shard and the manifest"""
+
+        if self.shard is not None:
+            self.shard.close()
+            self.shard = None
+
+        self.manifest.close()
+
+
+def read_corpus_manifest(corpus_dir="../_data/corpus"):
+    """Return the latest (shard, offset, length) for each record ID. A
+    record written again by a later run replaces the earlier one"""
+
+    latest = {}
+
+    with open(path.join(corpus_dir, MANIFEST_FILENAME), "r") as f:
+        for line in f:
+            record_id, shard_name, offset, length = line.rstrip("\n").split("\t")
+            latest[record_id] = (shard_name, int(offset), int(length))
+
+    return latest
+
+
+def iter_corpus_records(corpus_dir="../_data/corpus"):
+    """Yield (record ID, record) for the latest copy of every record in the
+    shards, reading each shard from start to finish"""
+
+    # Look up the records to keep by where they are
+    keep = {(shard_name, offset): record_id
+        for record_id, (shard_name, offset, length) in read_corpus_manifest(corpus_dir).items()}
+
+    shard_names = sorted({shard_name for shard_name, offset in keep})
+
+    for shard_name in shard_names:
+        shard_path = path.join(corpus_dir, shard_name)
+        opener = gzip.open if shard_name.endswith(".gz") else open
+
+        with opener(shard_path, "rb") as f:
+            offset = 0
+            for line in f:
+                record_id = keep.get((shard_name, offset))
+                if record_id is not None:
+                    yield record_id, json.loads(line)
+                offset += len(line)
+
+
+def iter_json_records(json_dir="../_data/json"):
+    """Yield (filepath, record) for every JSON file written by
+    article_html_to_json"""
+
+    for entry in scandir(json_dir):
+        if entry.is_file() and entry.name.endswith(".json"):
+            with open(entry.path, "r") as f:
+                yield entry.path, json.load(f)
+
+
+def iter_articles(corpus_path):
+    """Yield (ID, record) for every article in either a folder of shards or
+    a folder of JSON files"""
+
+    if path.exists(path.join(corpus_path, MANIFEST_FILENAME)):
+        return iter_corpus_records(corpus_path)
+
+    return iter_json_records(corpus_path)
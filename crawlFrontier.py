@@ -0,0 +1,169 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T10:02:48+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: crawlFrontier.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T10:02:48+10:00
+
+# Import packages
+import sqlite3
+import threading
+import time
+from os import scandir
+from ABCWebComponents import get_article_uuid
+
+# The states an article URL moves through during a crawl
+DISCOVERED = "discovered" # Found on a topic page but not downloaded yet
+FETCHED = "fetched" # Article HTML saved to disk
+IMAGES_DONE = "images_done" # Article images saved to disk
+FAILED = "failed" # The last download attempt didn't work
+
+# States that don't need to be downloaded again
+DOWNLOADED_STATES = (FETCHED, IMAGES_DONE)
+
+
+class CrawlFrontier:
+    """This class keeps a record of every article URL the crawl has found and
+    how far each one got, in a SQLite database so a crawl can be restarted
+    where it stopped. The states are also held in memory so checking whether a
+    URL has been seen doesn't touch the disk."""
+
+    def __init__(self, db_path="../_data/frontier.sqlite"):
+        """Initialise the object"""
+        self.db_path = db_path
+
+        # The connection is shared by the download threads, one at a time
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+
+        # Write ahead logging lets the state updates be appended cheaply
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS articles (
+            uuid TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            updated REAL NOT NULL)""")
+        self.conn.commit()
+
+        # Load the state of every known article into memory
+        self.states = dict(self.conn.execute("SELECT uuid, state FROM articles"))
+
+
+    def __len__(self):
+        """Return the number of articles in the frontier"""
+        return len(self.states)
+
+
+    def __contains__(self, article_url):
+        """Check if an article URL has already been found"""
+        return get_article_uuid(article_url) in self.states
+
+
+    def get_state(self, article_id):
+        """Return the state of an article, or None if it hasn't been found"""
+        return self.states.get(article_id)
+
+
+    def is_downloaded(self, article_id):
+        """Check if an article has already been saved to disk"""
+        return self.states.get(article_id) in DOWNLOADED_STATES
+
+
+    def add_urls(self, article_urls):
+        """Add article URLs to the frontier and return the ones that hadn't
+        been found before, in the order they were passed. URLs added by
+        several threads at once are only returned to one of them"""
+
+        new_urls = [] # URLs that weren't already in the frontier
+        new_rows = [] # Rows to insert into the database
+        now = time.time()
+
+        with self.lock:
+            for url in article_urls:
+                article_id = get_article_uuid(url)
+
+                if article_id not in self.states: # If the URL hasn't been seen before
+                    self.states[article_id] = DISCOVERED
+                    new_urls.append(url)
+                    new_rows.append((article_id, url, DISCOVERED, now))
+
+            if new_rows: # Insert all the new URLs in one transaction
+                with self.conn:
+                    self.conn.executemany("""INSERT OR IGNORE INTO articles
+                        (uuid, url, state, updated) VALUES (?, ?, ?, ?)""", new_rows)
+
+        return new_urls
+
+
+    def set_state(self, article_id, state):
+        """Record the state an article has reached"""
+        self.states[article_id] = state
+
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE articles SET state = ?, updated = ? WHERE uuid = ?",
+                (state, time.time(), article_id))
+
+
+    def mark_failed(self, article_id, error=None):
+        """Record a failed download attempt for an article"""
+        self.states[article_id] = FAILED
+
+        with self.lock, self.conn:
+            self.conn.execute("""UPDATE articles SET state = ?, attempts = attempts + 1,
+                last_error = ?, updated = ? WHERE uuid = ?""",
+                (FAILED, error, time.time(), article_id))
+
+
+    def get_urls(self, states=(DISCOVERED,)):
+        """Return the URLs of the articles in the passed states, e.g. the
+        articles a previous run found but didn't download"""
+
+        with self.lock:
+            rows = self.conn.execute("SELECT url FROM articles WHERE state IN ({}) ORDER BY rowid".format(
+                ",".join("?" * len(states))), states).fetchall()
+
+        return [url for url, in rows]
+
+
+    def count_states(self):
+        """Return the number of articles in each state"""
+
+        counts = {}
+        for state in self.states.values():
+            counts[state] = counts.get(state, 0) + 1
+
+        return counts
+
+
+    def seed_from_directory(self, path_to_html="../_data/articles"):
+        """Mark the articles already saved by a crawl that ran before the
+        frontier existed as downloaded. Returns the number added"""
+
+        new_rows = []
+        now = time.time()
+
+        for entry in scandir(path_to_html): # Stream the directory listing
+            if entry.is_file() and entry.name.endswith(".html"):
+                article_id = entry.name[:-len(".html")]
+
+                if article_id not in self.states:
+                    self.states[article_id] = FETCHED
+                    url = "https://www.abc.net.au/" + article_id.replace("_", "/")
+                    new_rows.append((article_id, url, FETCHED, now))
+
+        with self.lock, self.conn:
+            self.conn.executemany("""INSERT OR IGNORE INTO articles
+                (uuid, url, state, updated) VALUES (?, ?, ?, ?)""", new_rows)
+
+        return len(new_rows)
+
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
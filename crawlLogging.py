@@ -0,0 +1,219 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T22:05:12+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: crawlLogging.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T22:05:12+10:00
+
+# Import packages
+import json
+import logging
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler
+from crawlMetrics import metrics
+
+# Every event is logged through this logger
+LOGGER_NAME = "abc_crawl"
+
+# Fraction of the records kept at each level once an event has been logged
+# always_keep times. Failures are sampled so a run of failed articles can't
+# fill the log queue, while errors are always kept
+DEFAULT_SAMPLE_RATES = {
+    logging.DEBUG: 0.0,
+    logging.INFO: 1.0,
+    logging.WARNING: 0.1,
+    logging.ERROR: 1.0,
+    logging.CRITICAL: 1.0,
+    }
+
+# Number of records of each event and level kept before sampling starts
+DEFAULT_ALWAYS_KEEP = 100
+
+# Fields of a LogRecord that aren't written as event fields
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def log_event(event, outcome, article_uuid=None, level=logging.INFO, **fields):
+    """Log what happened to an article, for example
+    log_event("download", "failed", article_uuid, status=503). Extra keyword
+    arguments are written as fields of the JSON line. Without
+    configure_logging, warnings and errors go to stderr like any other
+    Python log"""
+
+    if logger.isEnabledFor(level): # Don't build the record if it's not wanted
+        logger.log(level, "%s %s", event, outcome, extra=dict(event=event, outcome=outcome,
+            article_uuid=article_uuid, **fields))
+
+
+class SamplingFilter(logging.Filter):
+    """This class keeps the first always_keep records of each event and
+    level, and then a fixed fraction of them. It runs before a record is put
+    on the queue, so the records that are dropped cost almost nothing.
+    Sampling is by count rather than at random, so a rate of 0.1 keeps
+    exactly every tenth record."""
+
+    def __init__(self, sample_rates=None, always_keep=DEFAULT_ALWAYS_KEEP):
+        """Initialise the object"""
+        super().__init__()
+        self.sample_rates = dict(DEFAULT_SAMPLE_RATES, **(sample_rates or {}))
+        self.always_keep = always_keep
+        self.counts = {} # Records seen for each (event, level)
+        self.lock = threading.Lock()
+
+
+    def filter(self, record):
+        """Return True if the record should be logged"""
+
+        rate = self.sample_rates.get(record.levelno, 1.0)
+        if rate >= 1.0:
+            return True
+
+        key = (getattr(record, "event", None), record.levelno)
+
+        with self.lock:
+            count = self.counts.get(key, 0) + 1
+            self.counts[key] = count
+
+        # Keep a record each time count * rate passes a whole number
+        if count <= self.always_keep or int(count * rate) != int((count - 1) * rate):
+            return True
+
+        metrics.inc("log_records_sampled_out_total", level=record.levelname.lower())
+        return False
+
+
+def format_record(record):
+    """Return a log record as one JSON line"""
+
+    line = {
+        "time": record.created,
+        "level": record.levelname.lower(),
+        "process": record.process,
+        "thread": record.threadName,
+        }
+
+    # Add the event, outcome, article UUID and any other fields
+    for key, value in vars(record).items():
+        if key not in _RECORD_FIELDS:
+            line[key] = value
+
+    if "event" not in line: # A plain logger call rather than log_event
+        line["message"] = record.getMessage()
+
+    return json.dumps(line, default=str) + "\n"
+
+
+def configure_logging(log_queue, sample_rates=None, always_keep=DEFAULT_ALWAYS_KEEP,
+        level=logging.DEBUG):
+    """Send this process's log records to log_queue, sampled per level. It's
+    called in the main process and at the start of each pool worker"""
+
+    handler = QueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rates, always_keep))
+
+    logger.handlers = [handler] # Replace any handler from an earlier call
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+class LogListener:
+    """This class is the one place log records are written. Threads and pool
+    workers put records on its queue, and a background thread takes them off
+    in batches and writes each batch to a JSON lines file with one write, so
+    the workers never wait on the file or the console. Pass queue to
+    configure_logging in each process, or to the Pool initializer. Set
+    use_processes if the records come from other processes."""
+
+    def __init__(self, filepath, use_processes=False, batch_size=500, flush_seconds=1.0,
+            console_level=logging.ERROR):
+        """Initialise the object and start writing. Records at or above
+        console_level are also printed, so errors are still seen"""
+        self.filepath = filepath
+        self.use_processes = use_processes
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.console_level = console_level
+        self.written = 0
+
+        self.queue = multiprocessing.Queue() if use_processes else queue.Queue()
+        self.file = open(filepath, "a", buffering=1024 * 1024)
+
+        self.thread = threading.Thread(target=self._run, name="LogListener", daemon=True)
+        self.thread.start()
+
+
+    def _run(self):
+        """Write the records in batches until the stop record arrives"""
+
+        while True:
+            try: # Wait for a record, writing what's buffered every flush_seconds
+                batch = [self.queue.get(timeout=self.flush_seconds)]
+
+            except queue.Empty:
+                continue
+
+            # Take whatever else is already waiting, up to the batch size
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self.queue.get_nowait())
+
+                except queue.Empty:
+                    break
+
+            stopping = batch[-1] is None
+            records = batch[:-1] if stopping else batch
+
+            self.file.write("".join(format_record(record) for record in records))
+            self.file.flush()
+            self.written += len(records)
+
+            for record in records:
+                if self.console_level is not None and record.levelno >= self.console_level:
+                    print(record.getMessage(), getattr(record, "article_uuid", ""),
+                        getattr(record, "error", ""), file=sys.stderr)
+
+            if stopping:
+                return
+
+
+    def close(self):
+        """Write the records still on the queue and stop the thread"""
+
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+
+        if self.use_processes:
+            self.queue.close()
+            self.queue.join_thread()
+
+
+def start_logging(filepath, use_processes=False, sample_rates=None, **kwargs):
+    """Start a LogListener writing to filepath and send this process's
+    records to it. Returns the listener, which should be closed at the end"""
+
+    listener = LogListener(filepath, use_processes, **kwargs)
+    configure_logging(listener.queue, sample_rates)
+
+    return listener
+
+
+# Testing the logging
+if __name__ == "__main__":
+    listener = start_logging("/tmp/crawl_log_test.jsonl")
+
+    start_time = time.perf_counter()
+    for i in range(100000):
+        log_event("download", "failed", "news_2013-10-30_slug_{}".format(i),
+            level=logging.WARNING, status=503)
+    print("{:.1f} us per record".format((time.perf_counter() - start_time) * 10))
+
+    listener.close()
+    print("{} records written".format(listener.written))
@@ -0,0 +1,239 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T21:20:37+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: crawlMetrics.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T21:20:37+10:00
+
+# Import packages
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+# Prefix added to the metric names in the Prometheus output
+METRIC_PREFIX = "abc_"
+
+
+def make_key(name, labels):
+    """Return the key a metric is stored under, its name and sorted labels"""
+    return (name, tuple(sorted((key, str(value)) for key, value in labels.items())))
+
+
+def format_labels(labels, extra=()):
+    """Format labels the way Prometheus writes them"""
+
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+
+    return "{" + ",".join('{}="{}"'.format(key, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in pairs) + "}"
+
+
+class Metrics:
+    """This class keeps counters, gauges and latency histograms for the crawl
+    and the preprocessing. Each metric has a name and optional labels, like
+    metrics.inc("fetch_bytes_total", 1024, host="www.abc.net.au"). Updates
+    from threads are safe. Pool workers drain their metrics and return them
+    so the parent can merge them, the same way as TemplateStats."""
+
+    def __init__(self):
+        """Initialise the object"""
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {} # Key to [bucket counts, sum, count]
+
+
+    def inc(self, name, value=1, **labels):
+        """Add to a counter"""
+
+        key = make_key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge to its current value"""
+
+        key = make_key(name, labels)
+        with self.lock:
+            self.gauges[key] = value
+
+
+    def observe(self, name, seconds, **labels):
+        """Add a duration to a histogram"""
+
+        key = make_key(name, labels)
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * len(LATENCY_BUCKETS), 0.0, 0]
+
+            histogram[0][bucket] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+
+    @contextmanager
+    def timed(self, name, **labels):
+        """Time the code inside a with block into a histogram"""
+
+        start_time = time.perf_counter()
+        try:
+            yield
+
+        finally:
+            self.observe(name, time.perf_counter() - start_time, **labels)
+
+
+    def snapshot(self):
+        """Return a copy of every metric"""
+
+        with self.lock:
+            return {"counters": dict(self.counters), "gauges": dict(self.gauges),
+                "histograms": {key: [list(value[0]), value[1], value[2]]
+                    for key, value in self.histograms.items()}}
+
+
+    def drain(self):
+        """Return the metrics recorded so far and start again. Pool workers
+        return these so the parent can merge them"""
+
+        with self.lock:
+            snapshot = {"counters": self.counters, "gauges": self.gauges,
+                "histograms": self.histograms}
+            self.counters, self.gauges, self.histograms = {}, {}, {}
+
+        return snapshot
+
+
+    def merge(self, snapshot):
+        """Add the metrics drained from another process. Gauges take the
+        latest value"""
+
+        with self.lock:
+            for key, value in snapshot["counters"].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+
+            self.gauges.update(snapshot["gauges"])
+
+            for key, (buckets, total, count) in snapshot["histograms"].items():
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = [[0] * len(LATENCY_BUCKETS), 0.0, 0]
+
+                histogram[0] = [a + b for a, b in zip(histogram[0], buckets)]
+                histogram[1] += total
+                histogram[2] += count
+
+
+    def to_json(self):
+        """Return the metrics as a JSON string, with histogram buckets
+        listed by their upper bound"""
+
+        snapshot = self.snapshot()
+
+        def entry(key, **values):
+            return dict({"name": key[0], "labels": dict(key[1])}, **values)
+
+        return json.dumps({
+            "time": time.time(),
+            "counters": [entry(key, value=value) for key, value in sorted(snapshot["counters"].items())],
+            "gauges": [entry(key, value=value) for key, value in sorted(snapshot["gauges"].items())],
+            "histograms": [entry(key, buckets={str(bound): count for bound, count in zip(LATENCY_BUCKETS, buckets)},
+                sum=total, count=count) for key, (buckets, total, count) in sorted(snapshot["histograms"].items())],
+            }, indent=2)
+
+
+    def to_prometheus(self):
+        """Return the metrics in the Prometheus text format, for the node
+        exporter's textfile collector"""
+
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+
+        def add_type(name, metric_type):
+            if name not in typed:
+                lines.append("# TYPE {}{} {}".format(METRIC_PREFIX, name, metric_type))
+                typed.add(name)
+
+        for (name, labels), value in sorted(snapshot["counters"].items()):
+            add_type(name, "counter")
+            lines.append("{}{}{} {}".format(METRIC_PREFIX, name, format_labels(labels), value))
+
+        for (name, labels), value in sorted(snapshot["gauges"].items()):
+            add_type(name, "gauge")
+            lines.append("{}{}{} {}".format(METRIC_PREFIX, name, format_labels(labels), value))
+
+        for (name, labels), (buckets, total, count) in sorted(snapshot["histograms"].items()):
+            add_type(name, "histogram")
+
+            cumulative = 0 # Prometheus buckets include everything below them
+            for bound, bucket_count in zip(LATENCY_BUCKETS, buckets):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append("{}{}_bucket{} {}".format(METRIC_PREFIX, name,
+                    format_labels(labels, [("le", le)]), cumulative))
+
+            lines.append("{}{}_sum{} {}".format(METRIC_PREFIX, name, format_labels(labels), total))
+            lines.append("{}{}_count{} {}".format(METRIC_PREFIX, name, format_labels(labels), count))
+
+        return "\n".join(lines) + "\n"
+
+
+    def write(self, filepath):
+        """Write a snapshot to a file, as Prometheus text if the file ends
+        in .prom and JSON otherwise. The file is replaced in one step so a
+        scraper never reads half of it"""
+
+        text = self.to_prometheus() if filepath.endswith(".prom") else self.to_json()
+
+        tmp_filepath = "{}.tmp".format(filepath)
+        with open(tmp_filepath, "w") as f:
+            f.write(text)
+        os.replace(tmp_filepath, filepath)
+
+
+class MetricsWriter:
+    """This class writes a metrics snapshot to a file every few seconds in a
+    background thread, so the numbers can be watched during a long run"""
+
+    def __init__(self, metrics, filepath, every=15):
+        """Initialise the object and start writing"""
+        self.metrics = metrics
+        self.filepath = filepath
+        self.every = every
+
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="MetricsWriter", daemon=True)
+        self.thread.start()
+
+
+    def _run(self):
+        """Write a snapshot every few seconds until stopped"""
+        while not self.stopped.wait(self.every):
+            self.metrics.write(self.filepath)
+
+
+    def close(self):
+        """Stop the thread and write a final snapshot"""
+
+        self.stopped.set()
+        self.thread.join()
+        self.metrics.write(self.filepath)
+
+
+# The metrics recorded in this process
+metrics = Metrics()
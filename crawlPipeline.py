@@ -0,0 +1,347 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T11:20:05+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: crawlPipeline.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T11:20:05+10:00
+
+# Import packages
+import logging
+import queue
+import threading
+import time
+from os import path
+from ABCWebComponents import ArticlePage
+from crawlFrontier import FETCHED, IMAGES_DONE
+from progressReporter import ProgressReporter
+from crawlMetrics import metrics
+from crawlLogging import log_event
+from retryQueue import RetryScheduler, ARTICLE, IMAGE
+from concurrencyController import parse_retry_after
+
+# Placed on a queue to tell a worker there's no more work
+_STOP = None
+
+
+class CrawlPipeline:
+    """This class downloads articles while the topic page is still being
+    read. Discovered URLs go onto a bounded queue that long lived article
+    workers take from, and each saved article's images go onto a second
+    queue for the image workers. If the downloads fall behind, submitting
+    more URLs waits until there's room on the queue.
+
+    If a RetryQueue is passed, failed articles are submitted again when
+    their backoff ends, and the ImageStore's failed images put back on the
+    image queue. Downloads that can't succeed become dead letters. An
+    article is only marked IMAGES_DONE once every one of its images is
+    saved."""
+
+    def __init__(self, frontier, image_store=None, archive=None, article_workers=16,
+            image_workers=8, queue_size=100, report_seconds=10, retry_queue=None,
+            retry_wait=60, max_close_wait=600, download_images=True):
+        """Initialise the object. When closing, retries due within
+        retry_wait seconds are waited for and the rest are left for the next
+        run, but close doesn't wait for retries longer than max_close_wait
+        seconds. If download_images is False only the article HTML is saved
+        and the articles with images are left FETCHED"""
+        self.frontier = frontier
+        self.image_store = image_store # Skips images saved for earlier articles
+        self.archive = archive # Saves raw pages to compressed segments if set
+        self.retry_queue = retry_queue
+        self.retry_wait = retry_wait
+        self.max_close_wait = max_close_wait
+        self.download_images = download_images
+
+        # Images are retried through the image store
+        if retry_queue is not None and image_store is not None and image_store.retry_queue is None:
+            image_store.retry_queue = retry_queue
+
+        # Bounded queues between the stages
+        self.article_queue = queue.Queue(maxsize=queue_size)
+        self.image_queue = queue.Queue(maxsize=queue_size)
+
+        # Progress counters, updated as each item finishes
+        self.counts_lock = threading.Lock()
+        self.counts = {"submitted": 0, "downloaded": 0, "skipped": 0, "failed": 0,
+            "retrying": 0, "images_done": 0, "images_failed": 0}
+
+        # Article UUID to [image URLs not finished, images that failed for
+        # good], for the articles whose images are being downloaded
+        self.images_lock = threading.Lock()
+        self.article_images = {}
+
+        # Print the articles handled and the rate every report_seconds. The
+        # total grows as URLs are submitted
+        self.progress = ProgressReporter("articles", report_seconds=report_seconds)
+
+        # Start the workers for each stage
+        self.article_threads = [threading.Thread(target=self._article_worker,
+            name="ArticleWorker-{}".format(i), daemon=True) for i in range(article_workers)]
+        self.image_threads = [threading.Thread(target=self._image_worker,
+            name="ImageWorker-{}".format(i), daemon=True) for i in range(image_workers)]
+
+        for thread in self.article_threads + self.image_threads:
+            thread.start()
+
+        # Put the retries back on the queues as they come due
+        self.retry_scheduler = None if retry_queue is None else RetryScheduler(retry_queue,
+            self.submit, self.submit_images)
+
+
+    def count(self, counter):
+        """Add one to a progress counter. Retries are submitted again, so
+        every submission, including a retry, ends up downloaded, skipped,
+        failed or retrying"""
+
+        with self.counts_lock:
+            self.counts[counter] += 1
+
+        metrics.inc("articles_total", result=counter)
+
+        if counter == "submitted":
+            self.progress.add_total()
+
+        elif counter in ("downloaded", "skipped", "failed", "retrying"):
+            self.progress.update()
+
+
+    def submit(self, article_url):
+        """Queue an article URL for downloading, waiting if the queue is full"""
+        self.article_queue.put(article_url)
+        self.count("submitted")
+
+
+    def submit_many(self, article_urls):
+        """Queue several article URLs for downloading"""
+        for url in article_urls:
+            self.submit(url)
+
+
+    def submit_images(self, article_url, page_images):
+        """Queue images being retried for the image workers, for an article
+        that's already been saved"""
+
+        article = ArticlePage(article_url)
+        article.get_page_uuid()
+
+        with self.images_lock:
+            if article.a_uuid not in self.article_images: # Left over from an earlier run
+                waiting, dead = self.retry_queue.get_image_failures(article.a_uuid)
+                self.article_images[article.a_uuid] = [waiting | set(page_images), len(dead)]
+
+        self.image_queue.put((article, page_images))
+
+
+    def get_saved_images(self, page_images):
+        """Return the URLs of the images that are now saved"""
+
+        if self.image_store is not None:
+            return {img_url for img_url in page_images if img_url.split("/")[-1] in self.image_store}
+
+        return {img_url for img_url, img_filename in page_images.items() if path.exists(img_filename)}
+
+
+    def images_finished(self, article, page_images):
+        """Record which of an article's images were saved and which failed
+        for good, and mark the article IMAGES_DONE once all its images are
+        saved. Images waiting for a retry keep the article open"""
+
+        saved = self.get_saved_images(page_images)
+        failed = {img_url for img_url in page_images if img_url not in saved
+            and (self.retry_queue is None or (IMAGE, img_url) not in self.retry_queue)}
+
+        with self.images_lock:
+            images = self.article_images.get(article.a_uuid)
+            if images is None:
+                return
+
+            images[0] -= saved | failed
+            images[1] += len(failed)
+
+            if images[0]: # Some are still waiting to be retried
+                log_event("images", "incomplete", article.a_uuid, images=len(page_images),
+                    waiting=len(images[0]))
+                return
+
+            del self.article_images[article.a_uuid]
+            failures = images[1]
+
+        if failures: # Left FETCHED so the images can be tried again later
+            self.count("images_failed")
+            log_event("images", "failed", article.a_uuid, logging.WARNING, url=article.url,
+                failed=failures)
+
+        else:
+            self.frontier.set_state(article.a_uuid, IMAGES_DONE)
+            self.count("images_done")
+            log_event("images", "done", article.a_uuid, images=len(page_images))
+
+
+    def article_failed(self, article_id, article_url, error, status=None, retry_after=None):
+        """Record a failed article, scheduling it to be tried again if
+        there's a RetryQueue"""
+
+        self.frontier.mark_failed(article_id, error)
+
+        if self.retry_queue is not None and self.retry_queue.add_failure(ARTICLE, article_id,
+                article_url, error, status, retry_after):
+            self.count("retrying")
+
+        else:
+            self.count("failed")
+
+
+    def _article_worker(self):
+        """Download articles from the article queue until told to stop"""
+
+        while True:
+            article_url = self.article_queue.get()
+
+            if article_url is _STOP:
+                return
+
+            try:
+                with metrics.timed("article_seconds"):
+                    self.download_article(article_url)
+
+            except Exception as e: # Don't let one article stop the worker
+                article_id = ArticlePage(article_url).get_page_uuid()
+                self.article_failed(article_id, article_url, repr(e))
+                log_event("download", "error", article_id, logging.ERROR, url=article_url,
+                    error=repr(e))
+
+            finally: # Lets close wait for the queue to empty
+                self.article_queue.task_done()
+
+
+    def download_article(self, article_url):
+        """Save an article's HTML and pass its images on to the image stage"""
+
+        # Create an instance of the ArticlePage class
+        article = ArticlePage(article_url)
+
+        # Get the article UUID
+        article_id = article.get_page_uuid()
+
+        # Check if the article has already been saved
+        if self.frontier.is_downloaded(article_id):
+            if self.retry_queue is not None: # In case it was saved since it failed
+                self.retry_queue.add_success(ARTICLE, article_id)
+
+            self.count("skipped")
+            log_event("download", "skipped", article_id, logging.DEBUG, url=article_url)
+            return
+
+        # If there were no issues getting the article_page
+        if article.make_page_soup():
+            # Update image references before the HTML is saved
+            page_images = article.localise_page_images()
+
+            # Save article HTML
+            article.save_page_html(self.archive)
+            self.frontier.set_state(article_id, FETCHED)
+
+            if self.retry_queue is not None:
+                self.retry_queue.add_success(ARTICLE, article_id)
+
+            self.count("downloaded")
+            log_event("download", "downloaded", article_id, url=article_url,
+                images=len(page_images or ()), cached=article.r.from_cache)
+
+            if page_images: # Hand the images to the image workers
+                if self.download_images:
+                    with self.images_lock:
+                        self.article_images[article_id] = [set(page_images), 0]
+
+                    self.image_queue.put((article, page_images))
+
+            else:
+                self.frontier.set_state(article_id, IMAGES_DONE)
+
+        else: # If the article wasn't able to be downloaded
+            self.article_failed(article_id, article_url, "HTTP {}".format(article.r.status_code),
+                article.r.status_code, parse_retry_after(article.r.headers.get("retry-after")))
+            log_event("download", "failed", article_id, logging.WARNING, url=article_url,
+                status=article.r.status_code)
+
+
+    def _image_worker(self):
+        """Download images from the image queue until told to stop"""
+
+        while True:
+            item = self.image_queue.get()
+
+            if item is _STOP:
+                return
+
+            article, page_images = item
+
+            try:
+                article.download_page_images(page_images, self.image_store)
+
+            except Exception as e: # Don't let one article stop the worker
+                log_event("images", "error", article.a_uuid, logging.ERROR, url=article.url,
+                    error=repr(e))
+
+                if self.retry_queue is not None and self.image_store is not None: # Try the unsaved images again
+                    saved = self.get_saved_images(page_images)
+                    for img_url, img_filename in page_images.items():
+                        if img_url not in saved:
+                            self.retry_queue.add_failure(IMAGE, img_url, img_url, repr(e),
+                                payload={"article_uuid": article.a_uuid, "article_url": article.url,
+                                "img_filename": img_filename})
+
+            try: # Mark the article done once all its images are saved
+                self.images_finished(article, page_images)
+
+            finally: # Lets close wait for the queue to empty
+                self.image_queue.task_done()
+
+
+    def wait_for_retries(self):
+        """Wait until the queues are empty and no retry is due within
+        retry_wait seconds, or until max_close_wait seconds have passed"""
+
+        deadline = time.monotonic() + self.max_close_wait
+
+        while True:
+            self.article_queue.join()
+            self.image_queue.join()
+
+            wait = self.retry_queue.seconds_until_due()
+
+            # Retries handed to the queues but not finished are in progress
+            if not self.retry_queue.in_progress and (wait is None or wait > self.retry_wait):
+                return
+
+            if time.monotonic() >= deadline: # Leave the rest for the next run
+                log_event("retry", "close_timeout", None, logging.WARNING,
+                    in_progress=len(self.retry_queue.in_progress), waiting=len(self.retry_queue))
+                return
+
+            time.sleep(min(wait or 0.1, 1.0))
+
+
+    def close(self):
+        """Wait for the queued articles and images to finish, then stop the
+        workers. Returns the progress counters"""
+
+        if self.retry_scheduler is not None: # Finish the retries that are due soon
+            self.wait_for_retries()
+            self.retry_scheduler.close()
+
+        # The article workers finish first since they feed the image workers
+        for _ in self.article_threads:
+            self.article_queue.put(_STOP)
+        for thread in self.article_threads:
+            thread.join()
+
+        for _ in self.image_threads:
+            self.image_queue.put(_STOP)
+        for thread in self.image_threads:
+            thread.join()
+
+        self.progress.report()
+
+        return dict(self.counts)
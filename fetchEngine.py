@@ -0,0 +1,345 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T09:12:31+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: fetchEngine.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T09:12:31+10:00
+
+# Import packages
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+import aiohttp
+from crawlMetrics import metrics
+from concurrencyController import AIMDController
+
+# Default number of requests per second sent to any one host
+DEFAULT_REQUESTS_PER_SECOND = 2
+
+# Default number of pooled keep-alive connections shared by all hosts
+DEFAULT_MAX_CONNECTIONS = 20
+
+# Default number of seconds before a request is abandoned
+DEFAULT_TIMEOUT = 60
+
+# Default number of requests in flight to a host before the concurrency
+# controller has seen any responses
+DEFAULT_INITIAL_IN_FLIGHT = 2
+
+
+class TokenBucket:
+    """This class limits the rate that requests are sent to a single host"""
+
+    def __init__(self, rate, burst=None):
+        """Initialise the object"""
+        self.rate = float(rate) # Tokens added per second
+        self.capacity = float(burst) if burst else max(1.0, self.rate) # Maximum tokens saved up
+        self.tokens = self.capacity # Start with a full bucket
+        self.updated = time.monotonic() # When the bucket was last refilled
+        self.lock = asyncio.Lock() # Waiters are served one at a time, in order
+
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+
+        async with self.lock:
+            while True:
+                # Refill the bucket for the time since it was last checked
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1: # If a token is available, take it
+                    self.tokens -= 1
+                    return
+
+                # Otherwise sleep until the next token is due
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FetchResponse:
+    """This class holds the parts of a HTTP response the scraper uses"""
+
+    def __init__(self, url, status_code, headers, content, from_cache=False, elapsed=0.0):
+        """Initialise the object"""
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers # Header names are lower case
+        self.content = content # Response body as bytes
+        self.from_cache = from_cache # True if the body came from the HTTP cache
+        self.elapsed = elapsed # Seconds from sending the request to reading the body
+
+
+    @property
+    def text(self):
+        """Decode the response body"""
+
+        # Use the charset sent by the server, otherwise assume UTF-8
+        charset = "utf-8"
+        for param in self.headers.get("content-type", "").split(";")[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "charset" and value:
+                charset = value.strip('"')
+
+        try:
+            return self.content.decode(charset, errors="replace")
+
+        except LookupError: # If the charset isn't known to Python
+            return self.content.decode("utf-8", errors="replace")
+
+
+class FetchEngine:
+    """This class runs an asyncio event loop in a background thread and sends
+    every request through one pool of keep-alive connections. Each host has a
+    token bucket so the requests per second can be set for the whole process,
+    rather than depending on how many workers are running.
+
+    If adaptive_concurrency is True, each host also has an AIMDController that
+    raises the number of requests in flight while responses come back quickly
+    and cuts it on 429 and 503 responses, failed requests and rising latency,
+    up to max_in_flight (max_connections by default).
+
+    url_overrides maps URL prefixes to the prefixes requests are actually sent
+    to, for example {"https://www.abc.net.au": "http://127.0.0.1:8000/abc"}
+    to crawl mockABCServer. Responses and rate limits still use the original
+    URLs, so nothing else needs to know."""
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND, burst=None,
+            host_rates=None, max_connections=DEFAULT_MAX_CONNECTIONS, timeout=DEFAULT_TIMEOUT,
+            cache=None, url_overrides=None, record_timings=False, adaptive_concurrency=True,
+            max_in_flight=None, initial_in_flight=DEFAULT_INITIAL_IN_FLIGHT):
+        """Initialise the object"""
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.host_rates = host_rates or {} # Per host overrides of requests_per_second
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.cache = cache # An optional HTTPCache for requests made with use_cache
+        self.url_overrides = url_overrides or {}
+        self.adaptive_concurrency = adaptive_concurrency
+        self.max_in_flight = max_in_flight or max_connections # Ceiling for each host
+        self.initial_in_flight = min(initial_in_flight, self.max_in_flight)
+
+        # If record_timings is True, (url, status, bytes, seconds) is kept for
+        # every request sent, for benchmarking
+        self.timings = [] if record_timings else None
+
+        self.buckets = {} # One token bucket per host
+        self.controllers = {} # One concurrency controller per host
+        self.session = None # Created inside the event loop on first use
+
+        # Start the event loop that all requests run on
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name="FetchEngine", daemon=True)
+        self.thread.start()
+
+
+    def _run_loop(self):
+        """Run the event loop until the engine is closed"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+
+    def _get_session(self):
+        """Create the shared client session the first time it's needed"""
+
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections,
+                keepalive_timeout=60, ttl_dns_cache=300)
+
+            self.session = aiohttp.ClientSession(connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Accept-Encoding": "gzip, deflate"},
+                auto_decompress=True)
+
+        return self.session
+
+
+    def get_bucket(self, host):
+        """Return the token bucket for a host"""
+
+        try: # Check if the host already has a bucket
+            return self.buckets[host]
+
+        except KeyError: # Otherwise create one
+            rate = self.host_rates.get(host, self.requests_per_second)
+            self.buckets[host] = TokenBucket(rate, self.burst)
+            return self.buckets[host]
+
+
+    def get_controller(self, host):
+        """Return the concurrency controller for a host"""
+
+        try: # Check if the host already has a controller
+            return self.controllers[host]
+
+        except KeyError: # Otherwise create one
+            self.controllers[host] = AIMDController(host, self.initial_in_flight,
+                max_limit=self.max_in_flight)
+            return self.controllers[host]
+
+
+    def rewrite_url(self, url):
+        """Return the URL a request is sent to, after the overrides"""
+
+        for prefix, replacement in self.url_overrides.items():
+            if url.startswith(prefix):
+                return replacement + url[len(prefix):]
+
+        return url
+
+
+    def restore_url(self, url):
+        """Undo rewrite_url for a response URL"""
+
+        for prefix, replacement in self.url_overrides.items():
+            if url.startswith(replacement):
+                return prefix + url[len(replacement):]
+
+        return url
+
+
+    async def fetch(self, url, use_cache=False):
+        """Wait for the host's rate limit and then get the URL. If use_cache
+        is True and the engine has a HTTPCache, a cached copy is revalidated
+        rather than downloaded again"""
+
+        cached = None
+        request_headers = {}
+
+        if self.cache is not None and (use_cache or self.cache.offline):
+            # Read the cache without blocking the event loop
+            cached = await asyncio.to_thread(self.cache.lookup, url)
+
+            if self.cache.offline: # Never use the network
+                metrics.inc("fetch_cache_total", result="offline_hit" if cached else "offline_miss")
+
+                if cached is None:
+                    return FetchResponse(url, 504, {}, b"")
+
+                meta, body = cached
+                return FetchResponse(meta["url"], meta["status_code"], meta["headers"], body,
+                    from_cache=True)
+
+            if cached is not None: # Ask the server if the page has changed
+                request_headers = self.cache.get_conditional_headers(cached[0])
+
+        # Wait for a free slot and then for the host's rate limit
+        host = urlsplit(url).netloc
+        controller = self.get_controller(host) if self.adaptive_concurrency else None
+
+        start_time = time.monotonic()
+        if controller is not None:
+            await controller.acquire()
+
+        status = None # Stays None if the request fails
+        headers = {}
+
+        try:
+            await self.get_bucket(host).acquire()
+            metrics.observe("fetch_wait_seconds", time.monotonic() - start_time, host=host)
+
+            start_time = time.monotonic()
+
+            async with self._get_session().get(self.rewrite_url(url), headers=request_headers) as response:
+                content = await response.read() # Body is decompressed by aiohttp
+
+                headers = {key.lower(): value for key, value in response.headers.items()}
+                status = response.status
+
+        finally: # Let the controller adjust the limit for this host
+            elapsed = time.monotonic() - start_time
+
+            if controller is not None:
+                controller.release(status, elapsed, headers.get("retry-after"))
+
+        if self.timings is not None:
+            self.timings.append((url, response.status, len(content), elapsed))
+
+        metrics.observe("fetch_seconds", elapsed, host=host)
+        metrics.inc("fetch_requests_total", host=host, status=response.status)
+        metrics.inc("fetch_bytes_total", len(content), host=host)
+
+        if cached is not None and response.status == 304: # Unchanged since it was cached
+            metrics.inc("fetch_cache_total", result="revalidated")
+            meta, body = cached
+            await asyncio.to_thread(self.cache.refresh, url, meta, headers)
+
+            return FetchResponse(meta["url"], meta["status_code"], meta["headers"], body,
+                from_cache=True, elapsed=elapsed)
+
+        if use_cache and self.cache is not None and response.status == 200:
+            await asyncio.to_thread(self.cache.store, url, response.status, headers, content)
+
+        return FetchResponse(self.restore_url(str(response.url)), response.status, headers,
+            content, elapsed=elapsed)
+
+
+    async def fetch_many(self, urls, use_cache=False):
+        """Get several URLs at once. Failed requests are returned as exceptions"""
+        return await asyncio.gather(*[self.fetch(url, use_cache) for url in urls],
+            return_exceptions=True)
+
+
+    def get(self, url, use_cache=False):
+        """Get a URL from any thread and wait for the response"""
+        return asyncio.run_coroutine_threadsafe(self.fetch(url, use_cache), self.loop).result()
+
+
+    def get_many(self, urls, use_cache=False):
+        """Get several URLs at once from any thread and wait for the responses"""
+        return asyncio.run_coroutine_threadsafe(self.fetch_many(urls, use_cache),
+            self.loop).result()
+
+
+    def close(self):
+        """Close the pooled connections and stop the event loop"""
+
+        if self.session is not None:
+            asyncio.run_coroutine_threadsafe(self.session.close(), self.loop).result()
+            self.session = None
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+# The engine shared by everything in this process
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_fetch_engine():
+    """Return the process wide fetch engine, creating it on first use"""
+    global _engine
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine()
+
+        return _engine
+
+
+def configure_fetch_engine(**kwargs):
+    """Replace the process wide fetch engine with one using the passed
+    settings, for example configure_fetch_engine(requests_per_second=5)"""
+    global _engine
+
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+
+        _engine = FetchEngine(**kwargs)
+
+        return _engine
+
+
+def close_fetch_engine():
+    """Close the process wide fetch engine if one was created"""
+    global _engine
+
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+            _engine = None
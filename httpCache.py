@@ -0,0 +1,110 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T13:30:12+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: httpCache.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T13:30:12+10:00
+
+# Import packages
+import hashlib
+import json
+import os
+import threading
+import time
+from os import path, makedirs
+
+
+class HTTPCache:
+    """This class saves HTTP response bodies and headers to disk so a page
+    can be revalidated with If-None-Match/If-Modified-Since instead of being
+    downloaded again. In offline mode, pages are only ever read from the
+    cache."""
+
+    def __init__(self, cache_dir="../_data/http_cache", offline=False):
+        """Initialise the object"""
+        self.cache_dir = cache_dir
+        self.offline = offline # Never use the network if True
+        makedirs(cache_dir, exist_ok=True)
+
+
+    def get_paths(self, url):
+        """Return the body and header filenames for a URL"""
+
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+        # Spread the files over subfolders so no folder gets too big
+        folder = path.join(self.cache_dir, key[:2])
+
+        return path.join(folder, key + ".body"), path.join(folder, key + ".json")
+
+
+    def lookup(self, url):
+        """Return the saved (headers, body) for a URL, or None if it isn't cached"""
+
+        body_path, meta_path = self.get_paths(url)
+
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+
+            with open(body_path, "rb") as f:
+                body = f.read()
+
+        except (OSError, ValueError): # If it isn't cached or the entry is damaged
+            return None
+
+        return meta, body
+
+
+    def get_conditional_headers(self, meta):
+        """Return the request headers that ask the server if a cached page has changed"""
+
+        headers = {}
+
+        if meta["headers"].get("etag"):
+            headers["If-None-Match"] = meta["headers"]["etag"]
+
+        if meta["headers"].get("last-modified"):
+            headers["If-Modified-Since"] = meta["headers"]["last-modified"]
+
+        return headers
+
+
+    def write_atomic(self, filename, data):
+        """Write a file via a temporary file so readers never see half of it"""
+
+        makedirs(path.dirname(filename), exist_ok=True)
+
+        tmp_filename = "{}.{}.tmp".format(filename, threading.get_ident())
+        with open(tmp_filename, "wb") as f:
+            f.write(data)
+
+        os.replace(tmp_filename, filename)
+
+
+    def store(self, url, status_code, headers, body):
+        """Save a response to the cache"""
+
+        body_path, meta_path = self.get_paths(url)
+
+        meta = {"url": url, "status_code": status_code, "headers": headers,
+            "stored": time.time()}
+
+        # The body is written first so the headers never point at a missing body
+        self.write_atomic(body_path, body)
+        self.write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+
+    def refresh(self, url, meta, headers):
+        """Update a cached page's headers after the server said it hasn't changed"""
+
+        _, meta_path = self.get_paths(url)
+
+        # A 304 can send new validators, so merge them into the saved headers
+        for key in ("etag", "last-modified", "cache-control", "expires", "date"):
+            if key in headers:
+                meta["headers"][key] = headers[key]
+
+        meta["stored"] = time.time()
+        self.write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
@@ -0,0 +1,298 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T12:41:37+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: imageStore.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T12:41:37+10:00
+
+# Import packages
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from os import path, scandir
+from fetchEngine import get_fetch_engine
+from crawlMetrics import metrics
+from crawlLogging import log_event
+from retryQueue import IMAGE
+from concurrencyController import parse_retry_after
+
+# Longest an article waits for another article's download of the same image
+IN_FLIGHT_TIMEOUT = 300
+
+
+class ImageStore:
+    """This class saves article images so each one is only downloaded once.
+    An index of the saved images is checked before anything is requested, the
+    missing images for an article are requested together, and images with
+    the same content are hard linked rather than written twice. The index also
+    records which articles use each image. If a RetryQueue is passed, failed
+    images are scheduled to be downloaded again."""
+
+    def __init__(self, image_dir="../_data/images", db_path="../_data/images.sqlite",
+            fetch_engine=None, retry_queue=None):
+        """Initialise the object"""
+        self.image_dir = image_dir
+        self.fetch_engine = fetch_engine
+        self.retry_queue = retry_queue
+
+        # The connection is shared by the image threads, one at a time
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS images (
+            img_id TEXT PRIMARY KEY,
+            sha256 TEXT,
+            size INTEGER NOT NULL,
+            url TEXT,
+            saved REAL NOT NULL)""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS image_refs (
+            img_id TEXT NOT NULL,
+            article_uuid TEXT NOT NULL,
+            PRIMARY KEY (img_id, article_uuid))""")
+        self.conn.commit()
+
+        # Load the index into memory
+        self.sizes = {} # Image ID to file size
+        self.hashes = {} # Content hash to the first image ID saved with it
+        for img_id, sha256, size in self.conn.execute("SELECT img_id, sha256, size FROM images"):
+            self.sizes[img_id] = size
+            if sha256:
+                self.hashes.setdefault(sha256, img_id)
+
+        # If this is the first run with an index, add the images already saved
+        if not self.sizes:
+            self.seed_from_directory()
+
+        self.in_flight = set() # Image IDs being downloaded by another thread
+        self.download_done = threading.Condition(self.lock) # Notified as in_flight shrinks
+
+        # Counters for how much traffic the index saves
+        self.stats = {"hits": 0, "misses": 0, "failed": 0, "duplicates": 0,
+            "bytes_downloaded": 0, "bytes_saved": 0}
+
+
+    @property
+    def engine(self):
+        """Use the process wide fetch engine unless one was passed"""
+        return self.fetch_engine if self.fetch_engine else get_fetch_engine()
+
+
+    def seed_from_directory(self):
+        """Add the images in the image folder to the index"""
+
+        rows = []
+        now = time.time()
+
+        for entry in scandir(self.image_dir): # Stream the directory listing
+            if entry.is_file() and entry.name.endswith(".jpg"):
+                img_id = entry.name[:-len(".jpg")]
+                size = entry.stat().st_size
+                self.sizes[img_id] = size
+                rows.append((img_id, None, size, None, now))
+
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO images VALUES (?, ?, ?, ?, ?)", rows)
+
+
+    def __contains__(self, img_id):
+        """Check if an image has already been saved"""
+        return img_id in self.sizes
+
+
+    def save_article_images(self, article_uuid, page_images, article_url=None):
+        """Save the images for one article. page_images maps each image URL
+        to the filename it should be saved to. Returns True if every image is
+        now on disk. article_url is kept with any failed image so its retry
+        can be matched to the article"""
+
+        with self.lock, self.conn: # Record that the article uses each of its images
+            self.conn.executemany("INSERT OR IGNORE INTO image_refs VALUES (?, ?)",
+                [(img_url.split("/")[-1], article_uuid) for img_url in page_images])
+
+        all_saved = True
+        pending = dict(page_images) # Images not yet known to be saved
+
+        while pending:
+            misses = {} # Images this thread will download
+            hits = [] # Images already saved
+            waiting = {} # Images another article is downloading
+
+            with self.lock:
+                for img_url, img_filename in pending.items():
+                    img_id = img_url.split("/")[-1]
+
+                    if img_id in self.sizes: # Already saved for another article
+                        self.stats["hits"] += 1
+                        metrics.inc("images_total", result="already_saved")
+                        self.stats["bytes_saved"] += self.sizes[img_id]
+                        hits.append(img_url)
+
+                    elif img_id in self.in_flight: # Another article is downloading it
+                        waiting[img_url] = img_filename
+
+                    else:
+                        self.stats["misses"] += 1
+                        self.in_flight.add(img_id)
+                        misses[img_url] = img_filename
+
+            if self.retry_queue is not None: # Clear retries saved since they failed
+                for img_url in hits:
+                    self.retry_queue.add_success(IMAGE, img_url)
+
+            if misses:
+                all_saved = self.download_images(article_uuid, article_url, misses) and all_saved
+
+            if not waiting:
+                break
+
+            # Wait for the other downloads to finish, then look at the images
+            # again. Ones that failed are downloaded by this article
+            waiting_ids = {img_url.split("/")[-1] for img_url in waiting}
+            with self.download_done:
+                finished = self.download_done.wait_for(lambda: not waiting_ids & self.in_flight,
+                    IN_FLIGHT_TIMEOUT)
+
+            if not finished: # Give up on them for now, but don't lose them
+                for img_url, img_filename in waiting.items():
+                    self.image_failed(article_uuid, article_url, img_url, img_filename, None,
+                        "Timed out waiting for another download", None)
+                return False
+
+            pending = waiting
+
+        return all_saved
+
+
+    def download_images(self, article_uuid, article_url, misses):
+        """Download the images claimed by save_article_images. Returns True
+        if they were all saved"""
+
+        # Get all the article's missing images at once
+        try:
+            with metrics.timed("image_download_seconds"):
+                responses = self.engine.get_many(list(misses))
+
+        except Exception as e: # Treat every image as failed
+            responses = [e] * len(misses)
+
+        all_saved = True
+
+        for (img_url, img_filename), r in zip(misses.items(), responses):
+            img_id = img_url.split("/")[-1]
+
+            # If the image was retrieved
+            if not isinstance(r, Exception) and r.status_code == 200:
+                self.add_image(img_id, img_url, img_filename, r.content)
+                metrics.inc("images_total", result="downloaded")
+                metrics.inc("image_bytes_total", len(r.content))
+
+                if self.retry_queue is not None:
+                    self.retry_queue.add_success(IMAGE, img_url)
+
+            else:
+                if isinstance(r, Exception): # No response at all
+                    status, error, retry_after = None, repr(r), None
+
+                else:
+                    status, error = r.status_code, "HTTP {}".format(r.status_code)
+                    retry_after = parse_retry_after(r.headers.get("retry-after"))
+
+                all_saved = False
+                with self.lock:
+                    self.stats["failed"] += 1
+                    self.in_flight.discard(img_id)
+                    self.download_done.notify_all()
+
+                self.image_failed(article_uuid, article_url, img_url, img_filename, status, error,
+                    retry_after)
+
+        return all_saved
+
+
+    def image_failed(self, article_uuid, article_url, img_url, img_filename, status, error, retry_after):
+        """Log an image that couldn't be saved and schedule it to be tried
+        again"""
+
+        metrics.inc("images_total", result="failed")
+        log_event("image", "failed", article_uuid, logging.WARNING, url=img_url,
+            status=status, error=error)
+
+        if self.retry_queue is not None: # Try it again later
+            self.retry_queue.add_failure(IMAGE, img_url, img_url, error, status, retry_after,
+                {"article_uuid": article_uuid, "article_url": article_url,
+                "img_filename": img_filename})
+
+
+    def add_image(self, img_id, img_url, img_filename, content):
+        """Write an image to disk and add it to the index. Images are always
+        saved in image_dir, under the name ArticlePage gave them"""
+
+        img_filename = path.join(self.image_dir, path.basename(img_filename))
+        sha256 = hashlib.sha256(content).hexdigest()
+
+        with self.lock:
+            duplicate_of = self.hashes.get(sha256)
+
+        written = False
+
+        if duplicate_of is not None: # Same content already saved under another ID
+            try: # Point the new name at the existing file
+                os.link(path.join(self.image_dir, "{}.jpg".format(duplicate_of)), img_filename)
+
+            except FileExistsError:
+                written = True
+
+            except OSError: # If hard links aren't possible, write a copy
+                pass
+
+            else:
+                written = True
+
+        if not written:
+            # Write to a temporary file first so a crash never leaves half an image
+            with metrics.timed("write_seconds", kind="image"):
+                tmp_filename = "{}.{}.tmp".format(img_filename, threading.get_ident())
+                with open(tmp_filename, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_filename, img_filename)
+
+        with self.lock:
+            self.sizes[img_id] = len(content)
+            self.hashes.setdefault(sha256, img_id)
+            self.in_flight.discard(img_id)
+            self.download_done.notify_all()
+            self.stats["bytes_downloaded"] += len(content)
+            if duplicate_of is not None:
+                self.stats["duplicates"] += 1
+
+            with self.conn:
+                self.conn.execute("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?)",
+                    (img_id, sha256, len(content), img_url, time.time()))
+
+
+    def get_image_articles(self, img_id):
+        """Return the UUIDs of the articles that use an image"""
+
+        with self.lock:
+            rows = self.conn.execute("SELECT article_uuid FROM image_refs WHERE img_id = ?",
+                (img_id,)).fetchall()
+
+        return [article_uuid for article_uuid, in rows]
+
+
+    def get_stats(self):
+        """Return the hit and miss counters"""
+        with self.lock:
+            return dict(self.stats)
+
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,160 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T18:41:12+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: keywordMatcher.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T18:41:12+10:00
+
+# Import packages
+import re
+from functools import lru_cache
+
+try: # pyahocorasick is faster for long term lists but isn't required
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Fields of the article records searched when none are chosen
+DEFAULT_FIELDS = ("title", "h1", "key_points", "article_body_text")
+
+
+def is_word_char(char):
+    """Return True for the characters the regex \\w class matches"""
+    return char.isalnum() or char == "_"
+
+
+class KeywordMatcher:
+    """This class finds several lists of terms in article text in one pass.
+    Every term from every list is compiled once, either into an Aho-Corasick
+    automaton if pyahocorasick is installed or into one alternation regex.
+    Matching ignores case. At each position the longest matching term wins
+    and matches don't overlap, whichever backend is used. If whole_words is
+    True, terms only match where they aren't part of a longer word."""
+
+    def __init__(self, term_lists, whole_words=True, use_automaton=True):
+        """Initialise the object. term_lists is a dictionary of list names
+        and terms, or a single list of terms named "default" """
+
+        if not isinstance(term_lists, dict):
+            term_lists = {"default": term_lists}
+
+        self.whole_words = whole_words
+
+        # The lists each term belongs to, since lists can share terms
+        self.term_lists = {}
+        for list_name, terms in term_lists.items():
+            for term in terms:
+                self.term_lists.setdefault(term.lower(), []).append(list_name)
+
+        self.list_names = list(term_lists)
+
+        # Longest terms first so the regex prefers them at the same position
+        terms = sorted(self.term_lists, key=lambda term: (-len(term), term))
+
+        self.automaton = None
+        if ahocorasick is not None and use_automaton and terms:
+            self.automaton = ahocorasick.Automaton()
+            for term in terms:
+                self.automaton.add_word(term, term)
+            self.automaton.make_automaton()
+
+        # The regex is also used for text whose length changes when lowercased
+        pattern = "|".join(re.escape(term) for term in terms) or "(?!)"
+        if whole_words:
+            pattern = r"(?<!\w)(?:{})(?!\w)".format(pattern)
+        self.regex = re.compile(pattern, re.IGNORECASE)
+
+
+    def _find_with_automaton(self, lowered):
+        """Find the matches with the automaton, keeping the longest term at
+        each position and dropping overlapping matches"""
+
+        found = []
+        for end, term in self.automaton.iter(lowered):
+            start = end - len(term) + 1
+
+            if self.whole_words and ((start > 0 and is_word_char(lowered[start - 1]))
+                    or (end + 1 < len(lowered) and is_word_char(lowered[end + 1]))):
+                continue
+
+            found.append((start, end + 1, term))
+
+        found.sort(key=lambda match: (match[0], -match[1]))
+
+        matches = []
+        last_end = 0
+        for start, end, term in found:
+            if start >= last_end:
+                matches.append((start, end, term))
+                last_end = end
+
+        return matches
+
+
+    def find_matches(self, text):
+        """Return a list of (start, end, term) for every match in text"""
+
+        if not text:
+            return []
+
+        if self.automaton is not None:
+            lowered = text.lower()
+
+            # Positions in the lowercased text only line up if it's the same length
+            if len(lowered) == len(text):
+                return self._find_with_automaton(lowered)
+
+        return [(match.start(), match.end(), match.group(0).lower())
+            for match in self.regex.finditer(text)]
+
+
+    def match_record(self, record, fields=DEFAULT_FIELDS):
+        """Search the chosen fields of an article record. Returns a
+        dictionary with, for each list that matched, the total count, the
+        count of each term and every match as [field, start, end, term].
+        Fields that hold lists are searched item by item, named like
+        key_points[0]"""
+
+        results = {}
+
+        for field in fields:
+            value = record.get(field)
+
+            if isinstance(value, list):
+                texts = [("{}[{}]".format(field, i), each) for i, each in enumerate(value)]
+
+            else:
+                texts = [(field, value)]
+
+            for name, text in texts:
+                if not isinstance(text, str):
+                    continue
+
+                for start, end, term in self.find_matches(text):
+                    for list_name in self.term_lists.get(term, ()):
+                        result = results.setdefault(list_name, {"count": 0, "terms": {}, "matches": []})
+                        result["count"] += 1
+                        result["terms"][term] = result["terms"].get(term, 0) + 1
+                        result["matches"].append([name, start, end, term])
+
+        return results
+
+
+    def match_corpus(self, records, fields=DEFAULT_FIELDS):
+        """Search every (record ID, record) pair, as yielded by
+        corpusStore.iter_articles, and yield (record ID, record, results)
+        for the records that matched at least one term"""
+
+        for record_id, record in records:
+            results = self.match_record(record, fields)
+
+            if results:
+                yield record_id, record, results
+
+
+@lru_cache(maxsize=32)
+def get_keyword_matcher(terms, whole_words=True):
+    """Return a KeywordMatcher for a tuple of terms, compiling it the first
+    time those terms are used"""
+    return KeywordMatcher(list(terms), whole_words)
@@ -0,0 +1,80 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T19:10:26+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: main_articleIndex.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T19:10:26+10:00
+
+# Import required packages
+import time
+from articleIndex import ArticleIndex
+from corpusStore import iter_articles
+
+
+if __name__ == "__main__":
+    """ This Python file adds the new and changed converted articles to the
+    article index and then runs the queries below against it """
+
+    # Record the time the program started
+    start_time = time.monotonic()
+
+    # Change this variable to index the JSON files or the corpus shards
+    corpus_path = "../_data/json"
+
+    # Change this variable to merge the index segments after updating it.
+    # This is slower but makes the index smaller and its queries faster
+    optimize = False
+
+    # Change this variable to choose the queries, as (query, start date, end
+    # date). Queries use words, "phrases", AND, OR, NOT, brackets and the
+    # title:, body: and keywords: fields
+    queries = [
+        ('"year 12" AND (exam OR exams)', None, None),
+        ('keywords:education NOT university', "2012-01-01", "2015-12-31"),
+        ('title:teachers', "2020-01-01", None),
+        ]
+
+    # Open the index
+    index = ArticleIndex("../_data/article_index.sqlite")
+
+    # Queue the articles that are new or have changed since they were indexed
+    added = 0
+    seen = set()
+    for record_id, record in iter_articles(corpus_path):
+        seen.add(record_id)
+        added += index.add(record_id, record)
+
+        if len(index.pending) >= 1000: # Write the index in segments
+            index.commit()
+
+    index.commit()
+
+    # Remove the articles that are no longer in the corpus
+    removed = [record_id for record_id in index.live_docs if record_id not in seen]
+    for record_id in removed:
+        index.remove(record_id)
+
+    if optimize:
+        index.optimize()
+
+    # Record the time the index was updated
+    end_time = time.monotonic()
+
+    # Print the number of articles indexed and the time it took to do so
+    print("{} articles indexed, {} removed, {} in the index in {} minutes".format(added,
+        len(removed), len(index), (end_time - start_time)/60))
+
+    # Run each query and print the number of matching articles and the first few
+    for query, start_date, end_date in queries:
+        query_start = time.monotonic()
+        results = index.search(query, start_date, end_date)
+        query_time = time.monotonic() - query_start
+
+        print("{} ({} to {}): {} articles in {:.1f} ms".format(query, start_date or "start",
+            end_date or "end", len(results), query_time * 1000))
+
+        for result in results[:5]:
+            print("    {} {}".format(result["posted_date"], result["url"]))
+
+    index.close()
@@ -0,0 +1,165 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T20:06:51+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: main_benchmark.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T20:06:51+10:00
+
+# Import required packages
+import glob
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from datetime import datetime
+from functools import partial
+from multiprocessing import Pool
+from os import path, makedirs, cpu_count
+from benchmarkCorpus import generate_corpus, get_git_commit
+from parallelProcessingFunctions import article_html_to_json, get_articles_selected_words
+
+
+def get_peak_rss_mb(who):
+    """Return the peak resident memory of this process or its finished
+    children in megabytes. ru_maxrss is in kilobytes on Linux and bytes on
+    macOS"""
+
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(function, workers, filepaths, chunksize, results):
+    """Convert every file with a pool of workers and put the timing and peak
+    memory on the results queue. Runs in its own process so the peak memory
+    is only this case's"""
+
+    start_time = time.perf_counter()
+
+    with Pool(workers) as P:
+        successes = sum(P.map(function, filepaths, chunksize=chunksize))
+
+    seconds = time.perf_counter() - start_time
+
+    results.put({
+        "seconds": seconds,
+        "successes": successes,
+        "articles_per_second": len(filepaths) / seconds,
+        "peak_rss_mb": get_peak_rss_mb(resource.RUSAGE_SELF), # The process feeding the pool
+        "peak_worker_rss_mb": get_peak_rss_mb(resource.RUSAGE_CHILDREN), # The largest worker
+        })
+
+
+def compare_results(previous, current):
+    """Print the change in articles per second for each case that's in both
+    sets of results"""
+
+    previous_cases = {(each["function"], each["workers"]): each for each in previous["results"]}
+
+    print("Compared with {}:".format(previous["commit"][:12]))
+    for each in current["results"]:
+        before = previous_cases.get((each["function"], each["workers"]))
+        if before is not None:
+            change = each["articles_per_second"] / before["articles_per_second"] - 1
+            print("    {:<28} {:>3} workers {:+.1%}".format(each["function"], each["workers"], change))
+
+
+if __name__ == "__main__":
+    """ This Python file writes a synthetic corpus of ABC-like articles in
+    every page template and times article_html_to_json and
+    get_articles_selected_words over it with different numbers of workers.
+    The results are saved as JSON named after the git commit, so a change
+    can be compared with the commit before it """
+
+    # Change these variables to choose the size of the synthetic corpus. The
+    # same seed always writes the same articles
+    articles_per_template = 200
+    seed = 2022
+    noise_kb = 40 # Menus and page data around each article, in kilobytes
+
+    # Change this variable to choose the numbers of workers timed. The middle
+    # value is half of the cores
+    worker_counts = sorted({1, max(cpu_count() // 2, 1), cpu_count()})
+
+    # Change these variables to choose how often each case is run (the
+    # fastest run is kept) and how many articles are sent to a worker at once
+    repeats = 3
+    chunksize = 16
+
+    # Change this variable to compare with the results of another commit
+    compare_to = None
+
+    # Define the paths for the corpus and the results
+    corpus_dir = "../_data/benchmark/articles"
+    results_dir = "../_data/benchmark/results"
+    makedirs(results_dir, exist_ok=True)
+
+    # The timed functions write here rather than over the real data
+    json_dir = "../_data/benchmark/json"
+    matched_dir = "../_data/benchmark/json_matchedKeywords"
+    makedirs(json_dir, exist_ok=True)
+
+    # The functions timed. Both run with their default parser
+    functions = {
+        "article_html_to_json": partial(article_html_to_json, output_dir=json_dir),
+        "get_articles_selected_words": partial(get_articles_selected_words,
+            words_list=["student", "teacher", "school"], output_dir=matched_dir),
+        }
+
+    filepaths = generate_corpus(corpus_dir, articles_per_template, seed, noise_kb)
+    print("Wrote {} synthetic articles to {}".format(len(filepaths), corpus_dir))
+
+    commit, dirty = get_git_commit()
+    results = {
+        "commit": commit,
+        "dirty": dirty,
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": cpu_count(),
+        "corpus": {"articles": len(filepaths), "articles_per_template": articles_per_template,
+            "seed": seed, "noise_kb": noise_kb},
+        "results": [],
+        }
+
+    # Each case runs in a new process so its peak memory isn't mixed with the others
+    context = multiprocessing.get_context("spawn")
+
+    for function_name, function in functions.items():
+        for workers in worker_counts:
+            runs = []
+            for _ in range(repeats):
+                queue = context.Queue()
+                process = context.Process(target=run_case, args=(function, workers,
+                    filepaths, chunksize, queue))
+                process.start()
+                runs.append(queue.get())
+                process.join()
+
+            best = max(runs, key=lambda run: run["articles_per_second"])
+            best.update({"function": function_name, "workers": workers, "articles": len(filepaths),
+                "runs_articles_per_second": [run["articles_per_second"] for run in runs]})
+            results["results"].append(best)
+
+            print("{:<28} {:>3} workers {:>8.1f} articles/s  peak RSS {:.0f} MB (worker {:.0f} MB)".format(
+                function_name, workers, best["articles_per_second"], best["peak_rss_mb"],
+                best["peak_worker_rss_mb"]))
+
+    # Save the results under the commit they were measured at
+    results_filepath = path.join(results_dir, "{}{}.json".format(commit[:12], "-dirty" if dirty else ""))
+    with open(results_filepath, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print("Results saved to {}".format(results_filepath))
+
+    if compare_to is not None: # Short commit hashes can be used
+        previous_filepaths = sorted(glob.glob(path.join(results_dir, "{}*.json".format(compare_to))))
+
+        if previous_filepaths:
+            with open(previous_filepaths[0], "r") as f:
+                compare_results(json.load(f), results)
+
+        else:
+            print("No results saved for {}".format(compare_to))
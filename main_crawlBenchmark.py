@@ -0,0 +1,160 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T20:48:15+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: main_crawlBenchmark.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T20:48:15+10:00
+
+# Import required packages
+import json
+import platform
+import tempfile
+import time
+from datetime import datetime
+from os import path, makedirs
+import numpy as np
+from benchmarkCorpus import get_git_commit
+from mockABCServer import MockABCServer
+from fetchEngine import configure_fetch_engine, close_fetch_engine
+from crawlFrontier import CrawlFrontier
+from crawlPipeline import CrawlPipeline
+from imageStore import ImageStore
+from articleArchive import ArticleArchive
+from crawlMetrics import metrics
+from crawlLogging import start_logging
+from retryQueue import RetryQueue
+
+
+def summarise_timings(timings, seconds):
+    """Return the request counts, throughput and latency percentiles from
+    the fetch engine's (url, status, bytes, seconds) timings"""
+
+    latencies = np.array([each[3] for each in timings]) if timings else np.zeros(1)
+    total_bytes = sum(each[2] for each in timings)
+
+    statuses = {}
+    for each in timings:
+        statuses[str(each[1])] = statuses.get(str(each[1]), 0) + 1
+
+    return {
+        "requests": len(timings),
+        "statuses": statuses,
+        "bytes": total_bytes,
+        "requests_per_second": len(timings) / seconds,
+        "bytes_per_second": total_bytes / seconds,
+        "latency_p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "latency_p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "latency_p99_ms": float(np.percentile(latencies, 99)) * 1000,
+        }
+
+
+if __name__ == "__main__":
+    """ This Python file crawls a local mock of abc.net.au and its image CDN
+    with the same pipeline as main_dataCollection, and reports the pages per
+    second, bytes per second and request latency. The results are saved as
+    JSON named after the git commit """
+
+    # Change these variables to choose how the mock server behaves. Latency
+    # is in seconds and bandwidth is bytes per second for each response.
+    # Setting max_concurrent answers requests over that many at once with a
+    # 429, to see how the concurrency controller backs off
+    article_count = 500
+    server_settings = {
+        "latency": 0.05,
+        "latency_jitter": 0.05,
+        "bandwidth": 2 * 1024 * 1024,
+        "error_rate": 0.0,
+        "throttle_rate": 0.0,
+        "max_concurrent": None,
+        "images_per_article": 3,
+        "image_pool": 1000,
+        "image_kb": 60,
+        }
+
+    # Change these variables to choose the crawl settings being tuned
+    requests_per_second = 50
+    max_connections = 20
+    adaptive_concurrency = True
+    retry_failures = True
+    download_threads = 16
+    image_threads = 8
+
+    # Define the path for the results
+    results_dir = "../_data/benchmark/results"
+    makedirs(results_dir, exist_ok=True)
+
+    # Start the mock server and send the ABC URLs to it
+    mock_server = MockABCServer(**server_settings)
+    mock_server.start()
+
+    engine = configure_fetch_engine(requests_per_second=requests_per_second,
+        max_connections=max_connections, adaptive_concurrency=adaptive_concurrency,
+        url_overrides=mock_server.url_overrides, record_timings=True)
+
+    # Keep everything the crawl writes out of the real data folder
+    with tempfile.TemporaryDirectory() as work_dir:
+        frontier = CrawlFrontier(path.join(work_dir, "frontier.sqlite"))
+        makedirs(path.join(work_dir, "images"))
+        image_store = ImageStore(path.join(work_dir, "images"), path.join(work_dir, "images.sqlite"))
+        archive = ArticleArchive(path.join(work_dir, "archive"))
+        retry_queue = RetryQueue(path.join(work_dir, "retry_queue.sqlite"), base_delay=0.5) if retry_failures else None
+        log_listener = start_logging(path.join(work_dir, "crawl_log.jsonl"))
+
+        pipeline = CrawlPipeline(frontier, image_store, archive, article_workers=download_threads,
+            image_workers=image_threads, retry_queue=retry_queue)
+
+        print("Crawling {} articles from {}".format(article_count, mock_server.base_url))
+
+        start_time = time.monotonic()
+        pipeline.submit_many(frontier.add_urls(mock_server.article_urls(article_count)))
+        counts = pipeline.close()
+        seconds = time.monotonic() - start_time
+
+        image_stats = image_store.get_stats()
+
+        log_listener.close()
+        archive.close()
+        if retry_queue is not None:
+            retry_queue.close()
+        image_store.close()
+        frontier.close()
+
+    close_fetch_engine()
+    server_stats = mock_server.get_stats()
+    mock_server.stop()
+
+    commit, dirty = get_git_commit()
+    results = {
+        "commit": commit,
+        "dirty": dirty,
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "server": server_settings,
+        "server_stats": server_stats,
+        "crawl": {"articles": article_count, "requests_per_second": requests_per_second,
+            "max_connections": max_connections, "adaptive_concurrency": adaptive_concurrency,
+            "retry_failures": retry_failures,
+            "download_threads": download_threads,
+            "image_threads": image_threads},
+        "seconds": seconds,
+        "counts": counts,
+        "pages_per_second": counts["downloaded"] / seconds,
+        "images": image_stats,
+        "requests": summarise_timings(engine.timings, seconds),
+        "metrics": json.loads(metrics.to_json()), # Where the time went in each stage
+        }
+
+    # Print the throughput and latency
+    print("{} pages in {:.1f} s: {:.1f} pages/s, {:.2f} MB/s".format(counts["downloaded"], seconds,
+        results["pages_per_second"], results["requests"]["bytes_per_second"] / (1024 * 1024)))
+    print("Latency p50 {latency_p50_ms:.0f} ms, p95 {latency_p95_ms:.0f} ms, p99 {latency_p99_ms:.0f} ms, "
+        "statuses {statuses}".format(**results["requests"]))
+
+    # Save the results under the commit they were measured at
+    results_filepath = path.join(results_dir, "crawl-{}{}.json".format(commit[:12], "-dirty" if dirty else ""))
+    with open(results_filepath, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print("Results saved to {}".format(results_filepath))
@@ -7,94 +7,212 @@
 # @Last modified time: 2022-09-17T22:12:19+10:00
 
 # import required packages
-from selenium import webdriver
 from datetime import datetime, timedelta
 from os import path
 import time
-from multiprocessing import Pool
 
 # Import custom packages
-from ABCWebComponents import TopicPage, ArticlePage
-from parallelProcessingFunctions import download_article
+from ABCWebComponents import TopicPage, HTTPTopicPage, ArticlePage, get_article_uuid, make_chrome_driver
+from crawlFrontier import CrawlFrontier, FAILED
+from crawlPipeline import CrawlPipeline
+from imageStore import ImageStore
+from articleArchive import ArticleArchive
+from fetchEngine import configure_fetch_engine, close_fetch_engine
+from httpCache import HTTPCache
+from crawlMetrics import metrics, MetricsWriter
+from crawlLogging import start_logging
+from retryQueue import RetryQueue, ARTICLE, IMAGE
+from topicScheduler import TopicScheduler
+from sitemapDiscovery import SitemapDiscovery, split_date_range
 
 if __name__ == "__main__":
 
     # Determine how long the program takes to process one topic page
     start_time = time.monotonic()
 
-    # Example from https://selenium-python.readthedocs.io/waits.html
-
-    driver = webdriver.Chrome(executable_path = '/Users/laurenscoble/opt/chromedriver') #start my crawler
-
-    topic_page = TopicPage(driver)
-
-    topic_page.get_web_page('https://www.abc.net.au/news/topic/university')
-
-    topic_page.click_cookie_consent('CookieBanner_AcceptABCRequired')
-
-    more_stories = True # Set the stories flag
-
-    # Create a list to store the article URLs that have already been collected
-    articles_processed = []
-
-    # Count articles processed during runtime
-    article_count = 0
-
-    while more_stories: # While there are stories still to load on the page
-
-        # Wait to ensure that the page has fully loaded
-        time.sleep(10) # seconds
-
-        # Find all the story cards on the page and get their URLs
-        tmp_urls = topic_page.get_story_links('CardHeading')
-
-        # Remove any URLs that have already been processed in this execution
-        article_urls = [url for url in tmp_urls if url not in articles_processed]
-
-        # Let the user know how many stories need to be downloaded
-        print("***************************************************")
-        print("*             {} STORIES TO PROCESS               *".format(len(article_urls)))
-        print("***************************************************")
-
-        # Use multiprocessors to download articles simutaneously
-        with Pool() as P:
-            # Use the download articles function with the articles URL
-            success_count = P.map(download_article, article_urls)
-
-            # Increment the article_count
-            article_count += sum(success_count)
-
-        # Time check
-        time_check = time.monotonic()
-
-        # Every 100 articles, print a user message
-        if article_count % 100 == 0 and article_count != 0:
-            print("Program has downloaded {} articles in {} minutes.".format(article_count,timedelta(minutes=time_check - start_time)))
-
-        # Update the articles_processed list to include the articles just downloaded
-        articles_processed += article_urls
-
-        # Get the posted date of the last story displayed on the page
-        last_story_date = datetime.strptime(topic_page.get_last_story_card_publish_date('Timestamp'),'%Y-%m-%dT%H:%M:%S.%fZ')
-
-        # If the year of the last_story_date is before 2012, stop loading more stories
-        if last_story_date.year < 2012:
-            more_stories = False
-
-        else: # If the stories are less than 10 years old
-
-            # Scroll to the bottom of the page
-            driver.execute_script("window.scrollTo(0,document.body.scrollHeight);")
-
-            # Click the pagination load more button
-            try:
-                more_stories = topic_page.click_load_more('PaginationLoadMoreButton')
-
-            except:
-                more_stories = False
-
-    # Chrome driver no longer needed
-    driver.close()
+    # Change these variables to control how hard the ABC servers are pushed.
+    # All requests share one rate limit per host, so the download threads only
+    # need to be numerous enough to keep that budget full
+    requests_per_second = 2
+    download_threads = 16
+    image_threads = 8
+
+    # Change these variables to choose the topics to collect and the dates
+    # the stories were published between. The topics are read at the same
+    # time, topics_in_parallel at once
+    topic_urls = [
+        'https://www.abc.net.au/news/topic/university',
+        'https://www.abc.net.au/news/topic/education',
+        'https://www.abc.net.au/news/topic/schools',
+        'https://www.abc.net.au/news/topic/teachers',
+        ]
+    date_windows = [(datetime(2012, 1, 1), datetime.now())]
+    topics_in_parallel = 4
+
+    # Change these variables to find the stories in the ABC news sitemap
+    # instead of the topic pages. The dates are split into windows of
+    # sitemap_window_days days whose sitemaps are read at the same time, and
+    # only stories whose news keywords match sitemap_topic_pattern are kept.
+    # sitemap_location can also be a saved sitemap file
+    discover_from_sitemap = False
+    sitemap_location = "https://www.abc.net.au/news/sitemap.xml"
+    sitemap_window_days = 31
+    sitemap_topic_pattern = r"universit|education|school|teacher"
+
+    # Change this variable to use Chrome to click through the topic pages
+    # instead of requesting the stories with plain HTTP
+    use_browser = False
+
+    # Change this variable to choose how long the browser is given to load
+    # more story cards before the topic is treated as finished
+    card_timeout = 10
+
+    # Change these variables to choose how the browser runs. Headless Chrome
+    # with images, fonts and ads blocked loads the topic pages faster and
+    # uses less memory. A new browser is started every browser_recycle_every
+    # Load Mores, carrying on from the same story card, so memory stays flat
+    # over a long crawl. browser_prune_cards also removes the story cards
+    # from the page once read, but it hasn't been checked against the live
+    # page yet, so it's off
+    browser_headless = True
+    browser_block_resources = True
+    browser_recycle_every = 200
+    browser_prune_cards = False
+
+    # Change this variable to choose where how far each topic has been read
+    # is saved, so a crawl that stops carries on from there next time
+    topic_checkpoint_filepath = "../_data/topic_checkpoint.json"
+
+    # Change this variable to run the crawl from the HTTP cache without
+    # using the network. The topic pages, their Load More pages and the
+    # article pages fetched by earlier runs are cached. Images, sitemaps and
+    # pages read by the browser aren't, so images are skipped and only the
+    # plain HTTP topic pages work offline. Articles already in the frontier
+    # are still skipped, so point the frontier at a new file to save them
+    # again from the cache
+    offline = False
+
+    # Change this variable to store the raw article pages in compressed
+    # archive segments instead of one HTML file per article
+    archive_html = False
+
+    # Change this variable to only try the failed articles and images again,
+    # including the dead letters, without reading the topic page
+    retry_failed_only = False
+
+    # Change this variable to choose where the metrics snapshot is written
+    # during the crawl. Files ending in .prom are in the Prometheus text
+    # format, otherwise JSON
+    metrics_filepath = "../_data/crawl_metrics.prom"
+
+    # Change this variable to choose where each article's download events
+    # are logged, one JSON object per line
+    log_filepath = "../_data/crawl_log.jsonl"
+
+    # Write the fetch, parse, image and write timings out every few seconds
+    metrics_writer = MetricsWriter(metrics, metrics_filepath)
+
+    # Log the workers' events through a queue to one writer thread
+    log_listener = start_logging(log_filepath)
+
+    # Set up the fetch engine that all article and image requests go through.
+    # Article pages are cached so unchanged pages only cost a 304
+    configure_fetch_engine(requests_per_second=requests_per_second,
+        cache=HTTPCache("../_data/http_cache", offline=offline))
+
+    # Open the record of the articles found by this and previous runs
+    frontier = CrawlFrontier("../_data/frontier.sqlite")
+
+    # If this is the first run with a frontier, record the articles that are
+    # already in the articles folder so they aren't downloaded again
+    if len(frontier) == 0:
+        print("{} previously downloaded articles added to the frontier".format(
+            frontier.seed_from_directory("../_data/articles")))
+
+    # Open the index of saved images so images shared between articles are
+    # only downloaded once
+    image_store = ImageStore("../_data/images", "../_data/images.sqlite")
+
+    # Open the article archive if it's being used
+    archive = ArticleArchive("../_data/archive") if archive_html else None
+
+    # Open the failed downloads waiting to be tried again
+    retry_queue = RetryQueue("../_data/retry_queue.sqlite")
+
+    # Start the download workers. They run for the whole program, taking
+    # URLs from a queue as the topic page is read. Failed downloads are
+    # retried alongside them. Images aren't cached, so they're left out offline
+    pipeline = CrawlPipeline(frontier, image_store, archive, article_workers=download_threads,
+        image_workers=image_threads, retry_queue=retry_queue, download_images=not offline)
+
+    if retry_failed_only:
+        # Make every retry due now, including the ones that ran out of attempts
+        print("{} failed downloads to retry".format(retry_queue.retry_now()))
+
+        # Articles that failed before there was a retry queue
+        pipeline.submit_many(url for url in frontier.get_urls((FAILED,))
+            if (ARTICLE, get_article_uuid(url)) not in retry_queue)
+
+    else:
+        # Queue the articles a previous run found but didn't download before it stopped
+        pipeline.submit_many(frontier.get_urls())
+
+    # Read the sitemap or the topic pages for new stories, unless only
+    # retrying. The topics are read at the same time and an article in
+    # several topics is only downloaded once
+    if not retry_failed_only and discover_from_sitemap:
+        discovery = SitemapDiscovery(frontier, pipeline, sitemap_location, [window
+            for start, end in date_windows for window in split_date_range(start, end, sitemap_window_days)],
+            topic_pattern=sitemap_topic_pattern, max_parallel=topics_in_parallel)
+        discovery.run()
+
+    elif not retry_failed_only:
+        if use_browser:
+            # Example from https://selenium-python.readthedocs.io/waits.html
+            def make_topic_page():
+                return TopicPage(make_chrome_driver('/Users/laurenscoble/opt/chromedriver',
+                    headless=browser_headless, block_resources=browser_block_resources),
+                    prune_cards=browser_prune_cards) #start my crawler
+
+            recycle_every = browser_recycle_every
+
+        else: # Get the stories without a browser
+            make_topic_page = HTTPTopicPage
+            recycle_every = None
+
+        # Each read waits for the new story cards to appear, up to
+        # card_timeout seconds, instead of sleeping
+        scheduler = TopicScheduler(frontier, pipeline, topic_urls, date_windows,
+            make_topic_page=make_topic_page, max_parallel=topics_in_parallel, card_timeout=card_timeout,
+            recycle_every=recycle_every, checkpoint_path=topic_checkpoint_filepath)
+        scheduler.run()
+
+    # Wait for the queued articles and images to finish downloading
+    article_count = pipeline.close()["downloaded"]
+
+    # Let the user know what's left to retry and what's failed for good
+    print("{} downloads waiting to retry, {} articles and {} images failed for good".format(
+        len(retry_queue), len(retry_queue.get_dead_letters(ARTICLE)),
+        len(retry_queue.get_dead_letters(IMAGE))))
+
+    # Let the user know how much downloading the image index saved
+    image_stats = image_store.get_stats()
+    print("Images: {} already saved, {} downloaded, {} failed, {:.1f} MB not downloaded again".format(
+        image_stats["hits"], image_stats["misses"] - image_stats["failed"],
+        image_stats["failed"], image_stats["bytes_saved"] / 1e6))
+
+    # Write the final metrics and the logged events
+    metrics_writer.close()
+    log_listener.close()
+
+    # Close the pooled connections, the frontier and the image index
+    close_fetch_engine()
+    frontier.close()
+    image_store.close()
+    retry_queue.close()
+
+    if archive is not None:
+        archive.close()
 
     # Get the end time
     end_time = time.monotonic()
@@ -7,49 +7,233 @@
 # @Last modified time: 2022-05-26T14:56:07+10:00
 
 # Import required packages
-from os import listdir
-from os.path import isfile, join
+from os import scandir
+from os.path import join
 from multiprocessing import Pool
 from datetime import timedelta
 import time
-from parallelProcessingFunctions import article_html_to_json
+from parallelProcessingFunctions import convert_article_file, convert_archived_article, get_archive_record_hash, collect_worker_stats, init_preprocessing_worker, get_output_filepath
+from articleExtractors import TemplateStats, EXTRACTOR_VERSION
+from articleArchive import ArticleArchive
+from conversionManifest import ConversionManifest
+from corpusStore import CorpusWriter
+from progressReporter import ProgressReporter
+from crawlMetrics import metrics, MetricsWriter
+from crawlLogging import start_logging
 import csv
+from functools import partial
+from articleParsing import get_parser_backend
+
+
+def iter_html_tasks(path_to_html, manifest, output_dir, progress, skipped):
+    """ Stream the conversion tasks for the HTML files in path_to_html,
+    leaving out the files that haven't been modified since they were
+    converted by this extractor version into output_dir """
+
+    for entry in scandir(path_to_html): # Stat each file as it's listed
+        if entry.is_file():
+            source = join(path_to_html, entry.name)
+            stat = entry.stat()
+
+            if manifest.is_current(source, stat.st_size, stat.st_mtime, EXTRACTOR_VERSION, output_dir):
+                skipped[0] += 1
+
+            else: # Workers check the hash in case only the modified time changed
+                progress.add_total()
+                yield (source, manifest.get_known_hash(source, EXTRACTOR_VERSION, output_dir))
+
+
+def iter_archive_tasks(archive, path_to_html, manifest, output_dir, progress, skipped):
+    """ Stream the conversion tasks for the archived articles, leaving out
+    the records that were converted by this extractor version into
+    output_dir """
+
+    for entry in archive.iter_index():
+        # Name the archived articles the same way as the HTML files
+        source = join(path_to_html, "{}.html".format(entry[0]))
+
+        if manifest.get_known_hash(source, EXTRACTOR_VERSION, output_dir) == get_archive_record_hash(entry):
+            skipped[0] += 1
+
+        else:
+            progress.add_total()
+            yield entry
+
 
 if __name__ == "__main__":
     """ This Python file processes the ABC article HTML into individual
-    JSON files """
+    JSON files. Only articles that are new, have changed or were converted
+    by an older extractor version are converted """
 
     # Record the time the program started
     start_time = time.monotonic()
 
+    # Change these variables to choose the HTML parser ("lxml", "html5lib",
+    # "html.parser" or "fastest") and to only build the parts of each page
+    # that are converted
+    parser = get_parser_backend("fastest")
+    partial_parse = True
+
+    # Change these variables to write the articles into JSON lines shards
+    # instead of one JSON file per article, and to gzip the shards
+    write_shards = False
+    compress_shards = True
+
+    # Change this variable to read the articles from the compressed archive
+    # segments written by main_dataCollection instead of the articles folder
+    read_from_archive = False
+
+    # Change these variables to tune the pool. Tasks are sent to the workers
+    # in chunks, and each worker is replaced after maxtasksperchild articles
+    # so memory held by old BeautifulSoup trees is given back
+    chunksize = 32
+    maxtasksperchild = 2000
+
+    # Change this variable to choose where the metrics snapshot is written
+    # during the run. Files ending in .prom are in the Prometheus text format,
+    # otherwise JSON
+    metrics_filepath = "../_data/preprocessing_metrics.prom"
+
+    # Change this variable to choose where each article's conversion events
+    # are logged, one JSON object per line
+    log_filepath = "../_data/preprocessing_log.jsonl"
+
     # Define the path for the HTML articles
     path_to_html = "../_data/articles"
 
-    # Get the filenames for each of the HTML articles
-    html_articles = [join(path_to_html,f) for f in listdir(path_to_html) if isfile(join(path_to_html,f))]
+    # Define the paths the JSON articles or the shards are written to
+    json_dir = "../_data/json"
+    corpus_dir = "../_data/corpus"
+
+    # Articles whose output isn't where this run writes are converted again,
+    # so switching between JSON files and shards doesn't leave gaps
+    output_dir = corpus_dir if write_shards else json_dir
+
+    # Open the record of previous conversions
+    manifest = ConversionManifest("../_data/conversion_manifest.sqlite")
+
+    # Report progress as articles finish. The total grows as files are listed
+    progress = ProgressReporter("articles")
+    skipped = [0] # Articles left out because they're already converted
+
+    # Stream the articles to convert rather than listing them all first
+    if read_from_archive:
+        archive = ArticleArchive("../_data/archive")
+        tasks = iter_archive_tasks(archive, path_to_html, manifest, output_dir, progress, skipped)
+        convert = convert_archived_article
 
-    # Change this variable to control the number of articles processed
-    # p_num = 1000
+    else:
+        tasks = iter_html_tasks(path_to_html, manifest, output_dir, progress, skipped)
+        convert = convert_article_file
 
-    # Let the user know how many articles are going to be processed
+    # Let the user know how the articles are going to be processed
     print("***************************************************")
-    print("*             {} ARTICLES TO PROCESS              *".format(len(html_articles)))
+    print("*             PROCESSING ARTICLES                 *")
     print("***************************************************")
+    print("Parsing with {}{}".format(parser, " (partial)" if partial_parse else ""))
+
+    # Open the shard writer if it's being used
+    corpus_writer = CorpusWriter(corpus_dir, compress=compress_shards) if write_shards else None
+
+    # Add up how often each page template was found and how long it took
+    template_stats = TemplateStats()
+
+    # Add up the workers' metrics here and write them out every few seconds
+    metrics_writer = MetricsWriter(metrics, metrics_filepath)
+
+    # The workers send their log records through a queue to one writer in
+    # this process
+    log_listener = start_logging(log_filepath, use_processes=True)
+
+    # Counts of the articles converted, and the manifest rows waiting to be saved
+    success_total = 0
+    processed_count = 0
+    unchanged_count = 0
+    converted_rows = []
+    unchanged_rows = []
+
+    # Print the article url and whether or not it was saved for reviewing,
+    # through one buffered file handle
+    log_file = open("../_data/conversion_log.csv", "a", newline="", buffering=1024 * 1024)
+    log_writer = csv.writer(log_file)
+
+    # Use multiprocessors to convert html articles to JSON simutaneously.
+    # Results are handled as they finish, in whatever order, so nothing is
+    # held for the whole corpus. When writing shards, the workers send the
+    # records back for this process to write
+    with Pool(initializer=init_preprocessing_worker, initargs=(log_listener.queue,),
+            maxtasksperchild=maxtasksperchild) as P:
+        results = P.imap_unordered(partial(collect_worker_stats, convert, parser=parser,
+            partial=partial_parse, as_record=write_shards, output_dir=json_dir), tasks,
+            chunksize=chunksize)
+
+        for (source, source_hash, size, mtime, conversion_success, record), worker_stats, worker_metrics in results:
+            template_stats.merge(worker_stats)
+            metrics.merge(worker_metrics)
+            progress.update()
+
+            if conversion_success is None: # Same contents, so only the stat changed
+                unchanged_rows.append((source, size, mtime))
+                unchanged_count += 1
+
+            else:
+                if corpus_writer is not None:
+                    output = None
+                    if record is not None:
+                        with metrics.timed("write_seconds", kind="corpus_shard"):
+                            corpus_writer.write(source, record)
+
+                        # Record the shard, so deleting it converts the article again
+                        output = join(corpus_dir, corpus_writer.shard_name)
+
+                else:
+                    output = get_output_filepath(source, json_dir)
+
+                converted_rows.append((source, source_hash, size, mtime, EXTRACTOR_VERSION,
+                    output, conversion_success))
+                log_writer.writerow([source, conversion_success])
+
+                success_total += conversion_success
+                processed_count += 1
+
+            # Save the manifest in batches
+            if len(converted_rows) + len(unchanged_rows) >= 1000:
+                manifest.record_many(converted_rows)
+                manifest.touch_many(unchanged_rows)
+                converted_rows = []
+                unchanged_rows = []
+
+        # Let the workers exit on their own so they finish sending their log
+        # records. Leaving the with block terminates them, and a worker killed
+        # while writing to the log queue would leave it locked
+        P.close()
+        P.join()
+
+    progress.report()
+    metrics_writer.close()
+    log_listener.close()
+
+    manifest.record_many(converted_rows)
+    manifest.touch_many(unchanged_rows)
+    manifest.close()
+
+    log_file.close()
+
+    if corpus_writer is not None:
+        corpus_writer.close()
 
-    # Use multiprocessors to convert html articles to JSON simutaneously
-    with Pool() as P:
-        success_count = P.map(article_html_to_json,
-            html_articles)
+    if read_from_archive:
+        archive.close()
 
     # Record thet ime the program finished
     end_time = time.monotonic()
 
     # Print the number of articles converted and the time it took to do so
-    print("{} articles converted in {} minutes".format(sum(success_count),
+    print("{} articles converted in {} minutes".format(success_total,
         (end_time - start_time)/60))
+    print("{} processed, {} unchanged, {} skipped".format(processed_count,
+        unchanged_count, skipped[0]))
 
-    # Print the article url and whether or not it was saved for reviewing
-    for url, conversion_success in zip(html_articles, success_count):
-        with open("../_data/conversion_log.csv","a") as f:
-            writer = csv.writer(f)
-            writer.writerow([url,conversion_success])
+    # Print which page templates dominate the corpus
+    for line in template_stats.report():
+        print(line)
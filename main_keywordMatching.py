@@ -0,0 +1,73 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T18:41:12+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: main_keywordMatching.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T18:41:12+10:00
+
+# Import required packages
+import json
+import time
+from keywordMatcher import KeywordMatcher
+from corpusStore import iter_articles
+
+
+if __name__ == "__main__":
+    """ This Python file searches the converted articles for several lists
+    of keywords in one pass over the corpus. Each matching article is
+    written to a JSON lines file with the count of each term and where
+    every match was found """
+
+    # Record the time the program started
+    start_time = time.monotonic()
+
+    # Change this variable to search the JSON files or the corpus shards
+    corpus_path = "../_data/json"
+
+    # Change this variable to choose the keyword lists. Terms ignore case
+    # and only match whole words
+    term_lists = {
+        "students": ["student", "students", "pupil", "pupils"],
+        "teachers": ["teacher", "teachers", "principal", "principals"],
+        "schools": ["school", "schools", "primary school", "high school",
+            "secondary school"],
+        "universities": ["university", "universities", "tertiary education"],
+        }
+
+    # Change this variable to choose the article fields searched
+    fields = ("title", "h1", "key_points", "article_body_text")
+
+    # Define the file the matches are written to
+    output_filepath = "../_data/keyword_matches.jsonl"
+
+    # Compile every term list together once
+    matcher = KeywordMatcher(term_lists)
+
+    # Count the articles and matches for each list
+    article_counts = {list_name: 0 for list_name in term_lists}
+    term_counts = {list_name: {} for list_name in term_lists}
+    article_total = 0
+
+    with open(output_filepath, "w") as f:
+        for record_id, record, results in matcher.match_corpus(iter_articles(corpus_path), fields):
+            f.write(json.dumps({"id": record_id, "url": record.get("url"),
+                "matches": results}) + "\n")
+
+            article_total += 1
+            for list_name, result in results.items():
+                article_counts[list_name] += 1
+                for term, count in result["terms"].items():
+                    term_counts[list_name][term] = term_counts[list_name].get(term, 0) + count
+
+    # Record the time the program finished
+    end_time = time.monotonic()
+
+    # Print the number of articles that matched each list
+    print("{} articles matched in {} minutes".format(article_total,
+        (end_time - start_time)/60))
+
+    for list_name in term_lists:
+        print("{:<20} {:>8} articles  {}".format(list_name, article_counts[list_name],
+            ", ".join("{} {}".format(term, count) for term, count in
+            sorted(term_counts[list_name].items(), key=lambda item: -item[1]))))
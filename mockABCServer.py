@@ -0,0 +1,453 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T20:48:15+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: mockABCServer.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T20:48:15+10:00
+
+# Import packages
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from functools import lru_cache
+from os import path, makedirs
+from xml.sax.saxutils import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from benchmarkCorpus import TEMPLATE_BUILDERS, make_article_page
+
+# The real sites the mock server stands in for
+ABC_PREFIX = "https://www.abc.net.au"
+CDN_PREFIX = "https://live-production.wcms.abc-cdn.net.au"
+
+# Size of the pieces a response is written in when the bandwidth is limited
+CHUNK_SIZE = 16 * 1024
+
+# Date of the oldest story on the mock topic pages
+TOPIC_FIRST_DATE = datetime(2011, 7, 1)
+
+# Stories on the first page of a topic, before Load More
+TOPIC_PAGE_SIZE = 25
+
+# Topics the stories are tagged with in the sitemap keywords
+SITEMAP_TOPICS = ("university", "education", "schools", "teachers", "politics", "sport")
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """This class answers one request for the MockABCServer it belongs to"""
+
+    protocol_version = "HTTP/1.1" # Keep connections open like the real site
+
+    def do_GET(self):
+        """Send a page, an image or a fault"""
+
+        mock = self.server.mock
+        overloaded = mock.start_request()
+
+        try:
+            self.send_page(mock, overloaded)
+
+        finally:
+            mock.finish_request()
+
+
+    def send_page(self, mock, overloaded):
+        """Send the response for the path"""
+
+        status, headers, body = mock.get_response(self.path, overloaded)
+
+        # Wait as if the server were far away
+        if mock.latency or mock.latency_jitter:
+            time.sleep(mock.latency + mock.random_uniform(0, mock.latency_jitter))
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if mock.bandwidth: # Send the body a piece at a time at the bandwidth
+            for i in range(0, len(body), CHUNK_SIZE):
+                chunk = body[i:i + CHUNK_SIZE]
+                self.wfile.write(chunk)
+                time.sleep(len(chunk) / mock.bandwidth)
+
+        else:
+            self.wfile.write(body)
+
+        mock.count(status, len(body))
+
+
+    def log_message(self, format, *args):
+        """Don't print every request"""
+        pass
+
+
+class MockABCServer:
+    """This class runs a local HTTP server that stands in for abc.net.au and
+    its image CDN, so the download code can be run and timed without the
+    live site. Article pages are generated from the URL in one of the
+    benchmarkCorpus templates, with figures linking to CDN images, and
+    images are generated from their ID, so the same URL always gets the same
+    response. Latency, bandwidth, server errors and 429 responses can be
+    set to see how the crawl copes.
+
+    Topic pages like /news/topic/university list a story every one to three
+    days, newest first, for topic_days days from TOPIC_FIRST_DATE, with the
+    Load More endpoint HTTPTopicPage uses. Topics share stories on the same
+    day, so the same article turns up in several topics. The same stories,
+    tagged with their topics, are listed in a sitemap index at
+    /news/sitemap.xml with a gzipped child sitemap for each month.
+
+    Pages are served under /abc and images under /cdn. Pass url_overrides to
+    FetchEngine so the ABC URLs are sent here."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.05, latency_jitter=0.02,
+            bandwidth=None, error_rate=0.0, throttle_rate=0.0, retry_after=1, max_concurrent=None,
+            images_per_article=3, image_pool=1000, image_kb=60, noise_kb=40, topic_days=730,
+            seed=2022):
+        """Initialise the object. latency and latency_jitter are in seconds,
+        bandwidth is in bytes per second for each response (None is
+        unlimited), and error_rate and throttle_rate are the fraction of
+        requests answered with a 503 or a 429. If max_concurrent is set,
+        requests beyond that many at once also get a 429, like a server
+        that's overloaded rather than unlucky. Articles pick their images
+        from image_pool images, so some images are shared"""
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after # Seconds sent in the Retry-After header of a 429
+        self.max_concurrent = max_concurrent
+        self.images_per_article = images_per_article
+        self.image_pool = image_pool
+        self.image_kb = image_kb
+        self.noise_kb = noise_kb
+        self.topic_days = topic_days
+        self.seed = seed
+
+        self.server = ThreadingHTTPServer((host, port), MockRequestHandler)
+        self.server.daemon_threads = True
+        self.server.mock = self
+        self.thread = None
+
+        # Faults are drawn from one seeded generator, one request at a time
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+
+        # Counts of the responses sent, and the requests being answered
+        self.stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "bytes_sent": 0, "statuses": {}, "peak_concurrent": 0}
+        self.active = 0
+
+        # Generated bodies are kept so repeated requests don't make them again
+        self.make_page = lru_cache(maxsize=4096)(self.make_page)
+        self.make_image = lru_cache(maxsize=4096)(self.make_image)
+        self.get_topic_stories = lru_cache(maxsize=64)(self.get_topic_stories)
+
+
+    @property
+    def base_url(self):
+        """Return the address the server is listening on"""
+        host, port = self.server.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+
+    @property
+    def url_overrides(self):
+        """Return the FetchEngine url_overrides that send the ABC and CDN
+        URLs to this server"""
+        return {ABC_PREFIX: self.base_url + "/abc", CDN_PREFIX: self.base_url + "/cdn"}
+
+
+    def start(self):
+        """Start serving in a background thread and return the base URL"""
+
+        self.thread = threading.Thread(target=self.server.serve_forever,
+            name="MockABCServer", daemon=True)
+        self.thread.start()
+
+        return self.base_url
+
+
+    def stop(self):
+        """Stop serving and close the socket"""
+
+        self.server.shutdown()
+        self.server.server_close()
+
+        if self.thread is not None:
+            self.thread.join()
+
+
+    def random_uniform(self, low, high):
+        """Draw from the shared generator"""
+        with self.random_lock:
+            return self.random.uniform(low, high)
+
+
+    def start_request(self):
+        """Record a request starting and return True if there are more
+        than max_concurrent at once"""
+
+        with self.stats_lock:
+            self.active += 1
+            self.stats["peak_concurrent"] = max(self.stats["peak_concurrent"], self.active)
+
+            return self.max_concurrent is not None and self.active > self.max_concurrent
+
+
+    def finish_request(self):
+        """Record a request finishing"""
+        with self.stats_lock:
+            self.active -= 1
+
+
+    def count(self, status, size):
+        """Record a response that was sent"""
+
+        with self.stats_lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_sent"] += size
+            self.stats["statuses"][status] = self.stats["statuses"].get(status, 0) + 1
+
+
+    def get_stats(self):
+        """Return a copy of the response counts"""
+
+        with self.stats_lock:
+            return dict(self.stats, statuses=dict(self.stats["statuses"]))
+
+
+    def article_urls(self, count, first_date=datetime(2012, 1, 1)):
+        """Return count article URLs in the ABC URL format, one a day from
+        first_date"""
+
+        return ["{}/news/{}/mock-article-{}/{}".format(ABC_PREFIX,
+            (first_date + timedelta(days=i)).strftime("%Y-%m-%d"), i, 2000000 + i)
+            for i in range(count)]
+
+
+    def topic_urls(self, topics):
+        """Return the ABC URLs of topic pages"""
+        return ["{}/news/topic/{}".format(ABC_PREFIX, topic) for topic in topics]
+
+
+    def get_topic_stories(self, topic):
+        """Return the stories listed on a topic page, newest first, as
+        {"link": ..., "dates": {"firstPublished": ...}} like the ABC JSON"""
+
+        step = zlib.crc32(topic.encode("utf-8")) % 3 + 1 # Days between stories
+        stories = []
+
+        for day in range(self.topic_days - 1, -1, -step):
+            date = TOPIC_FIRST_DATE + timedelta(days=day)
+            stories.append({"link": "/news/{}/mock-story-{}/{}".format(date.strftime("%Y-%m-%d"),
+                day, 3000000 + day), "dates": {"firstPublished": (date + timedelta(hours=9)).strftime(
+                "%Y-%m-%dT%H:%M:%S.000Z")}})
+
+        return stories
+
+
+    def make_topic_page(self, topic):
+        """Generate a topic page with its first stories in the page JSON"""
+
+        stories = self.get_topic_stories(topic)
+        state = {"documentId": str(zlib.crc32(topic.encode("utf-8"))), "total": len(stories),
+            "collection": stories[:TOPIC_PAGE_SIZE]}
+
+        return ('<!DOCTYPE html><html><head><title>{} - ABC News</title></head><body>'
+            '<script type="application/json">{}</script></body></html>').format(topic,
+            json.dumps(state)).encode("utf-8")
+
+
+    def make_topic_listing(self, query):
+        """Return the next stories for the Load More endpoint"""
+
+        params = parse_qs(query)
+        topic = params.get("prepiPath", [""])[0].rstrip("/").split("/")[-1]
+        offset = int(params.get("offset", ["0"])[0])
+        size = int(params.get("size", [str(TOPIC_PAGE_SIZE)])[0])
+
+        return json.dumps({"collection": self.get_topic_stories(topic)[offset:offset + size]}).encode("utf-8")
+
+
+    def get_story_topics(self, day):
+        """Return the SITEMAP_TOPICS whose topic pages list the story from
+        day days after TOPIC_FIRST_DATE"""
+        return [topic for topic in SITEMAP_TOPICS
+            if (self.topic_days - 1 - day) % (zlib.crc32(topic.encode("utf-8")) % 3 + 1) == 0]
+
+
+    def get_sitemap_months(self):
+        """Return the first day of each month that has stories"""
+
+        months = []
+        for day in range(self.topic_days):
+            month = (TOPIC_FIRST_DATE + timedelta(days=day)).replace(day=1)
+            if not months or months[-1] != month:
+                months.append(month)
+
+        return months
+
+
+    def make_sitemap_index(self, prefix=ABC_PREFIX + "/news/sitemaps/"):
+        """Generate the sitemap index, listing the monthly sitemaps under
+        prefix"""
+
+        entries = "".join("<sitemap><loc>{}news-{}.xml.gz</loc><lastmod>{}</lastmod></sitemap>".format(
+            prefix, month.strftime("%Y-%m"), ((month + timedelta(days=32)).replace(day=1)
+            - timedelta(days=1)).strftime("%Y-%m-%d")) for month in self.get_sitemap_months())
+
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{}</sitemapindex>').format(
+            entries).encode("utf-8")
+
+
+    def make_sitemap(self, month):
+        """Generate the gzipped sitemap of the stories published in a month
+        like 2012-03, with their topics as news keywords. Program pages
+        that aren't articles are listed too"""
+
+        try:
+            first = datetime.strptime(month, "%Y-%m")
+
+        except ValueError:
+            return None
+
+        # The days after TOPIC_FIRST_DATE in the month
+        start = max(0, (first - TOPIC_FIRST_DATE).days)
+        end = min(self.topic_days, ((first + timedelta(days=32)).replace(day=1) - TOPIC_FIRST_DATE).days)
+
+        entries = []
+        for day in range(start, end):
+            date = TOPIC_FIRST_DATE + timedelta(days=day)
+            entries.append(('<url><loc>{}/news/{}/mock-story-{}/{}</loc><news:news>'
+                '<news:publication_date>{}</news:publication_date><news:keywords>{}</news:keywords>'
+                '</news:news></url>').format(ABC_PREFIX, date.strftime("%Y-%m-%d"), day, 3000000 + day,
+                (date + timedelta(hours=9)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                escape(", ".join(self.get_story_topics(day)))))
+
+            if day % 7 == 0: # A page that isn't an article
+                entries.append("<url><loc>{}/news/programs/mock-program/{}</loc><lastmod>{}</lastmod></url>".format(
+                    ABC_PREFIX, day, date.strftime("%Y-%m-%d")))
+
+        return gzip.compress(('<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+            'xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">{}</urlset>').format(
+            "".join(entries)).encode("utf-8"), mtime=0)
+
+
+    def write_sitemap_fixtures(self, directory):
+        """Save the sitemap index and monthly sitemaps in a directory, with
+        the index listing the monthly sitemaps by file name, so the sitemap
+        discovery can be run without the server. Returns the index path"""
+
+        makedirs(directory, exist_ok=True)
+
+        for month in self.get_sitemap_months():
+            with open(path.join(directory, "news-{}.xml.gz".format(month.strftime("%Y-%m"))), "wb") as f:
+                f.write(self.make_sitemap(month.strftime("%Y-%m")))
+
+        index_path = path.join(directory, "sitemap.xml")
+        with open(index_path, "wb") as f:
+            f.write(self.make_sitemap_index(prefix=""))
+
+        return index_path
+
+
+    def get_image_id(self, number):
+        """Return the CDN ID of one of the pool's images"""
+        return hashlib.md5("{}-{}".format(self.seed, number).encode("utf-8")).hexdigest()
+
+
+    def make_page(self, path):
+        """Generate the article page for a path like
+        /news/2013-10-30/slug/5056944"""
+
+        rng = random.Random(zlib.crc32(path.encode("utf-8")) ^ self.seed)
+
+        try:
+            posted = datetime.strptime(path.split("/")[2], "%Y-%m-%d")
+
+        except (IndexError, ValueError): # Not an article URL
+            return None
+
+        posted += timedelta(minutes=rng.randint(0, 24 * 60 - 1))
+        html = make_article_page(rng, rng.choice(list(TEMPLATE_BUILDERS)), posted, self.noise_kb)
+
+        figures = "".join(('<figure><div><img data-src="{}/{}?impolicy=wcms_crop_resize'
+            '&width=720&height=405" alt=""></div></figure>').format(CDN_PREFIX,
+            self.get_image_id(rng.randrange(self.image_pool)))
+            for _ in range(self.images_per_article))
+
+        return html.replace("</body>", figures + "</body>").encode("utf-8")
+
+
+    def make_image(self, img_id):
+        """Generate the bytes of an image from its ID"""
+
+        rng = random.Random(img_id)
+        return b"\xff\xd8\xff\xe0" + rng.randbytes(self.image_kb * 1024)
+
+
+    def get_response(self, path, overloaded=False):
+        """Return the (status, headers, body) for a request path, including
+        any fault"""
+
+        # Decide whether this request fails before looking at it
+        with self.random_lock:
+            draw = self.random.random()
+
+        if overloaded or draw < self.throttle_rate:
+            return 429, {"Retry-After": str(self.retry_after), "Content-Type": "text/plain"}, b"Too Many Requests"
+
+        if draw < self.throttle_rate + self.error_rate:
+            return 503, {"Content-Type": "text/plain"}, b"Service Unavailable"
+
+        path, _, query = path.partition("?")
+
+        if path.startswith("/abc/news/topic/"):
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, self.make_topic_page(
+                path[len("/abc/news/topic/"):].rstrip("/"))
+
+        if path == "/abc/news-web/api/loader/channelrefetch":
+            return 200, {"Content-Type": "application/json"}, self.make_topic_listing(query)
+
+        if path == "/abc/news/sitemap.xml":
+            return 200, {"Content-Type": "application/xml"}, self.make_sitemap_index()
+
+        if path.startswith("/abc/news/sitemaps/news-") and path.endswith(".xml.gz"):
+            body = self.make_sitemap(path[len("/abc/news/sitemaps/news-"):-len(".xml.gz")])
+            if body is not None:
+                return 200, {"Content-Type": "application/gzip"}, body
+
+        if path.startswith("/abc/"):
+            body = self.make_page(path[len("/abc"):])
+            if body is not None:
+                return 200, {"Content-Type": "text/html; charset=utf-8"}, body
+
+        elif path.startswith("/cdn/"):
+            return 200, {"Content-Type": "image/jpeg"}, self.make_image(path[len("/cdn/"):])
+
+        return 404, {"Content-Type": "text/plain"}, b"Not Found"
+
+
+# Testing the server
+if __name__ in "__main__":
+    mock_server = MockABCServer()
+    print("Serving on {}".format(mock_server.start()))
+    print(mock_server.article_urls(3))
+
+    try:
+        mock_server.thread.join()
+
+    except KeyboardInterrupt:
+        mock_server.stop()
@@ -0,0 +1,68 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T18:05:40+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: progressReporter.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T18:05:40+10:00
+
+# Import packages
+import threading
+import time
+from datetime import timedelta
+
+
+class ProgressReporter:
+    """This class prints the number of items done, the rate they're being
+    done at and, if the total is known, how long until they're all done. A
+    line is printed at most every report_seconds seconds."""
+
+    def __init__(self, label="items", total=None, report_seconds=10):
+        """Initialise the object"""
+        self.label = label
+        self.total = total # Can be increased as more items are found
+        self.report_seconds = report_seconds
+
+        self.done = 0
+        self.lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.last_report = self.start_time
+
+
+    def add_total(self, count=1):
+        """Add items that have been found but not done yet"""
+        with self.lock:
+            self.total = (self.total or 0) + count
+
+
+    def update(self, count=1):
+        """Record finished items and print a progress line if it's time"""
+
+        with self.lock:
+            self.done += count
+            now = time.monotonic()
+
+            if now - self.last_report < self.report_seconds:
+                return
+
+            self.last_report = now
+
+        self.report()
+
+
+    def report(self):
+        """Print a progress line"""
+
+        elapsed = time.monotonic() - self.start_time
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+
+        line = "{} {} done in {} ({:.1f}/s)".format(self.done, self.label,
+            timedelta(seconds=int(elapsed)), rate)
+
+        if self.total: # Estimate the time left from the average rate
+            remaining = max(self.total - self.done, 0)
+            eta = timedelta(seconds=int(remaining / rate)) if rate > 0 else "unknown"
+            line += ", {} of {} ({:.0%}), ETA {}".format(self.done, self.total,
+                self.done / self.total, eta)
+
+        print(line)
@@ -0,0 +1,304 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-18T23:14:26+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: retryQueue.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-18T23:14:26+10:00
+
+# Import packages
+import heapq
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from crawlMetrics import metrics
+from crawlLogging import log_event
+
+# The kinds of download that are retried separately
+ARTICLE = "article"
+IMAGE = "image"
+
+# Statuses that won't change by asking again, so they go straight to the
+# dead letters
+PERMANENT_STATUSES = (400, 401, 403, 404, 410, 451)
+
+
+def is_retryable(status):
+    """Check if a failed request is worth trying again. status is None if
+    there was no response"""
+    return status not in PERMANENT_STATUSES
+
+
+class RetryQueue:
+    """This class keeps the failed article and image downloads that are
+    waiting to be tried again, and the dead letters that ran out of attempts
+    or failed for good, in a SQLite database so they survive between runs.
+    Each failure waits for an exponential backoff with jitter, or for the
+    server's Retry-After if that's longer. Articles are keyed by their UUID
+    and images by their URL."""
+
+    def __init__(self, db_path="../_data/retry_queue.sqlite", max_attempts=5, base_delay=2.0,
+            max_delay=600.0, seed=None):
+        """Initialise the object. The nth retry waits between half and all of
+        base_delay * 2 ** (n - 1) seconds, up to max_delay"""
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.random = random.Random(seed)
+
+        # The connection is shared by the download threads, one at a time
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS retries (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            url TEXT NOT NULL,
+            payload TEXT,
+            attempts INTEGER NOT NULL,
+            next_attempt REAL NOT NULL,
+            last_error TEXT,
+            PRIMARY KEY (kind, key))""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS dead_letters (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            url TEXT NOT NULL,
+            payload TEXT,
+            attempts INTEGER NOT NULL,
+            last_error TEXT,
+            failed REAL NOT NULL,
+            PRIMARY KEY (kind, key))""")
+        self.conn.commit()
+
+        # Load the waiting retries into memory, with a heap ordered by when
+        # they're due. Old heap entries are skipped when they're popped
+        self.pending = {} # (kind, key) to [url, payload, attempts, next_attempt]
+        self.due_heap = []
+        self.in_progress = set() # Retries handed out that haven't finished
+
+        for kind, key, url, payload, attempts, next_attempt in self.conn.execute(
+                "SELECT kind, key, url, payload, attempts, next_attempt FROM retries"):
+            self.pending[(kind, key)] = [url, payload, attempts, next_attempt]
+            heapq.heappush(self.due_heap, (next_attempt, kind, key))
+
+
+    def __len__(self):
+        """Return the number of retries waiting or in progress"""
+        return len(self.pending)
+
+
+    def __contains__(self, kind_key):
+        """Check if a (kind, key) is waiting to be retried"""
+        return kind_key in self.pending
+
+
+    def get_delay(self, attempts):
+        """Return the backoff before the next attempt, with jitter so
+        failures from the same moment don't all come back together"""
+
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay / 2 + self.random.uniform(0, delay / 2)
+
+
+    def add_failure(self, kind, key, url, error, status=None, retry_after=None, payload=None):
+        """Record a failed download. It's scheduled to be tried again, or
+        moved to the dead letters if it can't succeed or has used all its
+        attempts. Returns True if it will be retried"""
+
+        now = time.time()
+        payload_json = None if payload is None else json.dumps(payload)
+
+        with self.lock:
+            self.in_progress.discard((kind, key))
+            attempts = self.pending[(kind, key)][2] + 1 if (kind, key) in self.pending else 1
+
+            if not is_retryable(status) or attempts >= self.max_attempts:
+                self.pending.pop((kind, key), None)
+
+                with self.conn:
+                    self.conn.execute("DELETE FROM retries WHERE kind = ? AND key = ?", (kind, key))
+                    self.conn.execute("INSERT OR REPLACE INTO dead_letters VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (kind, key, url, payload_json, attempts, error, now))
+
+                retrying = False
+
+            else: # Wait at least as long as the server asked
+                next_attempt = now + max(self.get_delay(attempts), retry_after or 0)
+                self.pending[(kind, key)] = [url, payload_json, attempts, next_attempt]
+                heapq.heappush(self.due_heap, (next_attempt, kind, key))
+
+                with self.conn:
+                    self.conn.execute("INSERT OR REPLACE INTO retries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (kind, key, url, payload_json, attempts, next_attempt, error))
+
+                retrying = True
+
+        metrics.inc("retries_total", kind=kind, result="scheduled" if retrying else "dead_letter")
+        log_event("retry", "scheduled" if retrying else "dead_letter",
+            key if kind == ARTICLE else (payload or {}).get("article_uuid"),
+            logging.INFO if retrying else logging.WARNING, kind=kind, url=url,
+            attempts=attempts, status=status, error=error)
+
+        return retrying
+
+
+    def add_success(self, kind, key):
+        """Record that a download worked, removing any retry waiting for it"""
+
+        if (kind, key) not in self.pending: # Most downloads were never retried
+            return
+
+        with self.lock:
+            self.in_progress.discard((kind, key))
+            if self.pending.pop((kind, key), None) is None:
+                return
+
+            with self.conn:
+                self.conn.execute("DELETE FROM retries WHERE kind = ? AND key = ?", (kind, key))
+
+        metrics.inc("retries_total", kind=kind, result="succeeded")
+
+
+    def get_image_failures(self, article_uuid):
+        """Return the URLs of an article's images waiting to be retried, and
+        of its images in the dead letters"""
+
+        with self.lock:
+            waiting = {item[0] for (kind, key), item in self.pending.items() if kind == IMAGE
+                and item[1] is not None and json.loads(item[1]).get("article_uuid") == article_uuid}
+
+            dead = {url for url, in self.conn.execute("""SELECT url FROM dead_letters
+                WHERE kind = ? AND json_extract(payload, '$.article_uuid') = ?""",
+                (IMAGE, article_uuid))}
+
+        return waiting, dead
+
+
+    def pop_due(self, now=None):
+        """Return the (kind, key, url, payload) of the retries that are due
+        and mark them as in progress"""
+
+        now = time.time() if now is None else now
+        due = []
+
+        with self.lock:
+            while self.due_heap and self.due_heap[0][0] <= now:
+                next_attempt, kind, key = heapq.heappop(self.due_heap)
+                item = self.pending.get((kind, key))
+
+                # Skip entries for retries that finished or were rescheduled
+                if item is None or item[3] != next_attempt or (kind, key) in self.in_progress:
+                    continue
+
+                self.in_progress.add((kind, key))
+                due.append((kind, key, item[0], None if item[1] is None else json.loads(item[1])))
+
+        return due
+
+
+    def seconds_until_due(self):
+        """Return the seconds until the next waiting retry is due, 0 if one
+        is due now, or None if none are waiting"""
+
+        with self.lock:
+            waiting = [item[3] for kind_key, item in self.pending.items()
+                if kind_key not in self.in_progress]
+
+        if not waiting:
+            return None
+
+        return max(0.0, min(waiting) - time.time())
+
+
+    def get_dead_letters(self, kind=None):
+        """Return the (kind, key, url, attempts, last_error) of the dead
+        letters"""
+
+        with self.lock:
+            return self.conn.execute("""SELECT kind, key, url, attempts, last_error
+                FROM dead_letters WHERE ? IS NULL OR kind = ? ORDER BY failed""", (kind, kind)).fetchall()
+
+
+    def retry_now(self, kind=None, include_dead_letters=True):
+        """Make every waiting retry due now and, if include_dead_letters is
+        True, move the dead letters back with their attempts reset. Used to
+        try just the failures again. Returns the number now due"""
+
+        now = time.time()
+
+        with self.lock, self.conn:
+            if include_dead_letters:
+                rows = self.conn.execute("""SELECT kind, key, url, payload FROM dead_letters
+                    WHERE ? IS NULL OR kind = ?""", (kind, kind)).fetchall()
+
+                self.conn.executemany("INSERT OR REPLACE INTO retries VALUES (?, ?, ?, ?, 0, ?, NULL)",
+                    [(row_kind, key, url, payload, now) for row_kind, key, url, payload in rows])
+                self.conn.execute("DELETE FROM dead_letters WHERE ? IS NULL OR kind = ?", (kind, kind))
+
+                for row_kind, key, url, payload in rows:
+                    self.pending[(row_kind, key)] = [url, payload, 0, now]
+
+            self.conn.execute("UPDATE retries SET next_attempt = ? WHERE ? IS NULL OR kind = ?",
+                (now, kind, kind))
+
+            count = 0
+            for (item_kind, key), item in self.pending.items():
+                if kind is None or item_kind == kind:
+                    item[3] = now
+                    heapq.heappush(self.due_heap, (now, item_kind, key))
+                    count += 1
+
+        return count
+
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
+
+
+class RetryScheduler:
+    """This class runs alongside the normal downloads, handing each retry
+    to submit_article or submit_images when it's due"""
+
+    def __init__(self, retry_queue, submit_article, submit_images, poll_seconds=1.0):
+        """Initialise the object and start the thread. submit_article is
+        passed the article URL, and submit_images the article URL and a
+        {img_url: img_filename} dictionary"""
+        self.retry_queue = retry_queue
+        self.submit_article = submit_article
+        self.submit_images = submit_images
+        self.poll_seconds = poll_seconds
+
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="RetryScheduler", daemon=True)
+        self.thread.start()
+
+
+    def _run(self):
+        """Submit the due retries until stopped"""
+
+        while not self.stopped.is_set():
+            for kind, key, url, payload in self.retry_queue.pop_due():
+                if kind == ARTICLE:
+                    self.submit_article(url)
+
+                else: # The payload says which article the image belongs to
+                    self.submit_images(payload["article_url"], {url: payload["img_filename"]})
+
+            # Sleep until the next retry is due, checking now and then in
+            # case new failures are due sooner
+            wait = self.retry_queue.seconds_until_due()
+            self.stopped.wait(self.poll_seconds if wait is None else min(wait, self.poll_seconds))
+
+
+    def close(self):
+        """Stop the thread"""
+        self.stopped.set()
+        self.thread.join()
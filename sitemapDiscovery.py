@@ -0,0 +1,409 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T11:05:37+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: sitemapDiscovery.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T11:05:37+10:00
+
+# Import packages
+import gzip
+import io
+import logging
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from os import path
+from urllib.parse import urljoin
+from xml.etree.ElementTree import iterparse
+from fetchEngine import get_fetch_engine
+from concurrencyController import parse_retry_after
+from crawlMetrics import metrics
+from crawlLogging import log_event
+
+# Only news article URLs are sent to the downloader by default, not topic,
+# program or video pages
+ARTICLE_URL_PATTERN = r"/news/\d{4}-\d{2}-\d{2}/"
+
+# The publish date in an article URL, e.g. /news/2013-10-30/slug/5056944
+URL_DATE = re.compile(r"/(\d{4}-\d{2}-\d{2})/")
+
+# The period a child sitemap covers, from its name, e.g. news-2012-03.xml.gz
+SITEMAP_PERIOD = re.compile(r"(?<!\d)((?:19|20)\d{2})(?:[-_/](\d{2}))?(?:[-_/](\d{2}))?(?!\d)")
+
+# The first bytes of a gzipped file
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Number of URLs sent to the frontier at once
+BATCH_SIZE = 500
+
+# Times a throttled or unavailable sitemap is asked for again, and the
+# longest wait between tries in seconds
+SITEMAP_RETRIES = 3
+MAX_RETRY_WAIT = 60
+
+# A <url> or <sitemap> element of a sitemap. kind is "url" or "sitemap",
+# date is the publish date, or the last modified date if there isn't one,
+# and keywords are the Google News keywords, if any
+SitemapEntry = namedtuple("SitemapEntry", ["kind", "loc", "date", "keywords"])
+
+
+def parse_w3c_date(value):
+    """Return a sitemap date like 2012-03-04 or 2012-03-04T10:00:00+11:00 as
+    a naive UTC datetime, or None"""
+
+    if not value:
+        return None
+
+    try:
+        date = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+
+    except ValueError:
+        return None
+
+    if date.tzinfo is not None: # Compare everything in UTC
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return date
+
+
+def split_date_range(start, end, window_days=31):
+    """Split the dates from start to end into (start, end) windows of
+    window_days days, so they can be read at the same time"""
+
+    windows = []
+    while start < end:
+        windows.append((start, min(start + timedelta(days=window_days), end)))
+        start = windows[-1][1]
+
+    return windows
+
+
+def get_sitemap_period(location):
+    """Return the (start, end) of the year, month or day in a sitemap's
+    name, or None if it doesn't have one"""
+
+    match = SITEMAP_PERIOD.search(path.basename(location.split("?")[0]))
+    if match is None:
+        return None
+
+    year, month, day = match.groups()
+
+    try:
+        if day is not None:
+            start = datetime(int(year), int(month), int(day))
+            return start, start + timedelta(days=1)
+
+        if month is not None:
+            start = datetime(int(year), int(month), 1)
+            return start, (start + timedelta(days=32)).replace(day=1)
+
+        return datetime(int(year), 1, 1), datetime(int(year) + 1, 1, 1)
+
+    except ValueError: # Digits that weren't a date after all
+        return None
+
+
+def is_url(location):
+    """Check if a sitemap location is a URL rather than a file"""
+    return re.match(r"https?://", location) is not None
+
+
+def resolve_location(base, location):
+    """Return a location in a sitemap relative to the sitemap it's in, so a
+    saved sitemap index can list its child sitemaps by file name"""
+
+    if is_url(base):
+        return urljoin(base, location)
+
+    if is_url(location) or path.isabs(location):
+        return location
+
+    return path.join(path.dirname(base), location)
+
+
+def open_sitemap(location):
+    """Open a sitemap file or URL for reading. URLs are fetched through the
+    fetch engine, so they share its rate limit for the host and its backoff
+    when the server throttles, and a throttled sitemap is asked for again.
+    The body is kept compressed and iter_sitemap unzips it as it's read"""
+
+    if not is_url(location):
+        return open(location, "rb")
+
+    for attempt in range(SITEMAP_RETRIES + 1):
+        r = get_fetch_engine().get(location)
+
+        if r.status_code == 200:
+            return io.BufferedReader(io.BytesIO(r.content))
+
+        if r.status_code not in (429, 503) or attempt == SITEMAP_RETRIES:
+            break
+
+        # Wait as long as the server asks, otherwise back off exponentially
+        wait = parse_retry_after(r.headers.get("retry-after"))
+        time.sleep(min(MAX_RETRY_WAIT, 2 ** attempt if wait is None else wait))
+
+    raise IOError("HTTP {} for {}".format(r.status_code, location))
+
+
+def iter_sitemap(location, open_location=open_sitemap):
+    """Stream the entries of a sitemap or sitemap index. Each element is
+    cleared once it's been read, so memory doesn't grow with the file.
+    Gzipped sitemaps are unzipped as they're read"""
+
+    with open_location(location) as stream:
+        if stream.peek(2)[:2] == GZIP_MAGIC:
+            stream = gzip.GzipFile(fileobj=stream)
+
+        root = None
+
+        for event, elem in iterparse(stream, events=("start", "end")):
+            if root is None: # Keep the root to clear the finished entries
+                root = elem
+
+            if event != "end":
+                continue
+
+            kind = elem.tag.rsplit("}", 1)[-1] # Drop the namespace
+            if kind not in ("url", "sitemap"):
+                continue
+
+            loc, lastmod, published, keywords = None, None, None, None
+
+            for child in elem.iter():
+                name = child.tag.rsplit("}", 1)[-1]
+
+                if name == "loc":
+                    loc = (child.text or "").strip()
+
+                elif name == "lastmod":
+                    lastmod = child.text
+
+                elif name == "publication_date":
+                    published = child.text
+
+                elif name == "keywords":
+                    keywords = child.text
+
+            if loc:
+                loc = resolve_location(location, loc)
+                date = parse_w3c_date(published)
+
+                if date is None and kind == "url": # The date in the article URL
+                    match = URL_DATE.search(loc)
+                    date = parse_w3c_date(match.group(1)) if match else None
+
+                if date is None:
+                    date = parse_w3c_date(lastmod)
+
+                yield SitemapEntry(kind, loc, date, keywords)
+
+            root.clear() # Let go of the entries already read
+
+
+class SitemapDiscovery:
+    """This class finds article URLs in the ABC news sitemap instead of
+    scrolling back through the topic pages. The sitemap index lists a child
+    sitemap for each period, so the date range is split into windows and
+    the child sitemaps in any window are read at the same time. Each URL is
+    kept if it's published in a window and matches url_pattern and, when
+    set, the topic_pattern is found in its news keywords. The URLs go
+    through the CrawlFrontier, so articles found before or by the topic
+    pages aren't downloaded again.
+
+    Sitemaps can be URLs or local files, gzipped or not, so the discovery
+    can be run offline against saved sitemaps."""
+
+    def __init__(self, frontier, pipeline, sitemap_location, windows, url_pattern=ARTICLE_URL_PATTERN,
+            topic_pattern=None, max_parallel=4, open_location=open_sitemap):
+        """Initialise the object. windows is a list of (start, end)
+        datetimes, e.g. from split_date_range. The patterns are regular
+        expressions and topic_pattern ignores case"""
+        self.frontier = frontier
+        self.pipeline = pipeline
+        self.sitemap_location = sitemap_location
+        self.windows = sorted(windows)
+        self.url_pattern = re.compile(url_pattern) if url_pattern else None
+        self.topic_pattern = re.compile(topic_pattern, re.IGNORECASE) if topic_pattern else None
+        self.max_parallel = max_parallel
+        self.open_location = open_location
+
+        # Counts of the URLs read, added up across the sitemaps
+        self.lock = threading.Lock()
+        self.counts = {"sitemaps": 0, "sitemaps_skipped": 0, "sitemaps_failed": 0, "urls": 0,
+            "new": 0, "duplicate": 0, "outside_dates": 0, "filtered": 0}
+        self.window_counts = {window: 0 for window in self.windows} # New URLs in each window
+
+
+    def get_window(self, date):
+        """Return the window a date falls in, or None"""
+
+        for window in self.windows:
+            if window[0] <= date < window[1]:
+                return window
+
+        return None
+
+
+    def overlaps(self, period):
+        """Check if a (start, end) period overlaps any of the windows"""
+        return any(start < period[1] and period[0] < end for start, end in self.windows)
+
+
+    def is_skipped(self, entry):
+        """Check if a sitemap listed in an index can be skipped, because
+        it's named for a period outside the windows or was last changed
+        before the windows start"""
+
+        period = get_sitemap_period(entry.loc)
+        if (period is not None and not self.overlaps(period)) or \
+                (entry.date is not None and entry.date < self.windows[0][0]):
+            self.count("sitemaps_skipped")
+            return True
+
+        return False
+
+
+    def find_sitemaps(self, location):
+        """Return the sitemaps in the index that might be in one of the
+        windows, or the location itself if it isn't an index. The child
+        sitemaps aren't opened here, so each is only fetched once, and
+        nested indexes are followed as they're read"""
+
+        sitemaps = []
+
+        for entry in iter_sitemap(location, self.open_location):
+            if entry.kind == "url": # Not an index, so read it as it is
+                return [location]
+
+            if not self.is_skipped(entry):
+                sitemaps.append(entry.loc)
+
+        return sitemaps
+
+
+    def count(self, name, amount=1):
+        """Add to one of the counts"""
+        with self.lock:
+            self.counts[name] += amount
+
+
+    def is_wanted(self, entry):
+        """Check if an entry matches the URL and topic patterns"""
+
+        if self.url_pattern is not None and not self.url_pattern.search(entry.loc):
+            return False
+
+        if self.topic_pattern is not None and not self.topic_pattern.search(entry.keywords or ""):
+            return False
+
+        return True
+
+
+    def add_batch(self, batch):
+        """Send a batch of (url, window) to the frontier and pipeline"""
+
+        new_urls = self.frontier.add_urls([url for url, window in batch])
+        self.pipeline.submit_many(new_urls)
+
+        new = set(new_urls)
+        with self.lock:
+            self.counts["new"] += len(new_urls)
+            self.counts["duplicate"] += len(batch) - len(new_urls)
+
+            for url, window in batch:
+                if url in new and window is not None:
+                    self.window_counts[window] += 1
+
+        metrics.inc("sitemap_urls_total", len(new_urls), result="new")
+        metrics.inc("sitemap_urls_total", len(batch) - len(new_urls), result="duplicate")
+
+
+    def read_sitemap(self, location):
+        """Read one sitemap and send its wanted URLs on in batches"""
+
+        batch = []
+        nested = [] # Sitemaps listed if this is a nested index
+        urls, outside, filtered = 0, 0, 0
+
+        try:
+            with metrics.timed("sitemap_read_seconds"):
+                for entry in iter_sitemap(location, self.open_location):
+                    if entry.kind == "sitemap":
+                        if not self.is_skipped(entry):
+                            nested.append(entry.loc)
+                        continue
+
+                    urls += 1
+
+                    if not self.is_wanted(entry):
+                        filtered += 1
+                        continue
+
+                    window = None if entry.date is None else self.get_window(entry.date)
+
+                    if entry.date is not None and window is None:
+                        outside += 1
+                        continue
+
+                    batch.append((entry.loc, window))
+                    if len(batch) >= BATCH_SIZE:
+                        self.add_batch(batch)
+                        batch = []
+
+                self.add_batch(batch)
+
+        except Exception as e: # Don't let one sitemap stop the others
+            self.count("sitemaps_failed")
+            log_event("sitemap", "error", None, logging.WARNING, url=location, error=repr(e))
+            return
+
+        with self.lock:
+            self.counts["sitemaps"] += 1
+            self.counts["urls"] += urls
+            self.counts["outside_dates"] += outside
+            self.counts["filtered"] += filtered
+
+        metrics.inc("sitemap_urls_total", outside, result="outside_dates")
+        metrics.inc("sitemap_urls_total", filtered, result="filtered")
+        log_event("sitemap", "read", None, url=location, urls=urls, outside_dates=outside,
+            filtered=filtered)
+
+        for child in nested: # Read the nested index's sitemaps in this worker
+            self.read_sitemap(child)
+
+
+    def report(self):
+        """Return the lines reporting what the sitemaps found"""
+
+        lines = ["Sitemaps: {} read, {} skipped, {} failed, {} URLs ({} new, {} already found, "
+            "{} outside the dates, {} filtered out)".format(self.counts["sitemaps"],
+            self.counts["sitemaps_skipped"], self.counts["sitemaps_failed"], self.counts["urls"],
+            self.counts["new"], self.counts["duplicate"], self.counts["outside_dates"],
+            self.counts["filtered"])]
+
+        for (start, end), new in self.window_counts.items():
+            if new:
+                lines.append("{} to {}: {} new".format(start.strftime("%Y-%m-%d"),
+                    end.strftime("%Y-%m-%d"), new))
+
+        return lines
+
+
+    def run(self):
+        """Read the sitemaps in the windows, max_parallel at a time, and
+        return the counts"""
+
+        sitemaps = self.find_sitemaps(self.sitemap_location)
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="Sitemap") as executor:
+            list(executor.map(self.read_sitemap, sitemaps))
+
+        for line in self.report():
+            print(line)
+
+        return self.counts
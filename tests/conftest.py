@@ -0,0 +1,14 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T15:20:04+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: conftest.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T15:20:04+10:00
+
+# Import packages
+import sys
+from os import path
+
+# The modules are at the top of the repository rather than in a package
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
@@ -0,0 +1,94 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T17:12:26+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_ABCWebComponents.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T17:12:26+10:00
+
+# Import packages
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from ABCWebComponents import HTTPTopicPage, TopicPage
+from fetchEngine import FetchResponse
+from mockABCServer import MockABCServer
+
+TOPIC_URL = "https://www.abc.net.au/news/topic/university"
+
+
+class MockTopicEngine:
+    """Stands in for FetchEngine, answering with the mock server's topic
+    pages without starting it. Each status in faults is sent in turn for
+    the Load More requests before they're answered properly"""
+
+    def __init__(self, faults=()):
+        self.mock = MockABCServer(topic_days=60) # A story a day for university
+        self.mock.server.server_close()
+        self.faults = list(faults)
+
+    def get(self, url, use_cache=False):
+        if url == TOPIC_URL:
+            return FetchResponse(url, 200, {}, self.mock.make_topic_page("university"))
+
+        if self.faults:
+            status = self.faults.pop(0)
+            return FetchResponse(url, status, {}, b"<html>Not JSON</html>")
+
+        return FetchResponse(url, 200, {}, self.mock.make_topic_listing(url.partition("?")[2]))
+
+
+def test_load_more_until_total():
+    """Load More returns False once every story has loaded"""
+
+    topic_page = HTTPTopicPage(MockTopicEngine())
+    assert topic_page.get_web_page(TOPIC_URL)
+    assert topic_page.count_story_cards(None) == 25
+
+    assert topic_page.click_load_more(None)
+    assert topic_page.click_load_more(None)
+    assert topic_page.count_story_cards(None) == 60
+    assert not topic_page.click_load_more(None)
+
+
+@pytest.mark.parametrize("status", [429, 503, 200])
+def test_load_more_failure_raises(status):
+    """A failed Load More, or one that isn't JSON, raises instead of ending
+    the topic early, and the next try carries on from the same story"""
+
+    topic_page = HTTPTopicPage(MockTopicEngine(faults=[status]))
+    topic_page.get_web_page(TOPIC_URL)
+
+    with pytest.raises(IOError):
+        topic_page.click_load_more(None)
+
+    assert topic_page.count_story_cards(None) == 25
+    assert topic_page.click_load_more(None)
+    assert topic_page.count_story_cards(None) == 50
+
+
+class ConsentDriver:
+    """Stands in for a Selenium 4 WebDriver, which only has find_element,
+    with or without a cookie consent button on the page"""
+
+    def __init__(self, has_button):
+        self.has_button = has_button
+        self.clicked = False
+
+    def find_element(self, by, value):
+        if by != By.XPATH or not self.has_button:
+            raise NoSuchElementException(value)
+        return self
+
+    def click(self):
+        self.clicked = True
+
+
+def test_cookie_consent():
+    """The consent banner is found with find_element and clicked"""
+
+    driver = ConsentDriver(has_button=True)
+    assert TopicPage(driver).click_cookie_consent("CookieBannerAccept")
+    assert driver.clicked
+
+    assert not TopicPage(ConsentDriver(has_button=False)).click_cookie_consent("CookieBannerAccept")
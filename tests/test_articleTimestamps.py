@@ -0,0 +1,27 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T19:02:15+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_articleTimestamps.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T19:02:15+10:00
+
+# Import packages
+from datetime import datetime
+import pytz
+from articleTimestamps import parse_with_format, standardise_article_timestamps
+
+
+def test_iso_with_z():
+    """Time tag datetimes end in Z, which older Pythons' fromisoformat
+    doesn't read on its own"""
+
+    assert parse_with_format("2013-10-30T05:12:00.000Z", "iso") == pytz.utc.localize(
+        datetime(2013, 10, 30, 5, 12))
+    assert standardise_article_timestamps("2013-10-30T05:12:00.000Z") == "2013-10-30T05:12:00.000000Z"
+
+
+def test_iso_with_offset():
+    """Offsets are converted to UTC"""
+    assert parse_with_format("2013-10-30T16:12:00+11:00", "iso") == pytz.utc.localize(
+        datetime(2013, 10, 30, 5, 12))
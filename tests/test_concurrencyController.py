@@ -0,0 +1,95 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T20:14:06+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_concurrencyController.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T20:14:06+10:00
+
+# Import packages
+import asyncio
+import time
+from concurrencyController import AIMDController, parse_retry_after
+
+# Seconds each request takes
+ROUND_TRIP = 0.02
+
+
+def send_requests(controller, statuses, retry_after=None, workers=20):
+    """Send a request for each status from more workers than the limit, so
+    the controller is kept at its limit like a busy crawl"""
+
+    pending = list(statuses)
+
+    async def worker():
+        while pending:
+            status = pending.pop()
+            await controller.acquire()
+            await asyncio.sleep(ROUND_TRIP)
+            controller.release(status, ROUND_TRIP, retry_after)
+
+    async def send():
+        await asyncio.gather(*[worker() for _ in range(workers)])
+
+    asyncio.run(send())
+
+
+def test_grows_while_responses_are_fast():
+    """Each round trip at the limit adds about one request, up to max_limit"""
+
+    controller = AIMDController("test", initial_limit=2, max_limit=10)
+    send_requests(controller, [200] * 20)
+    assert 3 <= int(controller.limit) < 10 # Growing, but not all at once
+
+    send_requests(controller, [200] * 200)
+    assert int(controller.limit) == 10
+
+
+def test_cut_on_429_and_recovers():
+    """A round trip of 429s halves the limit once, then fast responses
+    bring it back up"""
+
+    controller = AIMDController("test", initial_limit=8, max_limit=8)
+    send_requests(controller, [200] * 8) # Sets the latency the cuts are spaced by
+
+    send_requests(controller, [429] * 8)
+    assert int(controller.limit) == 4 # Cut once for the round trip, not eight times
+
+    send_requests(controller, [503] * 4)
+    assert int(controller.limit) == 2
+
+    send_requests(controller, [200] * 60)
+    assert int(controller.limit) == 8
+
+
+def test_errors_and_404s():
+    """A failed request cuts the limit, and a 404 leaves it alone"""
+
+    controller = AIMDController("test", initial_limit=4, max_limit=4)
+    send_requests(controller, [200] * 4)
+
+    send_requests(controller, [404] * 4)
+    assert int(controller.limit) == 4
+
+    send_requests(controller, [None] * 4)
+    assert int(controller.limit) == 2
+
+
+def test_retry_after_pauses():
+    """No request starts until a Retry-After has passed"""
+
+    controller = AIMDController("test", initial_limit=2)
+    send_requests(controller, [429], retry_after="0.3")
+
+    start_time = time.monotonic()
+    send_requests(controller, [200])
+    assert time.monotonic() - start_time >= 0.25
+
+
+def test_parse_retry_after():
+    """Retry-After is seconds or a HTTP date"""
+
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
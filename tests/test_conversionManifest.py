@@ -0,0 +1,68 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T17:48:09+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_conversionManifest.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T17:48:09+10:00
+
+# Import packages
+from os import path, remove
+from conversionManifest import ConversionManifest
+
+SOURCE = "../_data/articles/news_2013-10-30_slug_5056944.html"
+
+
+def make_manifest(tmp_path, success=1):
+    """Record one conversion into a JSON file in tmp_path/json"""
+
+    json_dir = tmp_path / "json"
+    json_dir.mkdir()
+    output = path.join(str(json_dir), "news_2013-10-30_slug_5056944.json")
+
+    if success:
+        open(output, "w").close()
+
+    manifest = ConversionManifest(str(tmp_path / "manifest.sqlite"))
+    manifest.record_many([(SOURCE, "abc", 100, 1.0, 2, output, success)])
+
+    return manifest, str(json_dir), output
+
+
+def test_current_conversion_skipped(tmp_path):
+    """An unchanged article converted by this version into the same folder
+    isn't converted again, including after the manifest is reopened"""
+
+    manifest, json_dir, output = make_manifest(tmp_path)
+    manifest.close()
+    manifest = ConversionManifest(str(tmp_path / "manifest.sqlite"))
+
+    assert manifest.is_current(SOURCE, 100, 1.0, 2, json_dir)
+    assert manifest.get_known_hash(SOURCE, 2, json_dir) == "abc"
+
+    assert not manifest.is_current(SOURCE, 101, 1.0, 2, json_dir) # Changed
+    assert not manifest.is_current(SOURCE, 100, 1.0, 3, json_dir) # New extractor
+    assert manifest.get_known_hash(SOURCE, 3, json_dir) is None
+
+
+def test_output_elsewhere_or_missing(tmp_path):
+    """Writing shards instead, or deleting the output, converts it again"""
+
+    manifest, json_dir, output = make_manifest(tmp_path)
+
+    corpus_dir = str(tmp_path / "corpus")
+    assert not manifest.is_current(SOURCE, 100, 1.0, 2, corpus_dir)
+    assert manifest.get_known_hash(SOURCE, 2, corpus_dir) is None
+
+    remove(output)
+    assert not manifest.is_current(SOURCE, 100, 1.0, 2, json_dir)
+    assert manifest.get_known_hash(SOURCE, 2, json_dir) is None
+
+
+def test_failed_conversion_retried(tmp_path):
+    """Articles that failed to convert are tried again"""
+
+    manifest, json_dir, output = make_manifest(tmp_path, success=0)
+
+    assert not manifest.is_current(SOURCE, 100, 1.0, 2, json_dir)
+    assert manifest.get_known_hash(SOURCE, 2, json_dir) is None
@@ -0,0 +1,58 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T19:58:44+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_crawlFrontier.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T19:58:44+10:00
+
+# Import packages
+from concurrent.futures import ThreadPoolExecutor
+from crawlFrontier import CrawlFrontier, DISCOVERED, FETCHED, FAILED
+from ABCWebComponents import get_article_uuid
+
+URLS = ["https://www.abc.net.au/news/2012-01-{:02d}/mock-story/{}".format(day, 4000000 + day)
+    for day in range(1, 29)]
+
+
+def test_add_urls_dedup(tmp_path):
+    """URLs are only returned the first time they're added, including
+    within one call"""
+
+    frontier = CrawlFrontier(str(tmp_path / "frontier.sqlite"))
+
+    assert frontier.add_urls(URLS[:10] + URLS[:3]) == URLS[:10]
+    assert frontier.add_urls(URLS[5:15]) == URLS[10:15]
+    assert len(frontier) == 15
+    assert URLS[0] in frontier and URLS[20] not in frontier
+
+
+def test_add_urls_claimed_once(tmp_path):
+    """When several threads add the same URLs, each is given to only one"""
+
+    frontier = CrawlFrontier(str(tmp_path / "frontier.sqlite"))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        claimed = list(executor.map(frontier.add_urls, [URLS] * 8))
+
+    assert sorted(url for urls in claimed for url in urls) == sorted(URLS)
+
+
+def test_states_survive_restart(tmp_path):
+    """A reopened frontier knows the URLs found and how far each got, so a
+    crawl carries on where it stopped"""
+
+    db_path = str(tmp_path / "frontier.sqlite")
+    frontier = CrawlFrontier(db_path)
+    frontier.add_urls(URLS)
+    frontier.set_state(get_article_uuid(URLS[0]), FETCHED)
+    frontier.mark_failed(get_article_uuid(URLS[1]), "HTTP 503")
+    frontier.close()
+
+    frontier = CrawlFrontier(db_path)
+
+    assert frontier.add_urls(URLS) == [] # Nothing is claimed twice
+    assert frontier.is_downloaded(get_article_uuid(URLS[0]))
+    assert frontier.get_state(get_article_uuid(URLS[1])) == FAILED
+    assert frontier.get_urls((DISCOVERED,)) == URLS[2:]
+    assert frontier.count_states() == {FETCHED: 1, FAILED: 1, DISCOVERED: len(URLS) - 2}
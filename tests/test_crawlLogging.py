@@ -0,0 +1,46 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T15:20:04+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_crawlLogging.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T15:20:04+10:00
+
+# Import packages
+import json
+import logging
+from multiprocessing import Pool
+from crawlLogging import start_logging, log_event, LOGGER_NAME
+from parallelProcessingFunctions import init_preprocessing_worker
+
+
+def log_task(i):
+    """Log one event from a pool worker"""
+    log_event("test", "done", str(i))
+    return i
+
+
+def test_pool_workers_log_through_listener(tmp_path):
+    """Every record logged by the pool workers reaches the file, and the
+    listener closes once the pool has been closed and joined the way
+    main_dataPreProcessing does"""
+
+    log_filepath = str(tmp_path / "log.jsonl")
+    listener = start_logging(log_filepath, use_processes=True)
+
+    try:
+        with Pool(4, initializer=init_preprocessing_worker, initargs=(listener.queue,)) as P:
+            assert sum(P.imap_unordered(log_task, range(2000), chunksize=16)) == sum(range(2000))
+            P.close()
+            P.join()
+
+    finally:
+        listener.close()
+        logging.getLogger(LOGGER_NAME).handlers = []
+
+    with open(log_filepath) as f:
+        records = [json.loads(line) for line in f]
+
+    assert len(records) == 2000
+    assert {record["article_uuid"] for record in records} == {str(i) for i in range(2000)}
+    assert all(record["event"] == "test" and record["outcome"] == "done" for record in records)
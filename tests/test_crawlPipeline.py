@@ -0,0 +1,112 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T18:40:52+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_crawlPipeline.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T18:40:52+10:00
+
+# Import packages
+import pytest
+from ABCWebComponents import get_article_uuid
+from articleArchive import ArticleArchive
+from crawlFrontier import CrawlFrontier, FETCHED, IMAGES_DONE
+from crawlPipeline import CrawlPipeline
+from fetchEngine import FetchResponse, configure_fetch_engine, close_fetch_engine
+from imageStore import ImageStore
+from mockABCServer import MockABCServer
+from retryQueue import RetryQueue
+
+
+class FailingImageEngine:
+    """Passes image requests to the fetch engine, except for the first
+    image requested, which gets status for its first failures requests"""
+
+    def __init__(self, engine, status, failures):
+        self.engine = engine
+        self.status = status
+        self.failures = failures
+        self.failing_url = None
+
+    def get_many(self, urls, use_cache=False):
+        if self.failing_url is None:
+            self.failing_url = urls[0]
+
+        responses = self.engine.get_many(urls, use_cache)
+
+        for i, url in enumerate(urls):
+            if url == self.failing_url and self.failures > 0:
+                self.failures -= 1
+                responses[i] = FetchResponse(url, self.status, {}, b"")
+
+        return responses
+
+
+@pytest.fixture
+def server():
+    """A mock ABC server with two images in each article, and the fetch
+    engine sending the ABC and CDN URLs to it"""
+
+    server = MockABCServer(latency=0, latency_jitter=0, images_per_article=2, image_kb=1,
+        noise_kb=1)
+    server.start()
+    engine = configure_fetch_engine(url_overrides=server.url_overrides)
+
+    yield server, engine
+
+    close_fetch_engine()
+    server.stop()
+
+
+def crawl_article(tmp_path, server, status, failures, use_retry_queue=True):
+    """Download one article with its first image failing and return the
+    article's state and the pipeline counts"""
+
+    server, engine = server
+    (tmp_path / "images").mkdir()
+
+    frontier = CrawlFrontier(str(tmp_path / "frontier.sqlite"))
+    retry_queue = RetryQueue(str(tmp_path / "retries.sqlite"), max_attempts=3, base_delay=0.01,
+        seed=1) if use_retry_queue else None
+    image_store = ImageStore(str(tmp_path / "images"), str(tmp_path / "images.sqlite"),
+        FailingImageEngine(engine, status, failures))
+
+    pipeline = CrawlPipeline(frontier, image_store, ArticleArchive(str(tmp_path / "archive")),
+        article_workers=1, image_workers=1, retry_queue=retry_queue, retry_wait=5)
+
+    article_url = frontier.add_urls(server.article_urls(1))[0]
+    pipeline.submit(article_url)
+    counts = pipeline.close()
+
+    return frontier.get_state(get_article_uuid(article_url)), counts
+
+
+def test_images_done_after_retry(tmp_path, server):
+    """An article is marked done once its failed image is saved by a retry"""
+
+    state, counts = crawl_article(tmp_path, server, 503, 1)
+
+    assert state == IMAGES_DONE
+    assert counts["images_done"] == 1
+    assert counts["images_failed"] == 0
+
+
+def test_images_not_done_without_retry_queue(tmp_path, server):
+    """Without a retry queue a failed image leaves the article FETCHED"""
+
+    state, counts = crawl_article(tmp_path, server, 503, 1, use_retry_queue=False)
+
+    assert state == FETCHED
+    assert counts["images_done"] == 0
+    assert counts["images_failed"] == 1
+
+
+def test_images_not_done_after_dead_letter(tmp_path, server):
+    """An image that fails for good leaves the article FETCHED, even
+    though its other image was saved"""
+
+    state, counts = crawl_article(tmp_path, server, 404, 10)
+
+    assert state == FETCHED
+    assert counts["images_done"] == 0
+    assert counts["images_failed"] == 1
@@ -0,0 +1,64 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T19:40:27+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_fetchEngine.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T19:40:27+10:00
+
+# Import packages
+import asyncio
+import time
+from fetchEngine import FetchEngine, TokenBucket
+from mockABCServer import MockABCServer
+
+
+def time_acquires(bucket, count):
+    """Return the seconds taken to take count tokens from a bucket"""
+
+    async def acquire_all():
+        start_time = time.monotonic()
+        await asyncio.gather(*[bucket.acquire() for _ in range(count)])
+        return time.monotonic() - start_time
+
+    return asyncio.run(acquire_all())
+
+
+def test_bucket_rate_limit():
+    """After the first token, tokens come at the bucket's rate"""
+    seconds = time_acquires(TokenBucket(20, burst=1), 11)
+    assert 0.45 <= seconds < 1.0
+
+
+def test_bucket_burst():
+    """A full bucket gives out burst tokens straight away, by default a
+    second's worth"""
+    assert time_acquires(TokenBucket(1, burst=5), 5) < 0.1
+    assert time_acquires(TokenBucket(20), 20) < 0.1
+
+
+def test_engine_fetches_through_overrides():
+    """Requests for the ABC URLs go to the mock server, the responses keep
+    the ABC URLs, and the host's rate limit is applied"""
+
+    server = MockABCServer(latency=0, latency_jitter=0, noise_kb=1)
+    server.start()
+    engine = FetchEngine(requests_per_second=10, burst=1, url_overrides=server.url_overrides)
+
+    try:
+        urls = server.article_urls(6)
+
+        start_time = time.monotonic()
+        responses = engine.get_many(urls)
+        seconds = time.monotonic() - start_time
+
+        assert [r.status_code for r in responses] == [200] * 6
+        assert [r.url for r in responses] == urls
+        assert seconds >= 0.45 # Five tokens at 10 a second after the first
+
+        missing = engine.get("https://www.abc.net.au/not-an-article")
+        assert missing.status_code == 404
+
+    finally:
+        engine.close()
+        server.stop()
@@ -0,0 +1,40 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T16:02:41+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_parallelProcessingFunctions.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T16:02:41+10:00
+
+# Import packages
+import json
+from os import listdir, path
+from benchmarkCorpus import generate_corpus
+from parallelProcessingFunctions import article_html_to_json, get_articles_selected_words
+
+
+def test_outputs_written_to_output_dir(tmp_path):
+    """Articles outside ../_data/articles are written to the output folders
+    under their own names, not over each other in the corpus folder"""
+
+    corpus_dir = str(tmp_path / "benchmark" / "articles")
+    json_dir = tmp_path / "json"
+    matched_dir = tmp_path / "json_matchedKeywords"
+    json_dir.mkdir()
+
+    filepaths = generate_corpus(corpus_dir, articles_per_template=2, seed=1, noise_kb=1)
+
+    converted = sum(article_html_to_json(each, output_dir=str(json_dir)) for each in filepaths)
+    matched = sum(get_articles_selected_words(each, ["student", "teacher", "school"],
+        output_dir=str(matched_dir)) for each in filepaths)
+
+    # Only the HTML is left in the corpus folder
+    assert all(name.endswith(".html") for name in listdir(corpus_dir))
+    assert converted == len(listdir(json_dir)) > 0
+    assert matched == len(listdir(matched_dir)) > 0
+
+    # Each file is named after its article and keeps the article's URL
+    name = path.splitext(path.basename(filepaths[0]))[0]
+    with open(json_dir / (name + ".json")) as f:
+        article = json.load(f)
+    assert article["url"] == "https://www.abc.net.au/" + name.replace("_", "/")
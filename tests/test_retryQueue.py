@@ -0,0 +1,89 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T20:37:19+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_retryQueue.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T20:37:19+10:00
+
+# Import packages
+import time
+from retryQueue import RetryQueue, ARTICLE, IMAGE
+
+URL = "https://www.abc.net.au/news/2013-10-30/slug/5056944"
+KEY = "news_2013-10-30_slug_5056944"
+
+
+def make_queue(tmp_path, **kwargs):
+    """Open a retry queue in tmp_path"""
+    return RetryQueue(str(tmp_path / "retries.sqlite"), seed=1, **kwargs)
+
+
+def test_backoff_then_dead_letter(tmp_path):
+    """Each failure waits longer, and the last attempt goes to the dead
+    letters"""
+
+    retry_queue = make_queue(tmp_path, max_attempts=4, base_delay=10, max_delay=25)
+    waits = []
+
+    for attempt in range(3):
+        before = time.time()
+        assert retry_queue.add_failure(ARTICLE, KEY, URL, "HTTP 503", 503)
+        waits.append(retry_queue.pending[(ARTICLE, KEY)][3] - before)
+
+        # Not due until its backoff ends
+        assert retry_queue.pop_due() == []
+        assert retry_queue.pop_due(now=time.time() + 30) == [(ARTICLE, KEY, URL, None)]
+
+    # Half to all of 10, 20 and then 40 capped at 25 seconds
+    assert 5 <= waits[0] <= 10.5 and 10 <= waits[1] <= 20.5 and 12.5 <= waits[2] <= 25.5
+
+    assert not retry_queue.add_failure(ARTICLE, KEY, URL, "HTTP 503", 503)
+    assert len(retry_queue) == 0
+    assert retry_queue.get_dead_letters() == [(ARTICLE, KEY, URL, 4, "HTTP 503")]
+
+
+def test_permanent_failure_and_retry_after(tmp_path):
+    """A 404 goes straight to the dead letters, and a Retry-After longer
+    than the backoff is waited for"""
+
+    retry_queue = make_queue(tmp_path, base_delay=1)
+
+    assert not retry_queue.add_failure(ARTICLE, KEY, URL, "HTTP 404", 404)
+    assert len(retry_queue.get_dead_letters(ARTICLE)) == 1
+
+    before = time.time()
+    assert retry_queue.add_failure(IMAGE, "img", "https://cdn/img", "HTTP 429", 429, retry_after=120)
+    assert retry_queue.seconds_until_due() >= 119
+    assert retry_queue.pending[(IMAGE, "img")][3] - before >= 120
+
+
+def test_success_clears_retry(tmp_path):
+    """A download that works after failing isn't retried again"""
+
+    retry_queue = make_queue(tmp_path)
+    retry_queue.add_failure(ARTICLE, KEY, URL, "HTTP 503", 503)
+    retry_queue.add_success(ARTICLE, KEY)
+
+    assert len(retry_queue) == 0
+    assert retry_queue.seconds_until_due() is None
+
+
+def test_survives_restart(tmp_path):
+    """Retries and dead letters are kept between runs, and retry_now makes
+    them all due again"""
+
+    retry_queue = make_queue(tmp_path)
+    retry_queue.add_failure(ARTICLE, KEY, URL, "HTTP 503", 503)
+    retry_queue.add_failure(IMAGE, "img", "https://cdn/img", "HTTP 404", 404,
+        payload={"article_uuid": KEY, "article_url": URL, "img_filename": "img.jpg"})
+    retry_queue.close()
+
+    retry_queue = make_queue(tmp_path)
+    assert (ARTICLE, KEY) in retry_queue
+    assert retry_queue.get_image_failures(KEY) == (set(), {"https://cdn/img"})
+
+    assert retry_queue.retry_now() == 2
+    assert sorted(retry_queue.pop_due()) == [(ARTICLE, KEY, URL, None), (IMAGE, "img", "https://cdn/img",
+        {"article_uuid": KEY, "article_url": URL, "img_filename": "img.jpg"})]
+    assert retry_queue.get_dead_letters() == []
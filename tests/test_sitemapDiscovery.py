@@ -0,0 +1,124 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T16:31:12+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: test_sitemapDiscovery.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T16:31:12+10:00
+
+# Import packages
+from datetime import datetime
+from os import path
+from crawlFrontier import CrawlFrontier
+from fetchEngine import configure_fetch_engine, close_fetch_engine
+from mockABCServer import MockABCServer
+from sitemapDiscovery import SitemapDiscovery, split_date_range
+
+# Saved with MockABCServer(topic_days=92).write_sitemap_fixtures, so the
+# index lists gzipped sitemaps for July to September 2011. Every day has a
+# story tagged with its topics, and every 7th day a program page
+SITEMAP_INDEX = path.join(path.dirname(__file__), "fixtures", "sitemaps", "sitemap.xml")
+
+
+class RecordingPipeline:
+    """Stands in for CrawlPipeline and keeps the URLs submitted"""
+
+    def __init__(self):
+        self.urls = []
+
+    def submit_many(self, article_urls):
+        self.urls.extend(article_urls)
+
+
+def run_discovery(tmp_path, windows, topic_pattern=None, location=SITEMAP_INDEX, max_parallel=4):
+    """Run the discovery over the fixtures with a new frontier"""
+
+    pipeline = RecordingPipeline()
+    discovery = SitemapDiscovery(CrawlFrontier(str(tmp_path / "frontier.sqlite")), pipeline,
+        location, windows, topic_pattern=topic_pattern, max_parallel=max_parallel)
+
+    return discovery, discovery.run(), pipeline
+
+
+def test_window_counts(tmp_path):
+    """The July sitemap is skipped and the stories from August and
+    September are counted in their windows"""
+
+    windows = split_date_range(datetime(2011, 8, 1), datetime(2011, 10, 1), 14)
+    discovery, counts, pipeline = run_discovery(tmp_path, windows)
+
+    assert counts["sitemaps"] == 2
+    assert counts["sitemaps_skipped"] == 1
+    assert counts["urls"] == 70
+    assert counts["filtered"] == 9 # The program pages
+    assert counts["new"] == len(pipeline.urls) == 61
+    assert list(discovery.window_counts.values()) == [14, 14, 14, 14, 5]
+    assert all("/news/2011-" in url for url in pipeline.urls)
+
+
+def test_outside_dates(tmp_path):
+    """Stories in a read sitemap but outside the windows aren't kept"""
+
+    windows = [(datetime(2011, 8, 10), datetime(2011, 8, 20))]
+    discovery, counts, pipeline = run_discovery(tmp_path, windows)
+
+    assert counts["sitemaps"] == 1
+    assert counts["sitemaps_skipped"] == 2
+    assert counts["new"] == 10
+    assert counts["outside_dates"] == 21
+    assert sorted(url.split("/")[4] for url in pipeline.urls) == ["2011-08-{}".format(day)
+        for day in range(10, 20)]
+
+
+def test_topic_pattern(tmp_path):
+    """Only the stories with politics in their keywords are kept, which is
+    every third day back from the last day"""
+
+    windows = split_date_range(datetime(2011, 8, 1), datetime(2011, 10, 1), 14)
+    discovery, counts, pipeline = run_discovery(tmp_path, windows, topic_pattern="politics")
+
+    assert counts["new"] == len(pipeline.urls) == 21
+    assert counts["filtered"] == 49
+    assert list(discovery.window_counts.values()) == [5, 5, 4, 5, 2]
+    assert sorted(int(url.rsplit("/", 1)[1]) - 3000000 for url in pipeline.urls) == list(range(31, 92, 3))
+
+
+def test_nested_index(tmp_path):
+    """An index listing another index has the inner index's sitemaps read"""
+
+    outer = tmp_path / "sitemap.xml"
+    outer.write_text('<?xml version="1.0" encoding="UTF-8"?>'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        '<sitemap><loc>{}</loc></sitemap></sitemapindex>'.format(SITEMAP_INDEX))
+
+    windows = split_date_range(datetime(2011, 8, 1), datetime(2011, 10, 1), 14)
+    discovery, counts, pipeline = run_discovery(tmp_path, windows, location=str(outer))
+
+    assert counts["sitemaps"] == 3 # The inner index and two monthly sitemaps
+    assert counts["sitemaps_skipped"] == 1
+    assert counts["new"] == 61
+
+
+def test_fetched_through_engine(tmp_path):
+    """Sitemap URLs go through the fetch engine's rate limit and
+    concurrency control, and throttled sitemaps are asked for again"""
+
+    server = MockABCServer(latency=0, latency_jitter=0, throttle_rate=0.4, retry_after=0,
+        topic_days=92)
+    server.start()
+    engine = configure_fetch_engine(url_overrides=server.url_overrides)
+
+    try:
+        windows = split_date_range(datetime(2011, 8, 1), datetime(2011, 10, 1), 14)
+        discovery, counts, pipeline = run_discovery(tmp_path, windows,
+            location="https://www.abc.net.au/news/sitemap.xml", max_parallel=1)
+
+        stats = server.get_stats()
+        assert "www.abc.net.au" in engine.controllers
+        assert stats["statuses"][200] == 3 # Each sitemap is only downloaded once
+        assert counts["sitemaps_failed"] == 0
+        assert counts["new"] == 61
+
+    finally:
+        close_fetch_engine()
+        server.stop()
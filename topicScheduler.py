@@ -0,0 +1,359 @@
+# @Author: Lauren Scoble <lsco0006>
+# @Date:   2026-10-19T09:32:18+10:00
+# @Email:  lsco0006@student.monash.edu
+# @Project: A Topic Modelling Analysis of ABC News Articles on Education Matters
+# @Filename: topicScheduler.py
+# @Last modified by:   lsco0006
+# @Last modified time: 2026-10-19T09:32:18+10:00
+
+# Import packages
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from selenium.common.exceptions import NoSuchElementException
+from ABCWebComponents import HTTPTopicPage, CARD_TIMESTAMP_FORMAT
+from crawlMetrics import metrics
+from crawlLogging import log_event
+
+# The tags of the topic page elements
+COOKIE_BUTTON_TAG = "CookieBanner_AcceptABCRequired"
+STORY_TAG = "CardHeading"
+DATE_TAG = "Timestamp"
+LOAD_MORE_TAG = "PaginationLoadMoreButton"
+
+
+def get_topic_name(topic_url):
+    """Return the last part of a topic URL, e.g. university"""
+    return topic_url.rstrip("/").split("/")[-1]
+
+
+def parse_card_date(card_date):
+    """Return a story card's publish date as a datetime, or None"""
+
+    try:
+        return datetime.strptime(card_date, CARD_TIMESTAMP_FORMAT)
+
+    except (TypeError, ValueError):
+        return None
+
+
+class TopicProgress:
+    """This class counts the stories one topic has found and how far back
+    in time its listing has been read"""
+
+    def __init__(self, topic_url, windows):
+        """Initialise the object"""
+        self.topic = get_topic_name(topic_url)
+        self.window_start = min(start for start, end in windows)
+        self.window_end = max(end for start, end in windows)
+
+        self.pages = 0 # Listing pages loaded
+        self.stories = 0 # Story cards read
+        self.new = 0 # Stories no topic had found before
+        self.duplicates = 0 # Stories another topic or run had already found
+        self.outside = 0 # Stories outside every date window
+        self.oldest = None # Publish date of the last story read
+        self.offset = 0 # Story cards read, including by earlier sessions and runs
+        self.sessions = 0 # Topic pages opened, counting restarts
+        self.state = "waiting"
+
+
+    def get_line(self):
+        """Return a progress line for the topic"""
+
+        line = "{}: {}, {} stories ({} new, {} already found, {} outside the dates)".format(
+            self.topic, self.state, self.stories, self.new, self.duplicates, self.outside)
+
+        if self.sessions > 1: # The browser was restarted
+            line += ", {} sessions".format(self.sessions)
+
+        if self.oldest is not None: # How much of the date range has been read
+            covered = (self.window_end - max(self.oldest, self.window_start)) / (self.window_end - self.window_start)
+            line += ", back to {} ({:.0%})".format(self.oldest.strftime("%Y-%m-%d"),
+                min(max(covered, 0.0), 1.0))
+
+        return line
+
+
+class TopicCheckpoint:
+    """This class saves how far each unfinished topic has been read to a
+    JSON file, so a crawl that stops or crashes carries on from the same
+    story card next time instead of starting again"""
+
+    def __init__(self, filepath):
+        """Initialise the object, loading any saved checkpoint"""
+        self.filepath = filepath
+        self.lock = threading.Lock()
+
+        try:
+            with open(filepath) as f:
+                self.topics = json.load(f)
+
+        except FileNotFoundError: # Nothing saved yet
+            self.topics = {}
+
+
+    def get_offset(self, topic_url):
+        """Return the number of story cards already read for a topic"""
+        return self.topics.get(topic_url, {}).get("offset", 0)
+
+
+    def save(self, topic_url, offset, oldest):
+        """Record how far a topic has been read"""
+
+        with self.lock:
+            self.topics[topic_url] = {"offset": offset, "updated": time.time(),
+                "oldest": oldest.strftime(CARD_TIMESTAMP_FORMAT) if oldest else None}
+            self._write()
+
+
+    def remove(self, topic_url):
+        """Forget a topic once it has been read to the end"""
+
+        with self.lock:
+            if self.topics.pop(topic_url, None) is not None:
+                self._write()
+
+
+    def _write(self):
+        """Replace the file in one step so a crash can't leave half of it"""
+
+        temp_filepath = self.filepath + ".tmp"
+        with open(temp_filepath, "w") as f:
+            json.dump(self.topics, f)
+
+        os.replace(temp_filepath, self.filepath)
+
+
+class TopicScheduler:
+    """This class reads several topic pages at once and sends every story
+    published inside one of the date windows to the CrawlPipeline. The
+    stories from all the topics go through the CrawlFrontier first, so an
+    article tagged with several topics is only downloaded once.
+
+    Topic listings go from the newest story to the oldest, so each topic is
+    read once, back to the start of the earliest window, and its stories are
+    kept if they fall in any of the windows.
+
+    A browser that clicks Load More for hours grows until it slows down or
+    crashes, so every recycle_every Load Mores the topic page is closed and
+    a new one is skipped forward to the same story card. A topic page that
+    fails is restarted the same way, up to max_restarts times. With a
+    checkpoint_path, how far each topic got is saved as it goes, so the next
+    run carries on from there."""
+
+    def __init__(self, frontier, pipeline, topic_urls, windows, make_topic_page=HTTPTopicPage,
+            max_parallel=4, card_timeout=10, report_seconds=30, recycle_every=None,
+            max_restarts=3, checkpoint_path=None):
+        """Initialise the object. windows is a list of (start, end)
+        datetimes. make_topic_page is called with no arguments to get a new
+        TopicPage or HTTPTopicPage for each topic and each restart. Each
+        read waits up to card_timeout seconds for the new story cards to
+        appear"""
+        self.frontier = frontier
+        self.pipeline = pipeline
+        self.topic_urls = list(topic_urls)
+        self.windows = list(windows)
+        self.make_topic_page = make_topic_page
+        self.max_parallel = max_parallel
+        self.card_timeout = card_timeout
+        self.report_seconds = report_seconds
+        self.recycle_every = recycle_every
+        self.max_restarts = max_restarts
+        self.checkpoint = TopicCheckpoint(checkpoint_path) if checkpoint_path else None
+
+        self.window_start = min(start for start, end in self.windows)
+        self.progress = {url: TopicProgress(url, self.windows) for url in self.topic_urls}
+
+
+    def in_windows(self, date):
+        """Check if a publish date falls in any of the date windows"""
+        return any(start <= date < end for start, end in self.windows)
+
+
+    def add_stories(self, progress, cards):
+        """Send the stories in the date windows on to the pipeline and count
+        the rest"""
+
+        wanted = []
+        for url, card_date in cards:
+            date = parse_card_date(card_date)
+
+            if date is not None:
+                progress.oldest = date
+
+            if date is None or self.in_windows(date):
+                wanted.append(url)
+
+            else:
+                progress.outside += 1
+
+        # The frontier only returns the URLs no topic has found before
+        new_urls = self.frontier.add_urls(wanted)
+        self.pipeline.submit_many(new_urls)
+
+        progress.stories += len(cards)
+        progress.new += len(new_urls)
+        progress.duplicates += len(wanted) - len(new_urls)
+
+        metrics.inc("topic_stories_total", len(new_urls), topic=progress.topic, result="new")
+        metrics.inc("topic_stories_total", len(wanted) - len(new_urls), topic=progress.topic,
+            result="duplicate")
+        metrics.inc("topic_stories_total", len(cards) - len(wanted), topic=progress.topic,
+            result="outside_dates")
+
+
+    def read_topic(self, progress, topic_page, topic_url):
+        """Read a topic's listing in one topic page, carrying on from
+        progress.offset. Returns True once the listing has been read back to
+        the start of the earliest window, or False if the page should be
+        recycled first"""
+
+        progress.sessions += 1
+
+        if not topic_page.get_web_page(topic_url):
+            raise IOError("Couldn't load {}".format(topic_url))
+
+        topic_page.click_cookie_consent(COOKIE_BUTTON_TAG)
+
+        # Skip the cards read by an earlier session or run
+        if progress.offset and not topic_page.fast_forward(progress.offset, STORY_TAG, DATE_TAG,
+                LOAD_MORE_TAG, self.card_timeout):
+            return True
+
+        load_mores = 0 # Load Mores clicked in this session
+        load_more = progress.offset > 0 # A new page shows its first cards without one
+
+        while True:
+            if load_more:
+                if self.recycle_every and load_mores >= self.recycle_every:
+                    return False
+
+                topic_page.scroll_to_bottom()
+
+                try:
+                    if not topic_page.click_load_more(LOAD_MORE_TAG):
+                        return True
+
+                except NoSuchElementException: # If the button couldn't be found
+                    return True
+
+                load_mores += 1
+
+            load_more = True
+
+            # Wait for the new cards to load, rather than a fixed time
+            with metrics.timed("topic_wait_seconds", topic=progress.topic):
+                loaded = topic_page.wait_for_new_cards(STORY_TAG, self.card_timeout)
+
+            if not loaded: # Nothing new came, so the listing has ended
+                log_event("topic", "no_new_cards", None, logging.DEBUG, topic=progress.topic,
+                    stories=progress.stories)
+                return True
+
+            # Only the cards added since the last read are fetched
+            self.add_stories(progress, topic_page.get_new_story_cards(STORY_TAG, DATE_TAG))
+            progress.offset = topic_page.cursor
+            progress.pages += 1
+
+            if self.checkpoint is not None:
+                self.checkpoint.save(topic_url, progress.offset, progress.oldest)
+
+            # Stop once the stories are older than every window
+            if progress.oldest is not None and progress.oldest < self.window_start:
+                return True
+
+
+    def crawl_topic(self, topic_url):
+        """Read one topic's listing back to the start of the earliest
+        window, in as many topic pages as it takes"""
+
+        progress = self.progress[topic_url]
+        progress.state = "reading"
+
+        if self.checkpoint is not None: # Carry on from an earlier run
+            progress.offset = self.checkpoint.get_offset(topic_url)
+            if progress.offset:
+                log_event("topic", "resumed", None, topic=progress.topic, offset=progress.offset)
+
+        restarts = 0 # Restarts since the last one that got further
+        failed_offset = -1
+        finished = False
+
+        while not finished:
+            topic_page = self.make_topic_page()
+
+            try:
+                finished = self.read_topic(progress, topic_page, topic_url)
+
+                if not finished:
+                    metrics.inc("topic_sessions_total", topic=progress.topic, reason="recycle")
+
+            except Exception as e: # Start again from the last card read
+                if progress.offset > failed_offset: # It got further this time
+                    restarts = 0
+                failed_offset = progress.offset
+
+                if restarts >= self.max_restarts: # Don't let one topic stop the others
+                    progress.state = "failed"
+                    log_event("topic", "error", None, logging.ERROR, topic=progress.topic,
+                        url=topic_url, error=repr(e), offset=progress.offset)
+                    return progress
+
+                restarts += 1
+                metrics.inc("topic_sessions_total", topic=progress.topic, reason="error")
+                log_event("topic", "restarted", None, logging.WARNING, topic=progress.topic,
+                    url=topic_url, error=repr(e), offset=progress.offset)
+
+            finally:
+                try:
+                    topic_page.close()
+
+                except Exception: # A crashed browser may already be gone
+                    pass
+
+        progress.state = "done"
+        if self.checkpoint is not None:
+            self.checkpoint.remove(topic_url)
+
+        log_event("topic", "done", None, topic=progress.topic, stories=progress.stories,
+            new=progress.new, duplicates=progress.duplicates, sessions=progress.sessions)
+
+        return progress
+
+
+    def report(self):
+        """Print a progress line for each topic"""
+        for progress in self.progress.values():
+            print(progress.get_line())
+
+
+    def run(self):
+        """Read all the topics, max_parallel at a time, printing their
+        progress every report_seconds. Returns the TopicProgress of each
+        topic URL"""
+
+        stopped = threading.Event()
+
+        def report_until_stopped():
+            while not stopped.wait(self.report_seconds):
+                self.report()
+
+        reporter = threading.Thread(target=report_until_stopped, name="TopicReporter", daemon=True)
+        reporter.start()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="Topic") as executor:
+                list(executor.map(self.crawl_topic, self.topic_urls))
+
+        finally:
+            stopped.set()
+            reporter.join()
+
+        self.report()
+
+        return self.progress